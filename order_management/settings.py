@@ -12,6 +12,7 @@ https://docs.djangoproject.com/en/5.0/ref/settings/
 import os
 import reprlib
 from pathlib import Path
+from typing import Any
 
 from dotenv import load_dotenv
 
@@ -46,6 +47,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'orders.middleware.request_timing_middleware',
+    'orders.middleware.ReplicaRoutingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -82,7 +85,7 @@ WSGI_APPLICATION = 'order_management.wsgi.application'
 # https://docs.djangoproject.com/en/5.0/ref/settings/#databases
 
 
-DATABASES = {
+DATABASES: dict[str, dict[str, Any]] = {
     "default": {
         "ENGINE": "django.db.backends.postgresql_psycopg2",
         "NAME": os.environ["DB_NAME"],
@@ -93,6 +96,25 @@ DATABASES = {
     }
 }
 
+
+def replica_database(primary: dict[str, Any], host: str, port: str) -> dict[str, Any]:
+    """Настройки реплики: те же, что у основной базы, кроме адреса; в тестах реплика - зеркало default."""
+    return {**primary, "HOST": host, "PORT": port, "TEST": {"MIRROR": "default"}}
+
+
+# Реплика для чтения списков, поиска и отчета о выручке (подключается, если задан DB_REPLICA_HOST)
+if os.environ.get("DB_REPLICA_HOST"):
+    DATABASES["replica"] = replica_database(
+        DATABASES["default"],
+        host=os.environ["DB_REPLICA_HOST"],
+        port=os.environ.get("DB_REPLICA_PORT", DATABASES["default"]["PORT"]),
+    )
+
+DATABASE_ROUTERS = ["orders.db_router.PrimaryReplicaRouter"]
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != "default"]
+# Сколько секунд после своей записи клиент читает только из основной базы (задержка репликации)
+DATABASE_REPLICA_STALENESS = float(os.environ.get("DB_REPLICA_STALENESS", 5))
+
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
 
@@ -148,9 +170,86 @@ REST_FRAMEWORK = {
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
 }
 
+# Списки заказов в API собираются из строк values_list, минуя OrderSerializer (JSON тот же)
+ORDERS_FAST_SERIALIZATION = os.environ.get("ORDERS_FAST_SERIALIZATION", "true").lower() in ("1", "true", "yes")
+
+# Заголовок Server-Timing и метрики Prometheus (/metrics) для представлений orders
+ORDERS_METRICS_ENABLED = os.environ.get("ORDERS_METRICS_ENABLED", "true").lower() in ("1", "true", "yes")
+
+CACHES = {
+    "default": {
+        "BACKEND": os.environ.get("CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"),
+        "LOCATION": os.environ.get("CACHE_LOCATION", "orders"),
+    }
+}
+
+# Кэш ответов списка и поиска заказов; TIMEOUT = 0 отключает кэш
+ORDERS_RESPONSE_CACHE = {
+    "ALIAS": os.environ.get("ORDERS_RESPONSE_CACHE_ALIAS", "default"),
+    "TIMEOUT": int(os.environ.get("ORDERS_RESPONSE_CACHE_TIMEOUT", 60)),
+}
+
+# Кэш отрендеренных строк HTML-списка заказов (ключ включает версию заказа); TIMEOUT = 0 отключает кэш
+ORDERS_ROW_CACHE = {
+    "ALIAS": os.environ.get("ORDERS_ROW_CACHE_ALIAS", "default"),
+    "TIMEOUT": int(os.environ.get("ORDERS_ROW_CACHE_TIMEOUT", 3600)),
+}
+
+# Снимки операционной статистики: интервал пересчета в секундах и срок хранения старых снимков
+ORDERS_STATISTICS_INTERVAL = int(os.environ.get("ORDERS_STATISTICS_INTERVAL", 300))
+ORDERS_STATISTICS_RETENTION_DAYS = int(os.environ.get("ORDERS_STATISTICS_RETENTION_DAYS", 7))
+
+# Размер страницы в списках заказов (параметр page_size ограничен ORDERS_MAX_PAGE_SIZE)
+ORDERS_PAGE_SIZE = int(os.environ.get("ORDERS_PAGE_SIZE", 50))
+ORDERS_MAX_PAGE_SIZE = int(os.environ.get("ORDERS_MAX_PAGE_SIZE", 500))
+
+# Кэш блюд в памяти процесса, используемый при создании и изменении заказов
+ITEM_CATALOG_MAX_SIZE = int(os.environ.get("ITEM_CATALOG_MAX_SIZE", 1000))
+ITEM_CATALOG_TTL = int(os.environ.get("ITEM_CATALOG_TTL", 300))
+
+# Количество заказов, проверяемых и вставляемых за одну транзакцию при массовой загрузке
+ORDERS_BULK_CHUNK_SIZE = int(os.environ.get("ORDERS_BULK_CHUNK_SIZE", 500))
+
+# Group commit при создании заказов (API и страница): запросы, пришедшие в пределах WINDOW_MS,
+# записываются одной транзакцией, не больше MAX_BATCH заказов. Имеет смысл при многопоточном сервере
+ORDERS_GROUP_COMMIT = {
+    "ENABLED": os.environ.get("ORDERS_GROUP_COMMIT", "").lower() in ("1", "true", "yes"),
+    "WINDOW_MS": float(os.environ.get("ORDERS_GROUP_COMMIT_WINDOW_MS", 2)),
+    "MAX_BATCH": int(os.environ.get("ORDERS_GROUP_COMMIT_MAX_BATCH", 100)),
+}
+
+# Размер пачки строк, читаемой из серверного курсора при выгрузке заказов
+ORDERS_EXPORT_CHUNK_SIZE = int(os.environ.get("ORDERS_EXPORT_CHUNK_SIZE", 2000))
+
+# Асинхронные версии эндпоинтов списка, поиска, просмотра и создания заказов (имеет смысл только под ASGI)
+ORDERS_ASYNC_API = os.environ.get("ORDERS_ASYNC_API", "").lower() in ("1", "true", "yes")
+
+# Возраст оплаты (в днях), после которого archive_orders переносит заказ в архивные таблицы
+ORDERS_ARCHIVE_AFTER_DAYS = int(os.environ.get("ORDERS_ARCHIVE_AFTER_DAYS", 90))
+
+# Лента изменений заказов для экранов кухни и зала (/api/orders/events/).
+# InProcessEventBackend подходит для одного процесса, DatabaseEventBackend - для нескольких воркеров.
+ORDERS_EVENTS = {
+    "BACKEND": os.environ.get("ORDERS_EVENTS_BACKEND", "orders.services.order_events.InProcessEventBackend"),
+    "OPTIONS": {"buffer_size": int(os.environ.get("ORDERS_EVENTS_BUFFER_SIZE", 1000))},
+}
+# Интервал комментария-пинга в потоке SSE и максимальное ожидание long poll, в секундах
+ORDERS_EVENTS_HEARTBEAT = int(os.environ.get("ORDERS_EVENTS_HEARTBEAT", 15))
+ORDERS_EVENTS_MAX_WAIT = int(os.environ.get("ORDERS_EVENTS_MAX_WAIT", 30))
+# Время жизни одного потока SSE: затем EventSource переподключается с Last-Event-ID и ничего не теряет
+ORDERS_EVENTS_STREAM_LIFETIME = int(os.environ.get("ORDERS_EVENTS_STREAM_LIFETIME", 300))
+
+# Схема OpenAPI, собранная командой build_api_schema; без файла (и при DEBUG) схема строится при первом запросе
+ORDERS_API_SCHEMA_FILE = os.environ.get("ORDERS_API_SCHEMA_FILE", str(BASE_DIR / "orders" / "api" / "openapi.json"))
+
 SPECTACULAR_SETTINGS = {
     'TITLE': 'Order Management System API',
     'DESCRIPTION': 'API для создания, редактирования, удаления и просмотра заказов.',
     'VERSION': '1.0.0',
     'SERVE_INCLUDE_SCHEMA': False,
+    # поля status с разными наборами значений: без явных имен перечисления называются по хэшу
+    'ENUM_NAME_OVERRIDES': {
+        'OrderStatusEnum': 'orders.models.Order.STATUS_CHOICES',
+        'StatusTransitionEnum': 'orders.services.status_service.STATUS_TRANSITION_CHOICES',
+    },
 }
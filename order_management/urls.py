@@ -1,12 +1,17 @@
 from django.contrib import admin
 from django.urls import path, include
-from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView, SpectacularRedocView
+from drf_spectacular.views import SpectacularSwaggerView, SpectacularRedocView
+
+from orders.api.schema import SchemaView
+from orders.views import metrics
+
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('orders/', include('orders.urls')),
     path('api/', include('orders.api.urls')),
-    path('api/schema/', SpectacularAPIView.as_view(), name='schema'),
+    path('metrics', metrics, name='metrics'),
+    path('api/schema/', SchemaView.as_view(), name='schema'),
     # Swagger UI
     path('api/docs/swagger/', SpectacularSwaggerView.as_view(url_name='schema'), name='swagger-ui'),
     # Redoc
@@ -1,27 +1,64 @@
+from typing import Any
+
+from django.conf import settings
 from django.db import transaction
+from django.http import HttpResponseBase, StreamingHttpResponse
+from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import extend_schema, OpenApiResponse, OpenApiParameter
 from rest_framework import status
 from rest_framework.request import Request
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from orders.api.serializers import OrderCreateSerializer, OrderSerializer, OrderUpdateSerializer
-from orders.models import Order, OrderItem
-from orders.services.order_service import OrderCreateService
+from orders.api.serializers import (
+    OrderCreateSerializer, OrderSerializer, OrderUpdateSerializer, RevenueFilterSerializer, RevenueReportSerializer,
+    OrderSearchSerializer, OrderBulkCreateResponseSerializer, ResponseCacheStatsSerializer,
+    OrderStatusTransitionSerializer, OrderStatusChangeSerializer, OrderBulkStatusSerializer,
+    OrderBulkStatusResponseSerializer, StatisticsFilterSerializer, StatisticsSerializer,
+)
+from orders.api.conditional import if_match_failed, not_modified, order_etag, set_validators
+from orders.api.pagination import PAGINATION_PARAMETERS, paginated_orders_response
+from orders.api.streaming import NDJSON_CONTENT_TYPE, MalformedRecord, chunked, iter_ndjson
+from orders.db_router import replica_reads
+from orders.models import ArchivedOrder, Order, OrderItem
+from orders.services.bulk_service import BulkResult, OrderBulkCreateService
+from orders.services.export_service import OrderExportService
+from orders.services.group_commit import group_commit
+from orders.services.order_queries import api_items_prefetch, filter_orders, orders_for_api
+from orders.services.order_service import OrderCreateService, OrderItemsDiffService
+from orders.services.response_cache import response_cache
+from orders.services.revenue_service import RevenueService, revenue_batch
+from orders.services.row_cache import order_rows
+from orders.services.statistics_service import PERIOD_CHOICES, current_statistics
+from orders.services.status_service import OrderStatusService, TransitionResult
+
+SEARCH_PARAMETERS = [
+    OpenApiParameter("status", str, description="Статус заказа", required=False),
+    OpenApiParameter("table_id", int, description="Номер стола", required=False),
+    OpenApiParameter("min_total", float, description="Минимальная сумма заказа", required=False),
+    OpenApiParameter("max_total", float, description="Максимальная сумма заказа", required=False),
+    OpenApiParameter("date_from", OpenApiTypes.DATE, description="Создан не раньше даты", required=False),
+    OpenApiParameter("date_to", OpenApiTypes.DATE, description="Создан не позже даты", required=False),
+    OpenApiParameter("dish_id", int, description="Содержит блюдо с этим id", required=False),
+    OpenApiParameter("dish", str, required=False,
+                     description="Содержит блюдо, в названии которого есть слова, начинающиеся так (с учетом словоформ)"),
+]
 
 
 class OrderListCreateAPIView(APIView):
     @extend_schema(
         summary="Просмотр заказов",
+        operation_id="orders_list",
         responses={
             201: OpenApiResponse(response=OrderSerializer),
-        }
+        },
+        parameters=PAGINATION_PARAMETERS,
     )
+    @replica_reads
     def get(self, request: Request) -> Response:
-        orders = Order.objects.all()
+        orders = orders_for_api()
 
-        serializer = OrderSerializer(orders, many=True)
-        return Response(serializer.data)
+        return paginated_orders_response(request, orders)
 
     @extend_schema(
         summary="Создание нового заказа",
@@ -36,28 +73,199 @@ class OrderListCreateAPIView(APIView):
         if not serializer.is_valid():
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+        table_number = serializer.validated_data["table_number"]
+        items_data = serializer.validated_data["items"]
+        if group_commit.enabled:
+            try:
+                order = group_commit.create_order(table_number, items_data)
+            except Exception as e:
+                return Response({"error": str(e.args[0])}, status=status.HTTP_400_BAD_REQUEST)
+            response = Response(OrderSerializer(order).data, status=status.HTTP_201_CREATED)
+            return set_validators(response, order_etag(order.id, order.version), order.updated_at)
+
         with transaction.atomic():
-            table_number = serializer.validated_data["table_number"]
-            items_data = serializer.validated_data["items"]
-            order: Order = Order.objects.create(table_number=table_number)
+            created: Order = Order.objects.create(table_number=table_number)
             try:
-                OrderCreateService().create_order_items(items_data, order)
+                OrderCreateService().create_order_items(items_data, created)
             except Exception as e:
                 transaction.set_rollback(True)
                 return Response({"error": str(e.args[0])}, status=status.HTTP_400_BAD_REQUEST)
 
-            return Response(OrderSerializer(order).data, status=status.HTTP_201_CREATED)
+            response = Response(OrderSerializer(created).data, status=status.HTTP_201_CREATED)
+            return set_validators(response, order_etag(created.id, created.version), created.updated_at)
+
+
+class OrderBulkCreateAPIView(APIView):
+    @extend_schema(
+        summary="Массовое создание заказов",
+        description=(
+            "Принимает JSON-массив заказов или поток NDJSON (Content-Type: application/x-ndjson), "
+            "по одному заказу в строке. Ошибочные записи не отменяют создание остальных."
+        ),
+        request=OrderCreateSerializer(many=True),
+        responses={
+            200: OpenApiResponse(response=OrderBulkCreateResponseSerializer, description="Результат по каждой записи"),
+            400: OpenApiResponse(description="Тело запроса не является массивом"),
+        }
+    )
+    def post(self, request: Request) -> Response:
+        if request.content_type.startswith(NDJSON_CONTENT_TYPE):
+            records = iter_ndjson(request.stream)
+        else:
+            records = request.data
+            if not isinstance(records, list):
+                return Response({"error": "Ожидается массив заказов"}, status=status.HTTP_400_BAD_REQUEST)
+
+        results: list[BulkResult] = []
+        for chunk in chunked(enumerate(records), settings.ORDERS_BULK_CHUNK_SIZE):
+            valid = []
+            for index, payload in chunk:
+                if isinstance(payload, MalformedRecord):
+                    results.append(BulkResult(index, errors={"error": payload.message}))
+                    continue
+                serializer = OrderCreateSerializer(data=payload)
+                if serializer.is_valid():
+                    valid.append((index, serializer.validated_data))
+                else:
+                    results.append(BulkResult(index, errors=serializer.errors))
+            results += OrderBulkCreateService.create_orders(valid)
+
+        results.sort(key=lambda result: result.index)
+        created = sum(1 for result in results if result.id is not None)
+        data = {"created": created, "failed": len(results) - created, "results": results}
+        return Response(OrderBulkCreateResponseSerializer(data).data)
+
+
+def _bulk_status_data(result: TransitionResult) -> dict[str, Any]:
+    return {
+        "status": result.status,
+        "changed": [{"status": result.status, **change._asdict()} for change in result.changed],
+        "conflicts": [{"id": order_id, "status": value} for order_id, value in result.conflicts.items()],
+        "missing": result.missing,
+    }
+
+
+class OrderStatusAPIView(APIView):
+    @extend_schema(
+        summary="Смена статуса заказа",
+        description=(
+            "Переводит заказ по цепочке pending → ready → paid одним условным UPDATE. "
+            "Если заказ уже в другом статусе (например, его изменил другой клиент), возвращается 409 "
+            "с текущим статусом."
+        ),
+        request=OrderStatusTransitionSerializer,
+        responses={
+            200: OpenApiResponse(response=OrderStatusChangeSerializer, description="Статус изменен"),
+            400: OpenApiResponse(description="Недопустимый статус"),
+            404: OpenApiResponse(description="Заказ не найден"),
+            409: OpenApiResponse(description="Заказ не в подходящем для перехода статусе"),
+        }
+    )
+    def post(self, request: Request, order_id: int) -> Response:
+        serializer = OrderStatusTransitionSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        result = OrderStatusService(serializer.validated_data["status"]).transition([order_id])
+        if result.missing:
+            return Response(
+                {"error": {"code": "order_not_found", "message": "Заказ не найден"}},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+        if result.conflicts:
+            return Response(
+                {"error": {
+                    "code": "status_conflict",
+                    "message": f"Заказ в статусе «{result.conflicts[order_id]}», переход невозможен",
+                    "status": result.conflicts[order_id],
+                }},
+                status=status.HTTP_409_CONFLICT,
+            )
+
+        change = result.changed[0]
+        response = Response(OrderStatusChangeSerializer({"status": result.status, **change._asdict()}).data)
+        return set_validators(response, order_etag(change.id, change.version), change.updated_at)
+
+
+class OrderBulkStatusAPIView(APIView):
+    @extend_schema(
+        operation_id="orders_status_bulk_create",
+        summary="Массовая смена статуса",
+        description=(
+            "Переводит в status заказы из списка ids или все подходящие заказы стола table_id "
+            "(например, все готовые заказы стола в paid) одним запросом к базе. "
+            "Заказы не в подходящем статусе перечисляются в conflicts, ненайденные - в missing."
+        ),
+        request=OrderBulkStatusSerializer,
+        responses={
+            200: OpenApiResponse(response=OrderBulkStatusResponseSerializer, description="Результат по заказам"),
+            400: OpenApiResponse(description="Ошибки валидации"),
+        }
+    )
+    def post(self, request: Request) -> Response:
+        serializer = OrderBulkStatusSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        service = OrderStatusService(serializer.validated_data["status"])
+        if "ids" in serializer.validated_data:
+            result = service.transition(serializer.validated_data["ids"])
+        else:
+            result = service.transition_table(serializer.validated_data["table_number"])
+        return Response(OrderBulkStatusResponseSerializer(_bulk_status_data(result)).data)
 
 
 class OrderDetailView(APIView):
+    @extend_schema(
+        summary="Просмотр заказа",
+        description="Поддерживает If-None-Match и If-Modified-Since: при неизменном заказе возвращается 304.",
+        responses={
+            200: OpenApiResponse(response=OrderSerializer),
+            304: OpenApiResponse(description="Заказ не изменился"),
+            404: OpenApiResponse(description="Заказ не найден"),
+        }
+    )
+    def get(self, request: Request, order_id: int) -> HttpResponseBase:
+        # для проверки ETag достаточно версии, сам заказ читается и сериализуется только при изменении
+        validators = Order.objects.filter(id=order_id).values_list("version", "updated_at").first()
+        if not validators:
+            return Response(
+                {"error": {"code": "order_not_found", "message": "Заказ не найден"}},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+
+        version, updated_at = validators
+        etag = order_etag(order_id, version)
+        cached = not_modified(request, etag, updated_at)
+        if cached is not None:
+            return cached
+
+        order = orders_for_api().prefetch_related(api_items_prefetch()).filter(id=order_id).first()
+        if not order:
+            return Response(
+                {"error": {"code": "order_not_found", "message": "Заказ не найден"}},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+        response = Response(OrderSerializer(order).data)
+        return set_validators(response, order_etag(order.id, order.version), order.updated_at)
+
     @extend_schema(
         summary="Изменение данных заказа",
+        description=(
+            "items заменяет состав заказа целиком (в базе меняются только отличающиеся строки), "
+            "item_changes добавляет (add), изменяет (update) и удаляет (remove) отдельные позиции."
+        ),
         request=OrderUpdateSerializer,
         responses={
             201: OpenApiResponse(response=OrderSerializer, description="Заказ успешно обновлен"),
             400: OpenApiResponse(description="Ошибки валидации"),
             404: OpenApiResponse(description="Заказ не найден"),
-        }
+            412: OpenApiResponse(description="Заказ изменен другим клиентом (If-Match не совпал)"),
+        },
+        parameters=[
+            OpenApiParameter("If-Match", str, OpenApiParameter.HEADER, required=False,
+                             description="ETag версии заказа, которую изменяет клиент"),
+        ]
     )
     def patch(self, request: Request, order_id: int) -> Response:
         serializer = OrderUpdateSerializer(data=request.data)
@@ -65,29 +273,39 @@ class OrderDetailView(APIView):
         if not serializer.is_valid():
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-        with transaction.atomic():
-            order = Order.objects.filter(id=order_id).first()
+        with transaction.atomic(), revenue_batch():
+            order = Order.objects.select_for_update().filter(id=order_id).first()
             if not order:
                 return Response(
                     {"error": {"code": "order_not_found", "message": "Заказ не найден"}},
                     status=status.HTTP_404_NOT_FOUND,
                 )
 
+            # проверяется под блокировкой строки, чтобы между сравнением и записью версия не изменилась
+            if if_match_failed(request, order_etag(order.id, order.version)):
+                return Response(
+                    {"error": {"code": "order_modified", "message": "Заказ был изменен, обновите данные"}},
+                    status=status.HTTP_412_PRECONDITION_FAILED,
+                )
+
             status_value = serializer.validated_data.get("status")
             if status_value:
                 order.status = status_value
-                order.save()
+                order.save(update_fields=["status"])
 
             items_data = serializer.validated_data.get("items", [])
-            if items_data:
-                order.items.all().delete()
-                try:
-                    OrderCreateService().create_order_items(items_data, order)
-                except Exception as e:
-                    transaction.set_rollback(True)
-                    return Response({"error": str(e.args[0])}, status=status.HTTP_400_BAD_REQUEST)
+            item_changes = serializer.validated_data.get("item_changes")
+            try:
+                if items_data:
+                    OrderItemsDiffService(order).replace(items_data)
+                elif item_changes:
+                    OrderItemsDiffService(order).apply_changes(**item_changes)
+            except Exception as e:
+                transaction.set_rollback(True)
+                return Response({"error": str(e.args[0])}, status=status.HTTP_400_BAD_REQUEST)
 
-            return Response(OrderSerializer(order).data, status=status.HTTP_200_OK)
+            response = Response(OrderSerializer(order).data, status=status.HTTP_200_OK)
+            return set_validators(response, order_etag(order.id, order.version), order.updated_at)
 
     @extend_schema(
         summary="Удаление заказа",
@@ -104,7 +322,7 @@ class OrderDetailView(APIView):
                 status=status.HTTP_404_NOT_FOUND,
             )
 
-        with transaction.atomic():
+        with transaction.atomic(), revenue_batch():
             OrderItem.objects.filter(order=order).delete()
             order.delete()
 
@@ -115,21 +333,107 @@ class OrderSearchAPIView(APIView):
     @extend_schema(
         summary="Поиск заказов",
         responses={200: OrderSerializer},
+        parameters=[*SEARCH_PARAMETERS, *PAGINATION_PARAMETERS]
+    )
+    @replica_reads
+    def get(self, request: Request) -> Response:
+        filters = OrderSearchSerializer(data=request.GET)
+        if not filters.is_valid():
+            return Response(filters.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        orders = filter_orders(orders_for_api(), **filters.validated_data)
+        return paginated_orders_response(request, orders, filters.validated_data)
+
+
+class OrderExportAPIView(APIView):
+    @extend_schema(
+        summary="Выгрузка истории заказов",
+        description=(
+            "Потоковая выгрузка заказов с блюдами в CSV (строка на позицию) или NDJSON (строка на заказ), "
+            "включая заказы, перенесенные в архив."
+        ),
+        responses={
+            (200, "text/csv"): OpenApiResponse(response=OpenApiTypes.STR),
+            (200, NDJSON_CONTENT_TYPE): OpenApiResponse(response=OpenApiTypes.STR),
+            400: OpenApiResponse(description="Ошибки валидации"),
+        },
+        parameters=[
+            OpenApiParameter("output", str, enum=OrderExportService.FORMATS, default="csv", required=False,
+                             description="Формат выгрузки"),
+            *SEARCH_PARAMETERS,
+        ]
+    )
+    def get(self, request: Request) -> HttpResponseBase:
+        filters = OrderSearchSerializer(data=request.GET)
+        if not filters.is_valid():
+            return Response(filters.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        output = request.GET.get("output", "csv")
+        if output not in OrderExportService.FORMATS:
+            return Response({"error": f"Неподдерживаемый формат выгрузки: {output}"},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        exporter = OrderExportService(
+            filter_orders(Order.objects.all(), **filters.validated_data),
+            chunk_size=settings.ORDERS_EXPORT_CHUNK_SIZE,
+            archived=filter_orders(ArchivedOrder.objects.all(), **filters.validated_data),
+        )
+        response = StreamingHttpResponse(exporter.stream(output), content_type=exporter.CONTENT_TYPES[output])
+        response["Content-Disposition"] = f'attachment; filename="orders.{output}"'
+        return response
+
+
+class RevenueReportAPIView(APIView):
+    @extend_schema(
+        summary="Отчет о выручке",
+        responses={
+            200: OpenApiResponse(response=RevenueReportSerializer),
+            400: OpenApiResponse(description="Ошибки валидации"),
+        },
         parameters=[
-            OpenApiParameter("status", str, description="Статус заказа", required=False),
-            OpenApiParameter("table_id", int, description="Номер стола", required=False),
+            OpenApiParameter("date_from", OpenApiTypes.DATE, description="Начало периода", required=False),
+            OpenApiParameter("date_to", OpenApiTypes.DATE, description="Конец периода", required=False),
         ]
     )
+    @replica_reads
     def get(self, request: Request) -> Response:
-        orders = Order.objects.all()
-        status_param = request.GET.get("status")
-        table_id = request.GET.get("table_id")
+        filters = RevenueFilterSerializer(data=request.GET)
+        if not filters.is_valid():
+            return Response(filters.errors, status=status.HTTP_400_BAD_REQUEST)
 
-        if table_id:
-            orders = orders.filter(table_number=table_id)
+        report = RevenueService.report(filters.validated_data.get("date_from"), filters.validated_data.get("date_to"))
+        return Response(RevenueReportSerializer(report).data)
 
-        if status_param:
-            orders = orders.filter(status=status_param)
 
-        serializer = OrderSerializer(orders, many=True)
-        return Response(serializer.data)
+class StatisticsAPIView(APIView):
+    @extend_schema(
+        summary="Операционная статистика",
+        description="Популярные блюда, средний чек, заказы по столам, время в статусах и очередь открытых заказов. "
+                    "Отдается последний снимок, пересчитываемый раз в ORDERS_STATISTICS_INTERVAL секунд.",
+        responses={
+            200: OpenApiResponse(response=StatisticsSerializer),
+            400: OpenApiResponse(description="Ошибки валидации"),
+        },
+        parameters=[
+            OpenApiParameter("period", str, enum=[choice for choice, _ in PERIOD_CHOICES], required=False,
+                             description="Период: сутки, 7 или 30 дней до момента расчета (по умолчанию day)"),
+        ]
+    )
+    @replica_reads
+    def get(self, request: Request) -> Response:
+        filters = StatisticsFilterSerializer(data=request.GET)
+        if not filters.is_valid():
+            return Response(filters.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(StatisticsSerializer(current_statistics(filters.validated_data["period"])).data)
+
+
+class ResponseCacheStatsAPIView(APIView):
+    @extend_schema(
+        summary="Статистика кэша списков заказов",
+        description="Счетчики попаданий, промахов, вытеснений и сбросов считаются в текущем процессе; "
+                    "в rows - строки HTML-списка, взятые из кэша и отрендеренные заново.",
+        responses={200: ResponseCacheStatsSerializer},
+    )
+    def get(self, request: Request) -> Response:
+        return Response(ResponseCacheStatsSerializer({**response_cache.stats(), "rows": order_rows.stats()}).data)
@@ -0,0 +1,144 @@
+from typing import Any, Callable, cast
+
+from asgiref.sync import sync_to_async
+from django.db import transaction
+from django.http import HttpResponseBase
+from rest_framework import status
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from orders.api.api_views import OrderDetailView
+from orders.api.conditional import not_modified, order_etag, set_validators
+from orders.api.pagination import apaginated_orders_response
+from orders.api.serializers import OrderCreateSerializer, OrderSearchSerializer, OrderSerializer
+from orders.db_router import replica_reads
+from orders.models import Order
+from orders.services.order_queries import api_items_prefetch, filter_orders, orders_for_api
+from orders.services.order_service import ItemNotFoundError, OrderCreateService, aresolve_items
+
+# Асинхронные версии эндпоинтов списка, поиска, просмотра и создания заказов.
+# Ответы совпадают с ответами APIView из api_views.py байт в байт; выбор стека - настройка ORDERS_ASYNC_API.
+
+
+class AsyncAPIView(APIView):
+    """APIView с асинхронными обработчиками.
+
+    Как и в APIView.dispatch, запрос проходит аутентификацию, проверку прав, ограничение частоты
+    и выбор формата ответа, а ошибки обрабатываются exception handler'ом DRF, поэтому поведение API
+    не зависит от ORDERS_ASYNC_API. Проверки могут читать базу (сессии, пользователи) и выполняются
+    синхронно в потоке.
+    """
+
+    async def dispatch(self, request: Any, *args: Any, **kwargs: Any) -> HttpResponseBase:
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+            method = request.method.lower()
+            handler = getattr(self, method, None) if method in self.http_method_names else None
+            if handler is None:
+                handler = cast(Callable[..., Any], self.http_method_not_allowed)
+            response = handler(request, *args, **kwargs)
+            if not isinstance(response, HttpResponseBase):
+                # options и http_method_not_allowed унаследованы синхронными
+                response = await response
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+
+def _not_found() -> Response:
+    return Response(
+        {"error": {"code": "order_not_found", "message": "Заказ не найден"}},
+        status=status.HTTP_404_NOT_FOUND,
+    )
+
+
+def _create_order(table_number: int, items_data: list[dict[str, Any]]) -> tuple[Order, dict[str, Any]]:
+    # транзакции в асинхронном коде Django не поддерживаются, поэтому запись идет одним синхронным вызовом
+    with transaction.atomic():
+        order = Order.objects.create(table_number=table_number)
+        OrderCreateService().create_order_items(items_data, order)
+        return order, OrderSerializer(order).data
+
+
+class AsyncOrderListCreateView(AsyncAPIView):
+    @replica_reads
+    async def get(self, request: Request) -> HttpResponseBase:
+        return await apaginated_orders_response(request, orders_for_api())
+
+    async def post(self, request: Request) -> HttpResponseBase:
+        serializer = OrderCreateSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        items_data = serializer.validated_data["items"]
+        try:
+            # блюда проверяются и попадают в кэш до транзакции, внутри нее запросов к блюдам уже не будет
+            await aresolve_items(item["item_id"] for item in items_data)
+        except ItemNotFoundError as e:
+            return Response({"error": e.message}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            order, data = await sync_to_async(_create_order)(serializer.validated_data["table_number"], items_data)
+        except Exception as e:
+            return Response({"error": str(e.args[0])}, status=status.HTTP_400_BAD_REQUEST)
+
+        response = Response(data, status=status.HTTP_201_CREATED)
+        return set_validators(response, order_etag(order.id, order.version), order.updated_at)
+
+
+class AsyncOrderSearchView(AsyncAPIView):
+    @replica_reads
+    async def get(self, request: Request) -> HttpResponseBase:
+        filters = OrderSearchSerializer(data=request.GET)
+        if not filters.is_valid():
+            return Response(filters.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        if filters.validated_data.get("dish"):
+            # поиск по названию блюда сначала читает id блюд, это синхронный запрос
+            orders = await sync_to_async(filter_orders)(orders_for_api(), **filters.validated_data)
+        else:
+            orders = filter_orders(orders_for_api(), **filters.validated_data)
+        return await apaginated_orders_response(request, orders, filters.validated_data)
+
+
+class AsyncOrderDetailView(AsyncAPIView):
+    async def get(self, request: Request, order_id: int) -> HttpResponseBase:
+        validators = await Order.objects.filter(id=order_id).values_list("version", "updated_at").afirst()
+        if not validators:
+            return _not_found()
+
+        version, updated_at = validators
+        cached = not_modified(request, order_etag(order_id, version), updated_at)
+        if cached is not None:
+            return cached
+
+        orders = orders_for_api().prefetch_related(api_items_prefetch()).filter(id=order_id)
+        rows = [order async for order in orders.aiterator(chunk_size=1)]
+        if not rows:
+            return _not_found()
+        order = rows[0]
+
+        response = Response(OrderSerializer(order).data)
+        return set_validators(response, order_etag(order.id, order.version), order.updated_at)
+
+    async def patch(self, request: Request, order_id: int) -> HttpResponseBase:
+        return await sync_to_async(self._sync_handler)("patch", request, order_id)
+
+    async def delete(self, request: Request, order_id: int) -> HttpResponseBase:
+        return await sync_to_async(self._sync_handler)("delete", request, order_id)
+
+    def _sync_handler(self, method: str, request: Request, order_id: int) -> HttpResponseBase:
+        # изменение и удаление целиком выполняются в транзакции, поэтому их выполняет обработчик
+        # синхронного OrderDetailView; проверки DRF уже пройдены в dispatch
+        view = OrderDetailView(request=request, args=self.args, kwargs=self.kwargs,
+                               format_kwarg=self.format_kwarg, headers=self.headers)
+        return getattr(view, method)(request, order_id=order_id)
@@ -0,0 +1,48 @@
+import hashlib
+from datetime import datetime
+from typing import Iterable, Optional
+
+from django.http import HttpResponseBase
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_etags, quote_etag
+from rest_framework.request import Request
+
+from orders.models import Order
+
+
+def order_etag(order_id: int, version: int) -> str:
+    return quote_etag(f"{order_id}-{version}")
+
+
+def orders_etag(orders: Iterable[Order], *extra: Optional[str]) -> str:
+    digest = hashlib.sha1()
+    for order in orders:
+        digest.update(f"{order.id}-{order.version};".encode())
+    for value in extra:
+        digest.update(f"{value or ''};".encode())
+    return quote_etag(digest.hexdigest())
+
+
+def not_modified(request: Request, etag: str, last_modified: Optional[datetime]) -> Optional[HttpResponseBase]:
+    """Ответ 304 (или 412), если условный GET клиента совпал с текущей версией, иначе None."""
+    timestamp = int(last_modified.timestamp()) if last_modified else None
+    response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+    if response is not None:
+        set_validators(response, etag, last_modified)
+    return response
+
+
+def if_match_failed(request: Request, etag: str) -> bool:
+    header = request.headers.get("If-Match")
+    if not header:
+        return False
+    etags = parse_etags(header)
+    # If-Match использует строгое сравнение: слабые ETag не совпадают никогда
+    return etags != ["*"] and etag not in etags
+
+
+def set_validators(response: HttpResponseBase, etag: str, last_modified: Optional[datetime]) -> HttpResponseBase:
+    response["ETag"] = etag
+    if last_modified:
+        response["Last-Modified"] = http_date(last_modified.timestamp())
+    return response
@@ -0,0 +1,127 @@
+import json
+import time
+from typing import Any, AsyncIterator, Iterator, Optional
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponseBase, StreamingHttpResponse
+from drf_spectacular.utils import OpenApiResponse, extend_schema
+from rest_framework import status
+from rest_framework.renderers import BaseRenderer
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+from orders.api.async_views import AsyncAPIView
+from orders.api.serializers import OrderEventFilterSerializer
+from orders.services.order_events import Event, InProcessEventBackend, event_backend
+
+SSE_CONTENT_TYPE = "text/event-stream"
+
+
+class EventStreamRenderer(BaseRenderer):
+    """Формат text/event-stream для выбора ответа; сам поток отдается StreamingHttpResponse, а так рендерятся ошибки."""
+
+    media_type = SSE_CONTENT_TYPE
+    format = "sse"
+    charset = "utf-8"
+
+    def render(self, data: Any, accepted_media_type: Optional[str] = None,
+               renderer_context: Optional[dict[str, Any]] = None) -> bytes:
+        return f"event: error\ndata: {json.dumps(data, ensure_ascii=False)}\n\n".encode()
+
+
+def _chunks(events: list[Event], status_: Optional[str], table_number: Optional[int]) -> list[str]:
+    if not events:
+        # комментарий не дает прокси закрыть простаивающее соединение
+        return [": keepalive\n\n"]
+    return [
+        f"id: {event.id}\nevent: {event.kind}\ndata: {json.dumps(event.as_dict())}\n\n"
+        for event in events if event.matches(status_, table_number)
+    ]
+
+
+def _timeout(deadline: float) -> float:
+    return max(0.0, min(settings.ORDERS_EVENTS_HEARTBEAT, deadline - time.monotonic()))
+
+
+async def _astream(backend: InProcessEventBackend, last_id: int, status_: Optional[str],
+                   table_number: Optional[int]) -> AsyncIterator[str]:
+    deadline = time.monotonic() + settings.ORDERS_EVENTS_STREAM_LIFETIME
+    yield "retry: 3000\n\n"
+    while time.monotonic() < deadline:
+        events = await backend.await_events(last_id, _timeout(deadline))
+        for chunk in _chunks(events, status_, table_number):
+            yield chunk
+        if events:
+            last_id = events[-1].id
+
+
+def _stream(backend: InProcessEventBackend, last_id: int, status_: Optional[str],
+            table_number: Optional[int]) -> Iterator[str]:
+    # под WSGI поток занимает поток воркера до конца соединения
+    deadline = time.monotonic() + settings.ORDERS_EVENTS_STREAM_LIFETIME
+    yield "retry: 3000\n\n"
+    while time.monotonic() < deadline:
+        events = backend.wait(last_id, _timeout(deadline))
+        yield from _chunks(events, status_, table_number)
+        if events:
+            last_id = events[-1].id
+
+
+class OrderEventsView(AsyncAPIView):
+    """Лента изменений заказов: поток SSE (Accept: text/event-stream) или long poll в JSON.
+
+    Под ASGI ожидание асинхронное и простаивающий экран не занимает поток. Под WSGI (runserver)
+    поток SSE держит поток воркера до ORDERS_EVENTS_STREAM_LIFETIME, поэтому страницы приложения
+    пользуются long poll.
+    """
+
+    renderer_classes = [*api_settings.DEFAULT_RENDERER_CLASSES, EventStreamRenderer]
+
+    @extend_schema(
+        summary="Лента изменений заказов",
+        description=(
+            "С заголовком Accept: text/event-stream отдает поток SSE, иначе - long poll: "
+            "события после last_event_id или пустой список через wait секунд."
+        ),
+        parameters=[OrderEventFilterSerializer],
+        responses={
+            200: OpenApiResponse(description="События после last_event_id"),
+            400: OpenApiResponse(description="Некорректные параметры"),
+        },
+    )
+    async def get(self, request: Request) -> HttpResponseBase:
+        data = request.query_params.copy()
+        if request.headers.get("Last-Event-ID"):
+            # EventSource передает заголовок при переподключении
+            data["last_event_id"] = request.headers["Last-Event-ID"]
+        filters = OrderEventFilterSerializer(data=data)
+        if not filters.is_valid():
+            return Response(filters.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        backend = event_backend()
+        last_id = filters.validated_data.get("last_event_id")
+        if last_id is None:
+            last_id = await sync_to_async(backend.latest_id)()
+        status_ = filters.validated_data.get("status")
+        table_number = filters.validated_data.get("table_number")
+
+        if isinstance(request.accepted_renderer, EventStreamRenderer):
+            # WSGI не умеет отдавать асинхронный итератор: Django собрал бы бесконечный поток в список
+            if isinstance(request._request, ASGIRequest):
+                stream: Any = _astream(backend, last_id, status_, table_number)
+            else:
+                stream = _stream(backend, last_id, status_, table_number)
+            response = StreamingHttpResponse(stream, content_type=SSE_CONTENT_TYPE)
+            response["Cache-Control"] = "no-cache"
+            response["X-Accel-Buffering"] = "no"
+            return response
+
+        wait = min(filters.validated_data.get("wait", settings.ORDERS_EVENTS_MAX_WAIT), settings.ORDERS_EVENTS_MAX_WAIT)
+        events = await backend.await_events(last_id, wait)
+        return Response({
+            "last_event_id": events[-1].id if events else last_id,
+            "events": [event.as_dict() for event in events if event.matches(status_, table_number)],
+        })
@@ -0,0 +1,88 @@
+from collections import defaultdict
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Iterable, Optional, Protocol, Sequence
+
+from asgiref.sync import sync_to_async
+from django.db.models import QuerySet
+from django.utils import timezone
+
+from orders.models import Order, OrderItem
+from orders.services.order_queries import ORDER_LIST_FIELDS
+
+# Быстрое чтение для списков: тот же JSON, что у OrderSerializer, но собирается из строк
+# values_list без моделей и без вызова полей сериализатора для каждого значения.
+# Совпадение с OrderSerializer байт в байт проверяется в test_fast_serializers.py.
+
+_CENTS = Decimal("0.01")
+_ITEM_FIELDS = ("order_id", "item_id", "price", "id")
+
+
+class OrderRow(Protocol):
+    """Поля заказа, которые нужны списку: строка order_rows() или модель Order."""
+    id: int
+    table_number: int
+    status: str
+    total_price: Decimal
+    created_at: datetime
+    paid_at: Optional[datetime]
+
+
+def order_rows(orders: QuerySet[Order]) -> QuerySet:
+    """Строки заказов с доступом к полям по атрибуту, пригодные для KeysetPaginator и orders_etag."""
+    return orders.values_list(*ORDER_LIST_FIELDS, named=True)
+
+
+def _decimal(value: Decimal) -> str:
+    # как DecimalField(decimal_places=2) в DRF: фиксированные два знака без экспоненты
+    return f"{value.quantize(_CENTS):f}"
+
+
+def _datetime(value: Optional[datetime]) -> Optional[str]:
+    # как DateTimeField в DRF: текущий часовой пояс, ISO 8601, UTC записывается как Z
+    if value is None:
+        return None
+    text = timezone.localtime(value).isoformat()
+    return text[:-6] + "Z" if text.endswith("+00:00") else text
+
+
+def _items_query(order_ids: list[Any]) -> QuerySet:
+    return OrderItem.objects.filter(order_id__in=order_ids).order_by("id").values_list(*_ITEM_FIELDS)
+
+
+def _fetch_items(order_ids: list[Any]) -> list[tuple]:
+    return list(_items_query(order_ids))
+
+
+def _build(rows: Sequence[OrderRow], items: Iterable[tuple]) -> list[dict[str, Any]]:
+    items_by_order: defaultdict[int, list[dict[str, Any]]] = defaultdict(list)
+    for order_id, item_id, price, line_id in items:
+        items_by_order[order_id].append({"item_id": item_id, "price": _decimal(price), "id": line_id})
+
+    return [
+        {
+            "id": row.id,
+            "table_number": row.table_number,
+            "status": row.status,
+            "total_price": _decimal(row.total_price),
+            "created_at": _datetime(row.created_at),
+            "paid_at": _datetime(row.paid_at),
+            "items": items_by_order.get(row.id, []),
+        }
+        for row in rows
+    ]
+
+
+def serialize_orders(rows: Sequence[OrderRow]) -> list[dict[str, Any]]:
+    if not rows:
+        return []
+    return _build(rows, _items_query([row.id for row in rows]))
+
+
+async def aserialize_orders(rows: Sequence[OrderRow]) -> list[dict[str, Any]]:
+    if not rows:
+        return []
+    # не aiterator(): итератор values_list без named=True выполняет запрос уже при создании,
+    # то есть в потоке цикла событий
+    items = await sync_to_async(_fetch_items)([row.id for row in rows])
+    return _build(rows, items)
@@ -0,0 +1,163 @@
+from datetime import datetime
+from typing import Any, Optional
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import QuerySet, prefetch_related_objects
+from django.http import HttpRequest, HttpResponse, HttpResponseBase
+from drf_spectacular.utils import OpenApiParameter
+from rest_framework import status
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+from orders.api.conditional import not_modified, orders_etag, set_validators
+from orders.api.fast_serializers import aserialize_orders, order_rows, serialize_orders
+from orders.api.serializers import OrderSerializer
+from orders.db_router import read_alias
+from orders.models import Order
+from orders.services.order_queries import api_items_prefetch
+from orders.services.pagination import KeysetPaginator, Page
+from orders.services.response_cache import response_cache
+
+PAGINATION_PARAMETERS = [
+    OpenApiParameter("cursor", str, description="Курсор страницы из заголовка Link", required=False),
+    OpenApiParameter("page_size", int, description="Размер страницы", required=False),
+    OpenApiParameter(
+        "ordering", str, required=False,
+        description="Сортировка: " + ", ".join(f"{key}, -{key}" for key in KeysetPaginator.SORT_KEYS),
+    ),
+]
+
+
+def _paginator(request: HttpRequest) -> KeysetPaginator:
+    return KeysetPaginator(
+        ordering=request.GET.get("ordering"),
+        page_size=request.GET.get("page_size"),
+        cursor=request.GET.get("cursor"),
+    )
+
+
+def _set_links(request: HttpRequest, response: HttpResponseBase, next_cursor: Optional[str],
+               previous_cursor: Optional[str]) -> None:
+    # курсоры отдаются в заголовке Link (RFC 8288), тело остается списком заказов
+    url = request.build_absolute_uri()
+    links = [
+        f'<{replace_query_param(url, "cursor", cursor)}>; rel="{rel}"'
+        for rel, cursor in (("next", next_cursor), ("prev", previous_cursor))
+        if cursor
+    ]
+    if links:
+        response["Link"] = ", ".join(links)
+
+
+def _cache_params(request: HttpRequest, paginator: KeysetPaginator, filters: dict[str, Any]) -> dict[str, Any]:
+    # нормализованные параметры: одинаковые по смыслу запросы попадают в одну запись кэша
+    return {
+        # ответы реплики и основной базы не смешиваются: иначе клиент мог бы получить из кэша
+        # ответ реплики сразу после своей записи
+        "source": read_alias(),
+        "filters": {key: value for key, value in filters.items() if value not in (None, "")},
+        "ordering": paginator.ordering,
+        "page_size": paginator.page_size,
+        "cursor": request.GET.get("cursor") or None,
+    }
+
+
+def _cacheable() -> bool:
+    # реплика может еще не видеть последней записи: такой ответ, сохраненный под новым поколением,
+    # отдавался бы из кэша и после окна DATABASE_REPLICA_STALENESS, в том числе самому писавшему клиенту
+    if read_alias() == DEFAULT_DB_ALIAS:
+        return True
+    return not response_cache.changed_within(settings.DATABASE_REPLICA_STALENESS)
+
+
+def _page_entry(page: Page, etag: str, last_modified: Optional[datetime], data: Any) -> dict[str, Any]:
+    return {
+        "data": data,
+        "etag": etag,
+        "last_modified": last_modified,
+        "next_cursor": page.next_cursor,
+        "previous_cursor": page.previous_cursor,
+    }
+
+
+def _validators(page: Page) -> tuple[str, Optional[datetime]]:
+    etag = orders_etag(page.items, page.next_cursor, page.previous_cursor)
+    return etag, max((order.updated_at for order in page.items), default=None)
+
+
+def _entry_response(request: HttpRequest, response: HttpResponseBase, entry: dict[str, Any]) -> HttpResponseBase:
+    set_validators(response, entry["etag"], entry["last_modified"])
+    _set_links(request, response, entry["next_cursor"], entry["previous_cursor"])
+    return response
+
+
+def paginated_orders_response(request: Request, orders: QuerySet[Order],
+                              filters: Optional[dict[str, Any]] = None) -> HttpResponseBase:
+    """Страница заказов; filters - уже проверенные фильтры запроса, из них строится ключ кэша."""
+    try:
+        paginator = _paginator(request)
+    except ValueError as e:
+        return Response({"error": str(e.args[0])}, status=status.HTTP_400_BAD_REQUEST)
+
+    key = entry = None
+    if response_cache.enabled:
+        key, entry = response_cache.get(_cache_params(request, paginator, filters or {}))
+    if entry is None:
+        fast = settings.ORDERS_FAST_SERIALIZATION
+        page = paginator.paginate(order_rows(orders) if fast else orders)
+        etag, last_modified = _validators(page)
+        cached = not_modified(request, etag, last_modified)
+        if cached is not None:
+            return cached
+
+        if fast:
+            data = serialize_orders(page.items)
+        else:
+            prefetch_related_objects(page.items, api_items_prefetch())
+            data = OrderSerializer(page.items, many=True).data
+        entry = _page_entry(page, etag, last_modified, data)
+        if key is not None and _cacheable():
+            response_cache.set(key, entry)
+    else:
+        cached = not_modified(request, entry["etag"], entry["last_modified"])
+        if cached is not None:
+            return cached
+    return _entry_response(request, Response(entry["data"]), entry)
+
+
+async def apaginated_orders_response(request: Request, orders: QuerySet[Order],
+                                     filters: Optional[dict[str, Any]] = None) -> HttpResponseBase:
+    """Асинхронный вариант: страница и позиции читаются через aiterator."""
+    try:
+        paginator = _paginator(request)
+    except ValueError as e:
+        return Response({"error": str(e.args[0])}, status=status.HTTP_400_BAD_REQUEST)
+
+    key = entry = None
+    if response_cache.enabled:
+        key, entry = await sync_to_async(response_cache.get)(_cache_params(request, paginator, filters or {}))
+    if entry is None:
+        fast = settings.ORDERS_FAST_SERIALIZATION
+        page = await paginator.apaginate(order_rows(orders) if fast else orders.prefetch_related(api_items_prefetch()))
+        etag, last_modified = _validators(page)
+        cached = not_modified(request, etag, last_modified)
+        if cached is not None:
+            return cached
+
+        data = await aserialize_orders(page.items) if fast else OrderSerializer(page.items, many=True).data
+        entry = _page_entry(page, etag, last_modified, data)
+        if key is not None and await sync_to_async(_cacheable)():
+            await sync_to_async(response_cache.set)(key, entry)
+    else:
+        cached = not_modified(request, entry["etag"], entry["last_modified"])
+        if cached is not None:
+            return cached
+    return _entry_response(request, Response(entry["data"]), entry)
+
+
+def json_response(data: Any, status: int = status.HTTP_200_OK) -> HttpResponse:
+    return HttpResponse(JSONRenderer().render(data), status=status, content_type="application/json")
@@ -0,0 +1,125 @@
+import gzip
+import hashlib
+import json
+import threading
+from pathlib import Path
+from typing import Any, NamedTuple, Optional
+
+from django.conf import settings
+from django.http import HttpRequest, HttpResponse, HttpResponseBase
+from django.urls import include, path
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import quote_etag
+from django.views import View
+from drf_spectacular.generators import SchemaGenerator
+from drf_spectacular.renderers import OpenApiJsonRenderer, OpenApiYamlRenderer
+
+from orders.api.urls import sync_urlpatterns
+
+# Схема OpenAPI строится один раз на процесс (или берется из файла, собранного командой
+# build_api_schema) и отдается готовыми байтами с ETag и gzip. Код меняется только с перезапуском
+# процесса, поэтому схема в памяти не устаревает; устаревший файл ловит test_api_schema.
+
+
+class SchemaURLConf:
+    # схема строится по синхронным APIView: асинхронные представления отдают те же ответы
+    urlpatterns = [path('api/', include(sync_urlpatterns))]
+
+
+def generate_schema() -> dict[str, Any]:
+    """Схема по текущему коду представлений, в том виде, в каком она лежит в JSON-файле."""
+    schema = SchemaGenerator(urlconf=SchemaURLConf).get_schema(request=None, public=True)
+    return json.loads(render_json(schema))
+
+
+def render_json(schema: dict[str, Any]) -> bytes:
+    return OpenApiJsonRenderer().render(schema, renderer_context={})
+
+
+class SchemaBody(NamedTuple):
+    content_type: str
+    content: bytes
+    gzipped: bytes
+    etag: str
+
+    def representation(self, gzipped: bool) -> tuple[bytes, str]:
+        # у сжатого и несжатого тела разные ETag: это разные байты
+        if gzipped:
+            return self.gzipped, quote_etag(f"{self.etag}-gzip")
+        return self.content, quote_etag(self.etag)
+
+
+def _body(content_type: str, content: bytes) -> SchemaBody:
+    # mtime=0: одинаковое содержимое сжимается в одинаковые байты
+    return SchemaBody(content_type, content, gzip.compress(content, mtime=0), hashlib.sha1(content).hexdigest())
+
+
+class PrecomputedSchema:
+    FORMATS = {
+        "yaml": "application/vnd.oai.openapi; charset=utf-8",
+        "json": "application/vnd.oai.openapi+json",
+    }
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._bodies: Optional[dict[str, SchemaBody]] = None
+        self.source: Optional[str] = None
+
+    @property
+    def file(self) -> Optional[Path]:
+        file = settings.ORDERS_API_SCHEMA_FILE
+        return Path(file) if file else None
+
+    def load(self) -> dict[str, Any]:
+        # при DEBUG файл не читается: в разработке схема должна совпадать с кодом, а не с последней сборкой
+        if self.file is not None and self.file.exists() and not settings.DEBUG:
+            self.source = str(self.file)
+            return json.loads(self.file.read_bytes())
+        self.source = "generated"
+        return generate_schema()
+
+    def body(self, fmt: str) -> SchemaBody:
+        if self._bodies is None:
+            with self._lock:
+                if self._bodies is None:
+                    schema = self.load()
+                    self._bodies = {
+                        "json": _body(self.FORMATS["json"], render_json(schema)),
+                        "yaml": _body(self.FORMATS["yaml"], OpenApiYamlRenderer().render(schema, renderer_context={})),
+                    }
+        return self._bodies[fmt]
+
+    def reset(self) -> None:
+        with self._lock:
+            self._bodies = None
+            self.source = None
+
+
+api_schema = PrecomputedSchema()
+
+
+def _format(request: HttpRequest) -> str:
+    # как в SpectacularAPIView: ?format=json или Accept с json, по умолчанию YAML
+    requested = request.GET.get("format", "")
+    if requested:
+        return "json" if "json" in requested else "yaml"
+    return "json" if "json" in request.headers.get("Accept", "") else "yaml"
+
+
+class SchemaView(View):
+    def get(self, request: HttpRequest) -> HttpResponseBase:
+        fmt = _format(request)
+        body = api_schema.body(fmt)
+        gzipped = "gzip" in request.headers.get("Accept-Encoding", "")
+        content, etag = body.representation(gzipped)
+
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = HttpResponse(content, content_type=body.content_type)
+            if gzipped:
+                response["Content-Encoding"] = "gzip"
+            title = settings.SPECTACULAR_SETTINGS["TITLE"]
+            response["Content-Disposition"] = f'inline; filename="{title}.{fmt}"'
+        response["ETag"] = etag
+        patch_vary_headers(response, ["Accept", "Accept-Encoding"])
+        return response
@@ -2,6 +2,8 @@ from django.core.validators import MinValueValidator, MaxValueValidator
 from rest_framework import serializers
 
 from orders.models import Order, OrderItem
+from orders.services.statistics_service import PERIOD_CHOICES
+from orders.services.status_service import STATUS_TRANSITION_CHOICES
 
 
 class OrderItemCreateSerializer(serializers.Serializer):
@@ -21,12 +23,17 @@ class OrderCreateSerializer(serializers.Serializer):
     items = OrderItemCreateSerializer(many=True)
 
 
+class OrderItemSerializer(OrderItemCreateSerializer):
+    id = serializers.IntegerField(read_only=True)
+
+
 class OrderSerializer(serializers.ModelSerializer):
-    items = OrderItemCreateSerializer(many=True)
+    items = OrderItemSerializer(many=True)
 
     class Meta:
         model = Order
-        fields = ["id", "table_number", "status", "items"]
+        fields = ["id", "table_number", "status", "total_price", "created_at", "paid_at", "items"]
+        read_only_fields = ["total_price", "created_at", "paid_at"]
 
 
 class OrderItemUpdateSerializer(serializers.ModelSerializer):
@@ -35,10 +42,235 @@ class OrderItemUpdateSerializer(serializers.ModelSerializer):
         fields = ['item', 'price']
 
 
+class OrderItemChangeSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    item_id = serializers.IntegerField(required=False)
+    price = serializers.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        required=False,
+        validators=[
+            MinValueValidator(0.01),
+            MaxValueValidator(10_000_000)
+        ]
+    )
+
+
+class OrderItemChangesSerializer(serializers.Serializer):
+    add = OrderItemCreateSerializer(many=True, required=False, default=list)
+    update = OrderItemChangeSerializer(many=True, required=False, default=list)
+    remove = serializers.ListField(child=serializers.IntegerField(), required=False, default=list)
+
+    def validate(self, attrs):
+        updated_ids = [line["id"] for line in attrs["update"]]
+        if len(set(updated_ids)) != len(updated_ids):
+            raise serializers.ValidationError("Позиция заказа изменена несколько раз.")
+        if set(updated_ids) & set(attrs["remove"]):
+            raise serializers.ValidationError("Позиция заказа одновременно изменяется и удаляется.")
+        return attrs
+
+
 class OrderUpdateSerializer(serializers.Serializer):
-    items = OrderItemCreateSerializer(many=True)
-    status = serializers.ChoiceField(choices=Order.STATUS_CHOICES)
+    items = OrderItemCreateSerializer(many=True, required=False)
+    item_changes = OrderItemChangesSerializer(required=False)
+    status = serializers.ChoiceField(choices=Order.STATUS_CHOICES, required=False)
+
+    def validate(self, attrs):
+        if attrs.get("items") and "item_changes" in attrs:
+            raise serializers.ValidationError("Укажите либо полный список блюд (items), либо изменения (item_changes).")
+        return attrs
+
+
+class OrderSearchSerializer(serializers.Serializer):
+    status = serializers.CharField(required=False, allow_blank=True)
+    table_id = serializers.IntegerField(required=False, source="table_number")
+    min_total = serializers.DecimalField(max_digits=12, decimal_places=2, required=False, min_value=0)
+    max_total = serializers.DecimalField(max_digits=12, decimal_places=2, required=False, min_value=0)
+    date_from = serializers.DateField(required=False)
+    date_to = serializers.DateField(required=False)
+    dish_id = serializers.IntegerField(required=False, min_value=1, source="item_id")
+    dish = serializers.CharField(required=False, allow_blank=True, max_length=100)
+
+
+class OrderEventFilterSerializer(serializers.Serializer):
+    status = serializers.ChoiceField(choices=Order.STATUS_CHOICES, required=False)
+    table_id = serializers.IntegerField(required=False, source="table_number")
+    last_event_id = serializers.IntegerField(required=False, min_value=0)
+    wait = serializers.IntegerField(required=False, min_value=0)
+
+
+class OrderBulkResultSerializer(serializers.Serializer):
+    index = serializers.IntegerField()
+    id = serializers.IntegerField(allow_null=True)
+    errors = serializers.JSONField(allow_null=True)
+
+
+class OrderBulkCreateResponseSerializer(serializers.Serializer):
+    created = serializers.IntegerField()
+    failed = serializers.IntegerField()
+    results = OrderBulkResultSerializer(many=True)
+
+
+class OrderStatusTransitionSerializer(serializers.Serializer):
+    status = serializers.ChoiceField(choices=STATUS_TRANSITION_CHOICES)
+
+
+class OrderBulkStatusSerializer(OrderStatusTransitionSerializer):
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1), required=False, allow_empty=False, max_length=1000
+    )
+    table_id = serializers.IntegerField(required=False, min_value=1, source="table_number")
+
+    def validate(self, attrs):
+        if ("ids" in attrs) == ("table_number" in attrs):
+            raise serializers.ValidationError("Укажите либо список заказов (ids), либо номер стола (table_id).")
+        return attrs
+
+
+class OrderStatusChangeSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    table_number = serializers.IntegerField()
+    status = serializers.CharField()
+    paid_at = serializers.DateTimeField(allow_null=True)
+    version = serializers.IntegerField()
+
+
+class OrderStatusConflictSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    status = serializers.CharField()
+
+
+class OrderBulkStatusResponseSerializer(serializers.Serializer):
+    status = serializers.CharField()
+    changed = OrderStatusChangeSerializer(many=True)
+    conflicts = OrderStatusConflictSerializer(many=True)
+    missing = serializers.ListField(child=serializers.IntegerField())
 
 
 class OrderDeleteSerializer(serializers.Serializer):
     order_id = serializers.IntegerField()
+
+
+class RevenueFilterSerializer(serializers.Serializer):
+    date_from = serializers.DateField(required=False)
+    date_to = serializers.DateField(required=False)
+
+
+class RevenueBucketSerializer(serializers.Serializer):
+    total_revenue = serializers.DecimalField(max_digits=14, decimal_places=2)
+    total_quantity = serializers.IntegerField()
+
+
+class RevenueByDaySerializer(RevenueBucketSerializer):
+    day = serializers.DateField()
+
+
+class RevenueByHourSerializer(RevenueBucketSerializer):
+    hour = serializers.IntegerField()
+
+
+class RevenueByTableSerializer(RevenueBucketSerializer):
+    table_number = serializers.IntegerField()
+
+
+class RevenueByItemSerializer(RevenueBucketSerializer):
+    item_id = serializers.IntegerField()
+    name = serializers.CharField(source="item__name")
+
+
+class RevenueReportSerializer(serializers.Serializer):
+    total_revenue = serializers.DecimalField(max_digits=14, decimal_places=2)
+    total_quantity = serializers.IntegerField()
+    by_day = RevenueByDaySerializer(many=True)
+    by_hour = RevenueByHourSerializer(many=True)
+    by_table = RevenueByTableSerializer(many=True)
+    by_item = RevenueByItemSerializer(many=True)
+
+
+class StatisticsFilterSerializer(serializers.Serializer):
+    period = serializers.ChoiceField(choices=PERIOD_CHOICES, default="day")
+
+
+class StatisticsDishSerializer(serializers.Serializer):
+    rank = serializers.IntegerField()
+    item_id = serializers.IntegerField()
+    name = serializers.CharField()
+    quantity = serializers.IntegerField()
+    share = serializers.FloatField()
+    revenue = serializers.DecimalField(max_digits=14, decimal_places=2)
+
+
+class StatisticsTableSerializer(serializers.Serializer):
+    table_number = serializers.IntegerField()
+    orders = serializers.IntegerField()
+    rank = serializers.IntegerField()
+    share = serializers.FloatField()
+    revenue = serializers.DecimalField(max_digits=14, decimal_places=2)
+    average_ticket = serializers.DecimalField(max_digits=12, decimal_places=2)
+
+
+class StatisticsStatusTimeSerializer(serializers.Serializer):
+    status = serializers.CharField()
+    orders = serializers.IntegerField()
+    avg_seconds = serializers.FloatField(allow_null=True)
+    max_seconds = serializers.FloatField(allow_null=True)
+
+
+class StatisticsBacklogStatusSerializer(serializers.Serializer):
+    status = serializers.CharField()
+    orders = serializers.IntegerField()
+    oldest_at = serializers.DateTimeField(allow_null=True)
+    avg_age_seconds = serializers.FloatField(allow_null=True)
+
+
+class StatisticsBacklogSerializer(serializers.Serializer):
+    total = serializers.IntegerField()
+    by_status = StatisticsBacklogStatusSerializer(many=True)
+
+
+class StatisticsHistorySerializer(serializers.Serializer):
+    bucket = serializers.DateTimeField()
+    backlog = serializers.IntegerField()
+
+
+class StatisticsSerializer(serializers.Serializer):
+    period = serializers.CharField()
+    # начало интервала обновления, к которому относится снимок, и время расчета
+    bucket = serializers.DateTimeField()
+    computed_at = serializers.DateTimeField()
+    date_from = serializers.DateTimeField()
+    date_to = serializers.DateTimeField()
+    orders = serializers.IntegerField()
+    paid_orders = serializers.IntegerField()
+    revenue = serializers.DecimalField(max_digits=14, decimal_places=2)
+    average_ticket = serializers.DecimalField(max_digits=12, decimal_places=2)
+    max_ticket = serializers.DecimalField(max_digits=12, decimal_places=2)
+    dishes = serializers.IntegerField()
+    dishes_revenue = serializers.DecimalField(max_digits=14, decimal_places=2)
+    dishes_per_order = serializers.FloatField()
+    top_dishes = StatisticsDishSerializer(many=True)
+    tables = StatisticsTableSerializer(many=True)
+    status_times = StatisticsStatusTimeSerializer(many=True)
+    backlog = StatisticsBacklogSerializer()
+    backlog_history = StatisticsHistorySerializer(many=True)
+
+
+class RowCacheStatsSerializer(serializers.Serializer):
+    enabled = serializers.BooleanField()
+    generation = serializers.IntegerField()
+    hits = serializers.IntegerField()
+    rendered = serializers.IntegerField()
+    hit_ratio = serializers.FloatField()
+
+
+class ResponseCacheStatsSerializer(serializers.Serializer):
+    enabled = serializers.BooleanField()
+    backend = serializers.CharField()
+    generation = serializers.IntegerField()
+    hits = serializers.IntegerField()
+    misses = serializers.IntegerField()
+    evictions = serializers.IntegerField()
+    invalidations = serializers.IntegerField()
+    hit_ratio = serializers.FloatField()
+    # строки HTML-списка заказов
+    rows = RowCacheStatsSerializer()
@@ -0,0 +1,30 @@
+import json
+from itertools import islice
+from typing import Any, Iterable, Iterator, TypeVar
+
+T = TypeVar("T")
+
+NDJSON_CONTENT_TYPE = "application/x-ndjson"
+
+
+class MalformedRecord:
+    def __init__(self, message: str) -> None:
+        self.message = message
+
+
+def iter_ndjson(stream: Iterable[bytes]) -> Iterator[Any]:
+    """Читает тело запроса построчно, не загружая его в память целиком."""
+    for line in stream:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError:
+            yield MalformedRecord("Некорректный JSON.")
+
+
+def chunked(iterable: Iterable[T], size: int) -> Iterator[list[T]]:
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
@@ -1,10 +1,41 @@
+from django.conf import settings
 from django.urls import path
 
-from .api_views import OrderListCreateAPIView, OrderDetailView, OrderSearchAPIView
+from .api_views import (
+    OrderListCreateAPIView, OrderDetailView, OrderSearchAPIView, RevenueReportAPIView,
+    OrderBulkCreateAPIView, OrderExportAPIView, ResponseCacheStatsAPIView, OrderStatusAPIView,
+    OrderBulkStatusAPIView, StatisticsAPIView,
+)
+from .async_views import AsyncOrderDetailView, AsyncOrderListCreateView, AsyncOrderSearchView
+from .event_views import OrderEventsView
 
-urlpatterns = [
+sync_urlpatterns = [
     path('orders/', OrderListCreateAPIView.as_view(), name='order-api-create'),
     path('orders/', OrderListCreateAPIView.as_view(), name='order-api-list'),
+    path('orders/export/', OrderExportAPIView.as_view(), name='order-api-export'),
+    path('orders/bulk/', OrderBulkCreateAPIView.as_view(), name='order-api-bulk'),
+    path('orders/status/', OrderBulkStatusAPIView.as_view(), name='order-api-bulk-status'),
     path('orders/<int:order_id>/', OrderDetailView.as_view(), name='order-api-detail'),
+    path('orders/<int:order_id>/status/', OrderStatusAPIView.as_view(), name='order-api-status'),
     path('orders/search/', OrderSearchAPIView.as_view(), name='order-api-search'),
+    path('orders/events/', OrderEventsView.as_view(), name='order-api-events'),
+    path('revenue/', RevenueReportAPIView.as_view(), name='revenue-api-report'),
+    path('statistics/', StatisticsAPIView.as_view(), name='statistics-api'),
+    path('cache/stats/', ResponseCacheStatsAPIView.as_view(), name='cache-api-stats'),
 ]
+
+# асинхронный стек отличается только представлениями списка, поиска, просмотра и создания заказов
+_async_views = {
+    'order-api-create': AsyncOrderListCreateView,
+    'order-api-list': AsyncOrderListCreateView,
+    'order-api-detail': AsyncOrderDetailView,
+    'order-api-search': AsyncOrderSearchView,
+}
+
+async_urlpatterns = [
+    path(str(pattern.pattern), _async_views[pattern.name].as_view(), name=pattern.name)
+    if pattern.name in _async_views else pattern
+    for pattern in sync_urlpatterns
+]
+
+urlpatterns = async_urlpatterns if settings.ORDERS_ASYNC_API else sync_urlpatterns
@@ -1,6 +1,15 @@
 from django.apps import AppConfig
+from django.conf import settings
+from django.db.backends.signals import connection_created
 
 
 class OrdersConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'orders'
+
+    def ready(self):
+        from orders import signals  # noqa: F401
+
+        if settings.ORDERS_METRICS_ENABLED:
+            from orders.services.metrics import install_query_timer
+            connection_created.connect(install_query_timer)
@@ -0,0 +1,95 @@
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from functools import wraps
+from typing import Any, Callable, Iterator, Optional
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+
+@dataclass
+class RoutingState:
+    """Состояние маршрутизации одного запроса (создается ReplicaRoutingMiddleware)."""
+    # клиент недавно писал сам: его чтения идут в основную базу до конца окна устаревания
+    recent_writer: bool = False
+    # запрос уже что-то записал: дальнейшие чтения должны видеть эту запись
+    wrote: bool = False
+    # реплика, выбранная для запроса: все его чтения видят одно и то же отставание
+    replica: Optional[str] = None
+
+
+_state: ContextVar[Optional[RoutingState]] = ContextVar("orders_routing_state", default=None)
+_replica_intent: ContextVar[bool] = ContextVar("orders_replica_intent", default=False)
+
+
+def start_routing(state: RoutingState) -> Any:
+    return _state.set(state)
+
+
+def stop_routing(token: Any) -> None:
+    _state.reset(token)
+
+
+def mark_written() -> None:
+    """Отмечает запись, которую за текущий запрос выполнил другой поток (group commit)."""
+    state = _state.get()
+    if state is not None:
+        state.wrote = True
+
+
+def read_alias() -> str:
+    """База для чтения в текущем контексте: реплика только для представлений, разрешивших это явно."""
+    replicas = settings.DATABASE_REPLICAS
+    if not replicas or not _replica_intent.get():
+        return DEFAULT_DB_ALIAS
+    state = _state.get()
+    if state is None:
+        return random.choice(replicas)
+    if state.wrote or state.recent_writer:
+        return DEFAULT_DB_ALIAS
+    if state.replica is None:
+        state.replica = random.choice(replicas)
+    return state.replica
+
+
+@contextmanager
+def reading_from_replica() -> Iterator[None]:
+    token = _replica_intent.set(True)
+    try:
+        yield
+    finally:
+        _replica_intent.reset(token)
+
+
+def replica_reads(view: Callable) -> Callable:
+    """Разрешает представлению (функции или методу, в том числе асинхронному) читать с реплики."""
+    if iscoroutinefunction(view):
+        @wraps(view)
+        async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+            with reading_from_replica():
+                return await view(*args, **kwargs)
+        return async_wrapper
+
+    @wraps(view)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        with reading_from_replica():
+            return view(*args, **kwargs)
+    return wrapper
+
+
+class PrimaryReplicaRouter:
+    """Запись и select_for_update - в основную базу, чтение - по read_alias()."""
+
+    def db_for_read(self, model: Any, **hints: Any) -> str:
+        return read_alias()
+
+    def db_for_write(self, model: Any, **hints: Any) -> str:
+        mark_written()
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1: Any, obj2: Any, **hints: Any) -> bool:
+        # реплика содержит те же данные, что и основная база
+        return True
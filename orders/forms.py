@@ -1,7 +1,9 @@
 from django import forms
-from django.forms import modelformset_factory
+from django.forms import BaseModelFormSet, modelformset_factory
+from django.utils.functional import cached_property
 
-from .models import Order, OrderItem
+from .models import Item, Order, OrderItem
+from .services.statistics_service import PERIOD_CHOICES
 
 
 
@@ -31,7 +33,20 @@ class OrderItemForm(forms.ModelForm):
             'price': 'Цена',
         }
 
-OrderItemFormSet = modelformset_factory(OrderItem, form=OrderItemForm, extra=0, can_delete=True)
+class BaseOrderItemFormSet(BaseModelFormSet):
+    @cached_property
+    def item_choices(self):
+        # список блюд читается один раз на весь набор форм, а не в каждом select
+        return [("", "---------"), *Item.objects.values_list("id", "name")]
+
+    def add_fields(self, form, index):
+        super().add_fields(form, index)
+        form.fields["item"].choices = self.item_choices
+
+
+OrderItemFormSet = modelformset_factory(
+    OrderItem, form=OrderItemForm, formset=BaseOrderItemFormSet, extra=0, can_delete=True
+)
 
 
 class UpdateOrderForm(forms.ModelForm):
@@ -49,3 +64,18 @@ class UpdateOrderForm(forms.ModelForm):
 class OrderSearchForm(forms.Form):
     table_number = forms.IntegerField(required=False)
     status = forms.ChoiceField(choices=[('', 'Все статусы')] + Order.STATUS_CHOICES, required=False, )
+    min_total = forms.DecimalField(required=False, min_value=0, decimal_places=2)
+    max_total = forms.DecimalField(required=False, min_value=0, decimal_places=2)
+    date_from = forms.DateField(required=False)
+    date_to = forms.DateField(required=False)
+    dish_id = forms.IntegerField(required=False, min_value=1)
+    dish = forms.CharField(required=False, max_length=100)
+
+
+class RevenueFilterForm(forms.Form):
+    date_from = forms.DateField(required=False, label="С даты")
+    date_to = forms.DateField(required=False, label="По дату")
+
+
+class StatisticsFilterForm(forms.Form):
+    period = forms.ChoiceField(choices=PERIOD_CHOICES, required=False, label="Период")
@@ -0,0 +1,42 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from orders.services.archive_service import OrderArchiveService
+
+
+class Command(BaseCommand):
+    help = (
+        "Переносит оплаченные заказы старше заданного возраста в архивные таблицы. "
+        "Каждая пачка переносится отдельной короткой транзакцией, поэтому команду можно запускать при работе кафе."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--older-than-days", type=int, default=settings.ORDERS_ARCHIVE_AFTER_DAYS,
+                            help="Возраст оплаты, после которого заказ переносится в архив")
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument("--pause", type=float, default=0.0, help="Пауза между пачками, секунд")
+        parser.add_argument("--max-batches", type=int, help="Остановиться после указанного количества пачек")
+        parser.add_argument("--dry-run", action="store_true", help="Только посчитать заказы для переноса")
+
+    def handle(self, *args, **options):
+        service = OrderArchiveService(timedelta(days=options["older_than_days"]), batch_size=options["batch_size"])
+
+        if options["dry_run"]:
+            self.stdout.write(f"Заказов для переноса (оплачены до {service.cutoff:%Y-%m-%d %H:%M}): {service.pending()}")
+            return
+
+        moved = batches = 0
+        while options["max_batches"] is None or batches < options["max_batches"]:
+            count = service.archive_batch()
+            if not count:
+                break
+            moved += count
+            batches += 1
+            self.stdout.write(f"Пачка {batches}: перенесено {count}")
+            if options["pause"]:
+                time.sleep(options["pause"])
+
+        self.stdout.write(self.style.SUCCESS(f"Перенесено в архив заказов: {moved}"))
@@ -0,0 +1,120 @@
+import asyncio
+import json
+import statistics
+import time
+from typing import Any
+
+from django.core.handlers.asgi import ASGIHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+from django.urls import include, path
+
+from orders.api.urls import async_urlpatterns, sync_urlpatterns
+from orders.models import Item, Order
+
+
+class SyncAPIURLConf:
+    urlpatterns = [path('api/', include(sync_urlpatterns))]
+
+
+class AsyncAPIURLConf:
+    urlpatterns = [path('api/', include(async_urlpatterns))]
+
+
+STACKS = {"sync": SyncAPIURLConf, "async": AsyncAPIURLConf}
+SCENARIOS = ("list", "detail", "search", "create")
+
+
+async def _call(handler: ASGIHandler, method: str, path_: str, query: str = "", body: bytes = b"") -> int:
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": method, "scheme": "http", "path": path_, "raw_path": path_.encode(),
+        "query_string": query.encode(), "root_path": "",
+        "headers": [(b"host", b"localhost"), (b"content-type", b"application/json")],
+        "client": ("127.0.0.1", 0), "server": ("localhost", 80),
+    }
+    received = False
+    response_status = 0
+
+    async def receive() -> dict[str, Any]:
+        nonlocal received
+        if not received:
+            received = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        # клиент не отключается: Django сам отменит ожидание после отправки ответа
+        await asyncio.Event().wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message: dict[str, Any]) -> None:
+        nonlocal response_status
+        if message["type"] == "http.response.start":
+            response_status = message["status"]
+
+    await handler(scope, receive, send)
+    return response_status
+
+
+class Command(BaseCommand):
+    help = (
+        "Сравнивает синхронные и асинхронные эндпоинты API под конкурентной нагрузкой "
+        "(запросы выполняются ASGI-обработчиком в этом процессе, без сети). "
+        "Сценарий create создает заказы в базе."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--scenario", choices=SCENARIOS, action="append",
+                            help="Сценарий (можно указать несколько раз), по умолчанию list, detail и search")
+        parser.add_argument("--stack", choices=STACKS, action="append", help="По умолчанию оба стека")
+        parser.add_argument("--requests", type=int, default=500, help="Запросов на сценарий")
+        parser.add_argument("--concurrency", type=int, default=50)
+
+    def handle(self, *args, **options):
+        order_id = Order.objects.values_list("id", flat=True).first()
+        item_id = Item.objects.values_list("id", flat=True).first()
+        if order_id is None or item_id is None:
+            raise CommandError("Для нагрузки нужны хотя бы один заказ и одно блюдо")
+
+        requests = {
+            "list": ("GET", "/api/orders/", "page_size=20", b""),
+            "detail": ("GET", f"/api/orders/{order_id}/", "", b""),
+            "search": ("GET", "/api/orders/search/", "status=pending&page_size=20", b""),
+            "create": ("POST", "/api/orders/", "", json.dumps(
+                {"table_number": 1, "items": [{"item_id": item_id, "price": "100.00"}]}
+            ).encode()),
+        }
+
+        for scenario in options["scenario"] or ("list", "detail", "search"):
+            for stack in options["stack"] or STACKS:
+                with override_settings(ROOT_URLCONF=STACKS[stack]):
+                    result = asyncio.run(self._run(requests[scenario], options["requests"], options["concurrency"]))
+                self.stdout.write(json.dumps({"scenario": scenario, "stack": stack, **result}))
+
+    @staticmethod
+    async def _run(request: tuple[str, str, str, bytes], total: int, concurrency: int) -> dict[str, Any]:
+        handler = ASGIHandler()
+        latencies: list[float] = []
+        errors = 0
+        queue = iter(range(total))
+
+        async def worker() -> None:
+            nonlocal errors
+            for _ in queue:
+                started = time.perf_counter()
+                response_status = await _call(handler, *request)
+                latencies.append(time.perf_counter() - started)
+                if response_status >= 400:
+                    errors += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+        latencies.sort()
+        return {
+            "requests": total,
+            "concurrency": concurrency,
+            "errors": errors,
+            "rps": round(total / elapsed, 1),
+            "p50_ms": round(statistics.median(latencies) * 1000, 2),
+            "p99_ms": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000, 2),
+        }
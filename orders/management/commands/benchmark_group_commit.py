@@ -0,0 +1,50 @@
+import json
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+
+from orders.models import Item
+from orders.services.group_commit import group_commit
+from orders.services.load_testing import ClientTransport, LoadRunner, ScenarioContext
+from orders.tests.load_scenarios import SCENARIOS
+
+
+class Command(BaseCommand):
+    help = (
+        "Сравнивает создание заказов через API с транзакцией на запрос и с group commit "
+        "(сценарий peak, тестовый клиент Django в concurrency потоках этого процесса). "
+        "Создает заказы в базе."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--concurrency", type=int, default=16, help="Количество параллельных клиентов")
+        parser.add_argument("--requests", type=int, default=2000, help="Запросов на каждый режим")
+        parser.add_argument("--window-ms", type=float, default=settings.ORDERS_GROUP_COMMIT["WINDOW_MS"])
+        parser.add_argument("--max-batch", type=int, default=settings.ORDERS_GROUP_COMMIT["MAX_BATCH"])
+        parser.add_argument("--seed", type=int, default=1)
+
+    def handle(self, *args, **options):
+        if options["concurrency"] < 1:
+            raise CommandError("--concurrency должен быть больше нуля")
+        item_ids = list(Item.objects.values_list("id", flat=True))
+        if not item_ids:
+            raise CommandError("Для нагрузки нужно хотя бы одно блюдо")
+
+        modes = {"per_request": False, "group_commit": True}
+        report = {}
+        for mode, enabled in modes.items():
+            group_config = {"ENABLED": enabled, "WINDOW_MS": options["window_ms"], "MAX_BATCH": options["max_batch"]}
+            context = ScenarioContext(item_ids, [], seed=options["seed"])
+            runner = LoadRunner(SCENARIOS["peak"], ClientTransport(), context, options["concurrency"])
+            group_commit.reset_stats()
+            with override_settings(ORDERS_GROUP_COMMIT=group_config, ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"]):
+                result = runner.run(requests=options["requests"])
+            report[mode] = {**result["total"], "elapsed_s": result["elapsed_s"]}
+            if enabled:
+                report[mode]["batches"] = group_commit.stats()
+
+        baseline = report["per_request"]["throughput_rps"]
+        report["speedup"] = round(report["group_commit"]["throughput_rps"] / baseline, 2) if baseline else None
+        report["concurrency"] = options["concurrency"]
+        self.stdout.write(json.dumps(report, ensure_ascii=False, indent=2))
@@ -0,0 +1,76 @@
+import json
+import time
+from typing import Callable
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+
+from orders.api.fast_serializers import order_rows, serialize_orders
+from orders.api.serializers import OrderSerializer
+from orders.models import Item, Order, OrderItem
+from orders.services.order_queries import api_items_prefetch, orders_for_api
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Сравнивает время сборки JSON списка заказов через OrderSerializer и через values_list. "
+        "Тестовые заказы создаются в транзакции и откатываются."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--orders", type=int, default=10000)
+        parser.add_argument("--items", type=int, default=3, help="Позиций в заказе")
+        parser.add_argument("--repeat", type=int, default=3, help="Берется лучший из запусков")
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self._fill(options["orders"], options["items"])
+                result = self._measure(options["repeat"])
+                raise _Rollback()
+        except _Rollback:
+            pass
+        self.stdout.write(json.dumps({"orders": options["orders"], "items_per_order": options["items"], **result}))
+
+    @staticmethod
+    def _fill(count: int, items_per_order: int) -> None:
+        dishes = Item.objects.bulk_create(Item(name=f"benchmark {i}") for i in range(items_per_order))
+        orders = Order.objects.bulk_create(
+            Order(table_number=i % 50 + 1, total_price=items_per_order * 100) for i in range(count)
+        )
+        OrderItem.objects.bulk_create(
+            (OrderItem(order=order, item=dish, price=100) for order in orders for dish in dishes), batch_size=5000,
+        )
+
+    def _measure(self, repeat: int) -> dict:
+        renderer = JSONRenderer()
+
+        def drf() -> bytes:
+            orders = orders_for_api().prefetch_related(api_items_prefetch()).order_by("id")
+            return renderer.render(OrderSerializer(orders, many=True).data)
+
+        def fast() -> bytes:
+            return renderer.render(serialize_orders(list(order_rows(orders_for_api().order_by("id")))))
+
+        drf_seconds, drf_output = self._best(drf, repeat)
+        fast_seconds, fast_output = self._best(fast, repeat)
+        return {
+            "drf_seconds": round(drf_seconds, 3),
+            "fast_seconds": round(fast_seconds, 3),
+            "speedup": round(drf_seconds / fast_seconds, 2),
+            "identical": drf_output == fast_output,
+        }
+
+    @staticmethod
+    def _best(func: Callable[[], bytes], repeat: int) -> tuple[float, bytes]:
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            output = func()
+            timings.append(time.perf_counter() - started)
+        return min(timings), output
@@ -0,0 +1,33 @@
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from orders.api.schema import generate_schema, render_json
+
+
+class Command(BaseCommand):
+    help = (
+        "Собирает схему OpenAPI в JSON-файл (ORDERS_API_SCHEMA_FILE), из которого ее отдает /api/schema/. "
+        "Запускайте после изменения представлений или сериализаторов API и коммитьте результат."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--file", default=settings.ORDERS_API_SCHEMA_FILE, help="Куда записать схему")
+        parser.add_argument("--check", action="store_true",
+                            help="Ничего не записывать, завершиться с ошибкой, если файл расходится с кодом")
+
+    def handle(self, *args, **options):
+        if not options["file"]:
+            raise CommandError("Не задан файл схемы: укажите --file или ORDERS_API_SCHEMA_FILE")
+        file = Path(options["file"])
+        content = render_json(generate_schema())
+
+        if options["check"]:
+            if not file.exists() or file.read_bytes() != content:
+                raise CommandError(f"Схема в {file} устарела, выполните python manage.py build_api_schema")
+            self.stdout.write(self.style.SUCCESS(f"Схема в {file} совпадает с кодом"))
+            return
+
+        file.write_bytes(content)
+        self.stdout.write(self.style.SUCCESS(f"Схема записана в {file} ({len(content)} байт)"))
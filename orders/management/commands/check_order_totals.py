@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import F
+
+from orders.models import Order
+from orders.services.order_service import items_total_subquery, update_order_totals
+
+
+class Command(BaseCommand):
+    help = "Проверяет сохраненные суммы заказов и при необходимости исправляет расхождения"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--repair", action="store_true", help="Исправить найденные расхождения")
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        drifted = (
+            Order.objects
+            .annotate(actual_total=items_total_subquery())
+            .exclude(total_price=F("actual_total"))
+            .values_list("id", "total_price", "actual_total")
+            .order_by("id")
+        )
+
+        drifted_ids = []
+        for order_id, stored, actual in drifted.iterator(chunk_size=options["batch_size"]):
+            drifted_ids.append(order_id)
+            self.stdout.write(f"Заказ #{order_id}: сохранено {stored}, по блюдам {actual}")
+
+        if not drifted_ids:
+            self.stdout.write(self.style.SUCCESS("Расхождений не найдено"))
+            return
+
+        if not options["repair"]:
+            self.stdout.write(self.style.WARNING(f"Заказов с расхождениями: {len(drifted_ids)}"))
+            return
+
+        batch_size = options["batch_size"]
+        for start in range(0, len(drifted_ids), batch_size):
+            with transaction.atomic():
+                update_order_totals(drifted_ids[start:start + batch_size])
+        self.stdout.write(self.style.SUCCESS(f"Исправлено заказов: {len(drifted_ids)}"))
@@ -0,0 +1,41 @@
+from datetime import date
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from orders.models import ArchivedOrder, Order
+from orders.services.export_service import OrderExportService
+from orders.services.order_queries import filter_orders
+
+
+class Command(BaseCommand):
+    help = "Потоковая выгрузка истории заказов в CSV или NDJSON"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--output", choices=OrderExportService.FORMATS, default="csv")
+        parser.add_argument("--status", choices=[choice for choice, _ in Order.STATUS_CHOICES])
+        parser.add_argument("--table", type=int, help="Номер стола")
+        parser.add_argument("--date-from", type=date.fromisoformat, help="Создан не раньше даты (YYYY-MM-DD)")
+        parser.add_argument("--date-to", type=date.fromisoformat, help="Создан не позже даты (YYYY-MM-DD)")
+        parser.add_argument("--file", help="Файл для записи (по умолчанию stdout)")
+        parser.add_argument("--chunk-size", type=int, default=settings.ORDERS_EXPORT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        filters = {
+            "status": options["status"],
+            "table_number": options["table"],
+            "date_from": options["date_from"],
+            "date_to": options["date_to"],
+        }
+        exporter = OrderExportService(
+            filter_orders(Order.objects.all(), **filters),
+            chunk_size=options["chunk_size"],
+            archived=filter_orders(ArchivedOrder.objects.all(), **filters),
+        )
+
+        if options["file"]:
+            with open(options["file"], "w", encoding="utf-8", newline="") as target:
+                target.writelines(exporter.stream(options["output"]))
+        else:
+            for chunk in exporter.stream(options["output"]):
+                self.stdout.write(chunk, ending="")
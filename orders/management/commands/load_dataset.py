@@ -0,0 +1,70 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError
+
+from orders.services.dataset_service import (
+    DatasetGenerator, create_menu, existing_menu, finish_load, generate_orders, load_export, load_fixture,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Быстрая загрузка данных: синтетические заказы (--orders) или готовые выгрузки. "
+        "Файлы .json загружаются как фикстуры Django, .ndjson - как выгрузка export_orders --output ndjson. "
+        "В PostgreSQL строки пишутся через COPY, в остальных базах - пачками bulk_create."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("dumps", nargs="*", help="Файлы для загрузки (.json или .ndjson)")
+        parser.add_argument("--orders", type=int, default=0, help="Сколько синтетических заказов создать")
+        parser.add_argument("--menu", type=int, default=0,
+                            help="Сколько блюд добавить в меню (если меню пустое, по умолчанию 40)")
+        parser.add_argument("--tables", type=int, default=30)
+        parser.add_argument("--days", type=int, default=90, help="За сколько последних дней создавать заказы")
+        parser.add_argument("--seed", type=int, help="Зерно генератора для повторяемых данных")
+        parser.add_argument("--batch-size", type=int, default=50000, help="Заказов в одной транзакции")
+        parser.add_argument("--skip-revenue", action="store_true",
+                            help="Не пересобирать сводку выручки (rebuild_revenue можно запустить позже)")
+
+    def handle(self, *args, **options):
+        if not options["dumps"] and not options["orders"] and not options["menu"]:
+            raise CommandError("Укажите файлы для загрузки или количество заказов (--orders)")
+        started = time.perf_counter()
+
+        try:
+            for path in options["dumps"]:
+                self._load_dump(path, options["batch_size"])
+            if options["orders"] or options["menu"]:
+                self._generate(options)
+        except (DatabaseError, ValueError) as e:
+            raise CommandError(f"Загрузка прервана: {e}")
+
+        finish_load(rebuild_revenue=not options["skip_revenue"])
+        self.stdout.write(self.style.SUCCESS(f"Готово за {time.perf_counter() - started:.1f} с"))
+
+    def _load_dump(self, path: str, batch_size: int) -> None:
+        with open(path, encoding="utf-8") as stream:
+            if path.endswith(".ndjson"):
+                for loaded in load_export(stream, batch_size=batch_size):
+                    self.stdout.write(f"{path}: загружено заказов {loaded}")
+            elif path.endswith(".json"):
+                counts = load_fixture(stream, batch_size=batch_size)
+                self.stdout.write(f"{path}: " + ", ".join(f"{model} {count}" for model, count in counts.items()))
+            else:
+                raise CommandError(f"Неизвестный формат файла: {path}")
+
+    def _generate(self, options) -> None:
+        menu = existing_menu()
+        menu_size = options["menu"] or (0 if menu else 40)
+        if menu_size:
+            menu += create_menu(menu_size)
+            self.stdout.write(f"Добавлено блюд: {menu_size}")
+        if not options["orders"]:
+            return
+
+        generator = DatasetGenerator(menu, tables=options["tables"], days=options["days"], seed=options["seed"])
+        started = time.perf_counter()
+        for loaded in generate_orders(generator, options["orders"], batch_size=options["batch_size"]):
+            rate = loaded / (time.perf_counter() - started)
+            self.stdout.write(f"Создано заказов: {loaded} из {options['orders']} ({rate:.0f} в секунду)")
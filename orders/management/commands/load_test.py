@@ -0,0 +1,63 @@
+import json
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+
+from orders.models import Item, Order
+from orders.services.load_testing import ClientTransport, HTTPTransport, LoadRunner, ScenarioContext
+from orders.tests.load_scenarios import SCENARIOS
+
+
+class Command(BaseCommand):
+    help = (
+        "Нагрузочный прогон веб-страниц и API по сценарию из orders/tests/load_scenarios.py. "
+        "Выводит JSON с пропускной способностью, p50/p95/p99 и количеством запросов к базе по эндпоинтам. "
+        "Сценарии с записью создают и меняют заказы в базе."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--scenario", choices=SCENARIOS, default="mixed")
+        parser.add_argument("--target", default="client",
+                            help="client - тестовый клиент Django в этом процессе, "
+                                 "или адрес запущенного сервера, например http://127.0.0.1:8000")
+        parser.add_argument("--concurrency", type=int, default=4, help="Количество параллельных клиентов")
+        parser.add_argument("--requests", type=int, default=1000, help="Всего запросов (если не задан --duration)")
+        parser.add_argument("--duration", type=float, help="Длительность прогона в секундах")
+        parser.add_argument("--tables", type=int, default=20, help="Количество столов в создаваемых заказах")
+        parser.add_argument("--seed", type=int, help="Зерно генератора для повторяемой смеси запросов")
+        parser.add_argument("--output", help="Файл для отчета (по умолчанию вывод в stdout)")
+
+    def handle(self, *args, **options):
+        if options["concurrency"] < 1:
+            raise CommandError("--concurrency должен быть больше нуля")
+        item_ids = list(Item.objects.values_list("id", flat=True))
+        if not item_ids:
+            raise CommandError("Для нагрузки нужно хотя бы одно блюдо")
+        order_ids = list(Order.objects.order_by("-id").values_list("id", flat=True)[:1000])
+        context = ScenarioContext(item_ids, order_ids, tables=options["tables"], seed=options["seed"])
+
+        if options["target"] == "client":
+            transport = ClientTransport()
+            allowed_hosts = [*settings.ALLOWED_HOSTS, "testserver"]
+        else:
+            try:
+                transport = HTTPTransport(options["target"])
+            except ValueError as e:
+                raise CommandError(e)
+            allowed_hosts = settings.ALLOWED_HOSTS
+
+        runner = LoadRunner(SCENARIOS[options["scenario"]], transport, context, options["concurrency"])
+        with override_settings(ALLOWED_HOSTS=allowed_hosts):
+            report = runner.run(
+                requests=None if options["duration"] else options["requests"],
+                duration=options["duration"],
+            )
+        report["target"] = options["target"]
+
+        output = json.dumps(report, ensure_ascii=False, indent=2)
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as file:
+                file.write(output + "\n")
+        else:
+            self.stdout.write(output)
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from orders.services.revenue_service import RevenueService
+
+
+class Command(BaseCommand):
+    help = "Полностью пересобирает сводную таблицу выручки по оплаченным заказам"
+
+    def handle(self, *args, **options):
+        created = RevenueService.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Сводка выручки пересобрана, строк: {created}"))
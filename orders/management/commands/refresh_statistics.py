@@ -0,0 +1,27 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from orders.services.statistics_service import PERIODS, StatisticsService
+
+
+class Command(BaseCommand):
+    help = (
+        "Пересчитывает снимки операционной статистики для страницы и API. "
+        "Запускайте раз в ORDERS_STATISTICS_INTERVAL секунд (например, по cron), "
+        "тогда запросы статистики только читают готовые снимки."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--period", choices=PERIODS, action="append",
+                            help="Пересчитать только указанные периоды (по умолчанию все)")
+
+    def handle(self, *args, **options):
+        for period in options["period"] or PERIODS:
+            started = time.perf_counter()
+            snapshot = StatisticsService(period).refresh()
+            self.stdout.write(
+                f"{period}: снимок на {snapshot.bucket:%Y-%m-%d %H:%M}, "
+                f"заказов {snapshot.data['orders']}, {time.perf_counter() - started:.2f} с"
+            )
+        self.stdout.write(self.style.SUCCESS("Статистика обновлена"))
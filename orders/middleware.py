@@ -0,0 +1,152 @@
+import math
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpRequest, HttpResponseBase
+from django.utils.decorators import sync_and_async_middleware
+
+from orders.db_router import RoutingState, start_routing, stop_routing
+from orders.services.metrics import current_timing, request_metrics, start_timing, stop_timing
+
+# маршруты, которые не учитываются: сама страница метрик
+EXCLUDED_ROUTES = {"metrics"}
+
+
+class _RequestTiming:
+    """Время запросов к представлениям orders: заголовок Server-Timing и гистограммы для /metrics.
+
+    При ORDERS_METRICS_ENABLED = False middleware отключается целиком, а счетчик запросов
+    к базе не подключается к соединениям.
+    """
+
+    def __init__(self, get_response) -> None:
+        if not settings.ORDERS_METRICS_ENABLED:
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+
+    @staticmethod
+    def _view_finished() -> None:
+        # вызывается из process_template_response: после представления и до рендеринга
+        # TemplateResponse и Response из DRF
+        timing = current_timing()
+        if timing is not None:
+            timing.view_finished = time.perf_counter()
+
+    @staticmethod
+    def _finish(request: HttpRequest, response: HttpResponseBase, timing) -> HttpResponseBase:
+        match = request.resolver_match
+        if match is None or not match.url_name or match.url_name in EXCLUDED_ROUTES:
+            return response
+        if not match.func.__module__.startswith("orders."):
+            return response
+
+        phases = request_metrics.observe(match.url_name, response.status_code, timing, time.perf_counter())
+        response["Server-Timing"] = ", ".join([
+            f'db;dur={phases["db"] * 1000:.2f};desc="{timing.queries} queries"',
+            f'view;dur={phases["view"] * 1000:.2f}',
+            f'render;dur={phases["render"] * 1000:.2f}',
+            f'total;dur={phases["total"] * 1000:.2f}',
+        ])
+        return response
+
+
+class SyncRequestTimingMiddleware(_RequestTiming):
+    def __call__(self, request: HttpRequest) -> HttpResponseBase:
+        timing, token = start_timing()
+        try:
+            response = self.get_response(request)
+        finally:
+            stop_timing(token)
+        return self._finish(request, response, timing)
+
+    def process_template_response(self, request: HttpRequest, response: HttpResponseBase) -> HttpResponseBase:
+        self._view_finished()
+        return response
+
+
+class AsyncRequestTimingMiddleware(_RequestTiming):
+    def __init__(self, get_response) -> None:
+        super().__init__(get_response)
+        markcoroutinefunction(self)
+
+    async def __call__(self, request: HttpRequest) -> HttpResponseBase:
+        timing, token = start_timing()
+        try:
+            response = await self.get_response(request)
+        finally:
+            stop_timing(token)
+        return self._finish(request, response, timing)
+
+    async def process_template_response(self, request: HttpRequest, response: HttpResponseBase) -> HttpResponseBase:
+        # асинхронный хук: синхронный Django выполнял бы в отдельном потоке
+        self._view_finished()
+        return response
+
+
+@sync_and_async_middleware
+def request_timing_middleware(get_response) -> _RequestTiming:
+    """Выбирает синхронный или асинхронный вариант по обработчику, в который встраивается middleware."""
+    if iscoroutinefunction(get_response):
+        return AsyncRequestTimingMiddleware(get_response)
+    return SyncRequestTimingMiddleware(get_response)
+
+
+class ReplicaRoutingMiddleware:
+    """Держит чтения клиента в основной базе, пока реплика может не видеть его собственных записей.
+
+    После запроса с записью клиент получает cookie со временем окончания окна
+    DATABASE_REPLICA_STALENESS; до этого момента его запросы не читают с реплики.
+    """
+
+    COOKIE_NAME = "orders_primary_until"
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response) -> None:
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request: HttpRequest):
+        if self.is_async:
+            return self.__acall__(request)
+        if not settings.DATABASE_REPLICAS:
+            return self.get_response(request)
+        state = self._state(request)
+        token = start_routing(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            stop_routing(token)
+        return self._finish(response, state)
+
+    async def __acall__(self, request: HttpRequest) -> HttpResponseBase:
+        if not settings.DATABASE_REPLICAS:
+            return await self.get_response(request)
+        state = self._state(request)
+        token = start_routing(state)
+        try:
+            response = await self.get_response(request)
+        finally:
+            stop_routing(token)
+        return self._finish(response, state)
+
+    def _state(self, request: HttpRequest) -> RoutingState:
+        try:
+            primary_until = float(request.COOKIES.get(self.COOKIE_NAME, 0))
+        except ValueError:
+            primary_until = 0
+        return RoutingState(recent_writer=primary_until > time.time())
+
+    def _finish(self, response: HttpResponseBase, state: RoutingState) -> HttpResponseBase:
+        staleness = settings.DATABASE_REPLICA_STALENESS
+        if state.wrote and staleness > 0:
+            response.set_cookie(
+                self.COOKIE_NAME, f"{time.time() + staleness:.3f}",
+                max_age=math.ceil(staleness), httponly=True, samesite="Lax",
+            )
+        return response
@@ -0,0 +1,70 @@
+# Generated by Django 5.1.15 on 2026-10-18 18:42
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Sum
+from django.db.models.functions import ExtractHour, Now, TruncDate
+
+
+def build_rollup(apps, schema_editor):
+    Order = apps.get_model('orders', 'Order')
+    OrderItem = apps.get_model('orders', 'OrderItem')
+    RevenueRollup = apps.get_model('orders', 'RevenueRollup')
+
+    # время оплаты для старых заказов неизвестно, считаем их оплаченными в момент миграции
+    Order.objects.filter(status='paid', paid_at__isnull=True).update(paid_at=Now())
+
+    rows = (
+        OrderItem.objects
+        .filter(order__status='paid')
+        .annotate(day=TruncDate('order__paid_at'), hour=ExtractHour('order__paid_at'))
+        .values('day', 'hour', 'order__table_number', 'item_id')
+        .annotate(bucket_revenue=Sum('price'), bucket_quantity=Count('id'))
+        .order_by()
+    )
+    RevenueRollup.objects.bulk_create(
+        (
+            RevenueRollup(
+                day=row['day'],
+                hour=row['hour'],
+                table_number=row['order__table_number'],
+                item_id=row['item_id'],
+                revenue=row['bucket_revenue'],
+                quantity=row['bucket_quantity'],
+            )
+            for row in rows.iterator()
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='paid_at',
+            field=models.DateTimeField(blank=True, db_index=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='RevenueRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('hour', models.PositiveSmallIntegerField()),
+                ('table_number', models.IntegerField()),
+                ('revenue', models.DecimalField(decimal_places=2, max_digits=14)),
+                ('quantity', models.PositiveIntegerField()),
+                ('item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='orders.item')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['table_number'], name='revenue_rollup_table_idx')],
+                'constraints': [models.UniqueConstraint(fields=('day', 'hour', 'table_number', 'item'), name='revenue_rollup_bucket')],
+            },
+        ),
+        migrations.RunPython(build_rollup, migrations.RunPython.noop),
+    ]
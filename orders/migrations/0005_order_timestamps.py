@@ -0,0 +1,45 @@
+# Generated by Django 5.1.15 on 2026-10-18 18:49
+
+import django.utils.timezone
+from django.db import migrations, models
+from django.db.models import F
+
+
+def align_created_at(apps, schema_editor):
+    Order = apps.get_model('orders', 'Order')
+    # оплаченный заказ не может быть создан позже оплаты
+    Order.objects.filter(paid_at__lt=F('created_at')).update(created_at=F('paid_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0004_order_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.RunPython(align_created_at, migrations.RunPython.noop),
+        migrations.AddField(
+            model_name='order',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['created_at', 'id'], name='order_created_at_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['status', 'table_number'], name='order_status_table_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['status', 'created_at'], name='order_status_created_at_idx'),
+        ),
+    ]
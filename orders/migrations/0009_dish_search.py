@@ -0,0 +1,44 @@
+# Generated by Django 5.1.15 on 2026-10-18 19:20
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def search_index():
+    return django.contrib.postgres.indexes.GinIndex(
+        django.contrib.postgres.search.SearchVector('name', config='russian'), name='item_name_search_idx',
+    )
+
+
+# полнотекстовый индекс есть только в PostgreSQL: в остальных базах поиск идет через icontains
+def add_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.add_index(apps.get_model('orders', 'Item'), search_index())
+
+
+def remove_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.remove_index(apps.get_model('orders', 'Item'), search_index())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0008_order_archive'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_search_index, remove_search_index),
+        migrations.AddIndex(
+            model_name='orderitem',
+            index=models.Index(fields=['item', 'order'], name='order_item_item_order_idx'),
+        ),
+        # старый индекс по item удаляется после создания составного, который его заменяет
+        migrations.AlterField(
+            model_name='orderitem',
+            name='item',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='orders.item'),
+        ),
+    ]
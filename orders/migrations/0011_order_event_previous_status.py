@@ -0,0 +1,18 @@
+# Generated by Django 5.1.15 on 2026-10-18 19:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0010_order_ready_at_statistics'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='orderevent',
+            name='previous_status',
+            field=models.CharField(blank=True, default='', max_length=10),
+        ),
+    ]
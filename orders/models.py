@@ -1,5 +1,17 @@
+from django.contrib.postgres.search import SearchVector
+from django.core.serializers.json import DjangoJSONEncoder
 from django.core.validators import MinValueValidator
 from django.db import models
+from django.utils import timezone
+
+# словарь полнотекстового поиска по названиям блюд: с ним «борща» находит «Борщ»
+DISH_SEARCH_CONFIG = "russian"
+
+
+def dish_search_vector() -> SearchVector:
+    # выражение должно совпадать с выражением индекса item_name_search_idx, иначе индекс не используется;
+    # индекс создается только в PostgreSQL миграцией 0009_dish_search и поэтому не описан в Item.Meta
+    return SearchVector("name", config=DISH_SEARCH_CONFIG)
 
 
 class Item(models.Model):
@@ -18,13 +30,140 @@ class Order(models.Model):
 
     table_number = models.IntegerField()
     status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    paid_at = models.DateTimeField(null=True, blank=True, db_index=True)
+    # переход из pending: в ready или сразу в paid (тогда совпадает с paid_at)
+    ready_at = models.DateTimeField(null=True, blank=True)
+    total_price = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    # увеличивается при каждом изменении заказа или его позиций, используется в ETag
+    version = models.PositiveIntegerField(default=1)
+
+    class Meta:
+        indexes = [
+            # покрывают постраничный вывод по ключу (sort_key, id)
+            models.Index(fields=["total_price", "id"], name="order_total_price_id_idx"),
+            models.Index(fields=["table_number", "id"], name="order_table_number_id_idx"),
+            models.Index(fields=["created_at", "id"], name="order_created_at_id_idx"),
+            # поиск по статусу вместе со столом или периодом
+            models.Index(fields=["status", "table_number"], name="order_status_table_idx"),
+            models.Index(fields=["status", "created_at"], name="order_status_created_at_idx"),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if not instance.get_deferred_fields() & {"status", "table_number", "paid_at"}:
+            instance.remember_state()
+        return instance
+
+    def remember_state(self) -> None:
+        # состояние на момент загрузки нужно для пересчета сводки выручки
+        self._loaded_state = (self.status, self.table_number, self.paid_at)
 
     @property
-    def total_price(self):
-        return sum([i.price for i in self.items.all()])
+    def loaded_state(self):
+        return getattr(self, "_loaded_state", None)
+
+    def save(self, *args, **kwargs):
+        if self.status == 'paid' and self.paid_at is None:
+            self.paid_at = timezone.now()
+        elif self.status != 'paid':
+            self.paid_at = None
+        if self.status == 'pending':
+            self.ready_at = None
+        elif self.ready_at is None:
+            self.ready_at = self.paid_at or timezone.now()
+
+        if not self._state.adding:
+            self.version += 1
+
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            extra_fields = {"updated_at", "version"}
+            if "status" in update_fields:
+                extra_fields |= {"paid_at", "ready_at"}
+            kwargs["update_fields"] = {*update_fields, *extra_fields}
+        super().save(*args, **kwargs)
 
 
 class OrderItem(models.Model):
     order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name="items")
-    item = models.ForeignKey(Item, on_delete=models.CASCADE)
+    # отдельный индекс по item не нужен: его заменяет order_item_item_order_idx
+    item = models.ForeignKey(Item, on_delete=models.CASCADE, db_index=False)
     price = models.DecimalField(max_digits=10, decimal_places=2, validators=[MinValueValidator(0)])
+
+    class Meta:
+        indexes = [
+            # поиск заказов по блюду: id заказов берутся из индекса, без чтения строк позиций
+            models.Index(fields=["item", "order"], name="order_item_item_order_idx"),
+        ]
+
+
+class RevenueRollup(models.Model):
+    day = models.DateField()
+    hour = models.PositiveSmallIntegerField()
+    table_number = models.IntegerField()
+    item = models.ForeignKey(Item, on_delete=models.CASCADE, related_name="+")
+    revenue = models.DecimalField(max_digits=14, decimal_places=2)
+    quantity = models.PositiveIntegerField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["day", "hour", "table_number", "item"], name="revenue_rollup_bucket"),
+        ]
+        indexes = [
+            models.Index(fields=["table_number"], name="revenue_rollup_table_idx"),
+        ]
+
+
+class ArchivedOrder(models.Model):
+    """Оплаченный заказ, перенесенный из горячей таблицы командой archive_orders. Поля совпадают с Order."""
+    id = models.BigIntegerField(primary_key=True)
+    table_number = models.IntegerField()
+    status = models.CharField(max_length=10, choices=Order.STATUS_CHOICES)
+    paid_at = models.DateTimeField(null=True, blank=True)
+    ready_at = models.DateTimeField(null=True, blank=True)
+    total_price = models.DecimalField(max_digits=12, decimal_places=2)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    version = models.PositiveIntegerField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["paid_at"], name="archived_order_paid_at_idx"),
+            models.Index(fields=["created_at", "id"], name="archived_order_created_id_idx"),
+        ]
+
+
+class ArchivedOrderItem(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    order = models.ForeignKey(ArchivedOrder, on_delete=models.CASCADE, related_name="items")
+    item = models.ForeignKey(Item, on_delete=models.CASCADE, related_name="+")
+    price = models.DecimalField(max_digits=10, decimal_places=2)
+
+
+class OrderEvent(models.Model):
+    """Журнал изменений заказов для бэкенда событий в базе данных (несколько воркеров)."""
+    kind = models.CharField(max_length=20)
+    # без внешнего ключа: событие об удалении переживает сам заказ
+    order_id = models.BigIntegerField()
+    table_number = models.IntegerField()
+    status = models.CharField(max_length=10)
+    # статус до перехода для status_changed, у остальных событий пустой
+    previous_status = models.CharField(max_length=10, blank=True, default="")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+
+class StatisticsSnapshot(models.Model):
+    """Операционная статистика за период, посчитанная StatisticsService на начало интервала обновления."""
+    period = models.CharField(max_length=10)
+    bucket = models.DateTimeField()
+    computed_at = models.DateTimeField(auto_now_add=True)
+    data = models.JSONField(encoder=DjangoJSONEncoder)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["period", "bucket"], name="statistics_snapshot_bucket"),
+        ]
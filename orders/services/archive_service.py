@@ -0,0 +1,67 @@
+from datetime import datetime, timedelta
+
+from django.db import connections, router, transaction
+from django.db.models import Model
+from django.utils import timezone
+
+from orders.models import ArchivedOrder, ArchivedOrderItem, Order, OrderItem
+from orders.services.response_cache import invalidate_order_responses
+
+_ORDER_FIELDS = [field.attname for field in Order._meta.concrete_fields]
+
+
+def _delete_rows(model: type[Model], column: str, ids: list[int]) -> None:
+    connection = connections[router.db_for_write(model)]
+    qn = connection.ops.quote_name
+    placeholders = ", ".join(["%s"] * len(ids))
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {qn(model._meta.db_table)} WHERE {qn(column)} IN ({placeholders})", ids)
+
+
+class OrderArchiveService:
+    """Переносит оплаченные заказы в архивные таблицы короткими транзакциями по batch_size заказов.
+
+    Сводка выручки не пересчитывается: она строится по горячим и архивным позициям вместе,
+    поэтому перенос ее не меняет.
+    """
+
+    def __init__(self, older_than: timedelta, batch_size: int = 500) -> None:
+        self.cutoff = self.cutoff_for(older_than)
+        self.batch_size = batch_size
+
+    @staticmethod
+    def cutoff_for(older_than: timedelta) -> datetime:
+        # граница по началу часа: корзина сводки выручки целиком лежит либо в горячих, либо в архивных таблицах
+        cutoff = timezone.localtime(timezone.now() - older_than)
+        return cutoff.replace(minute=0, second=0, microsecond=0)
+
+    def pending(self) -> int:
+        return Order.objects.filter(status="paid", paid_at__lt=self.cutoff).count()
+
+    def archive_batch(self) -> int:
+        """Переносит одну пачку и возвращает количество перенесенных заказов (0 - переносить нечего)."""
+        with transaction.atomic():
+            orders = list(
+                Order.objects
+                .filter(status="paid", paid_at__lt=self.cutoff)
+                .order_by("id")
+                # строки, заблокированные изменением заказа, достанутся следующему запуску
+                .select_for_update(skip_locked=True)
+                .values_list(*_ORDER_FIELDS)[:self.batch_size]
+            )
+            if not orders:
+                return 0
+            order_ids = [row[0] for row in orders]
+
+            ArchivedOrder.objects.bulk_create(ArchivedOrder(**dict(zip(_ORDER_FIELDS, row))) for row in orders)
+            ArchivedOrderItem.objects.bulk_create(
+                ArchivedOrderItem(id=line_id, order_id=order_id, item_id=item_id, price=price)
+                for line_id, order_id, item_id, price in (
+                    OrderItem.objects.filter(order_id__in=order_ids).values_list("id", "order_id", "item_id", "price")
+                )
+            )
+            # удаление без сигналов: выручка уже учтена, а поштучные сигналы сделали бы пачку долгой
+            _delete_rows(OrderItem, "order_id", order_ids)
+            _delete_rows(Order, "id", order_ids)
+            invalidate_order_responses()
+        return len(order_ids)
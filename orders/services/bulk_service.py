@@ -0,0 +1,75 @@
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+from django.db import transaction, DatabaseError
+
+from orders.models import Order, OrderItem
+from orders.services.item_catalog import item_catalog
+from orders.services.order_events import ORDER_CREATED, publish_order_event
+from orders.services.order_service import ItemNotFoundError
+from orders.services.response_cache import invalidate_order_responses
+
+# (порядковый номер записи во входных данных, проверенные данные заказа)
+BulkRecord = tuple[int, dict[str, Any]]
+
+
+@dataclass
+class BulkResult:
+    index: int
+    id: Optional[int] = None
+    errors: Any = None
+    # созданный заказ (для group commit, которому нужен ответ как у одиночного создания)
+    order: Optional[Order] = field(default=None, repr=False, compare=False)
+
+
+class OrderBulkCreateService:
+    """Создает пачку заказов: одна транзакция и по одному bulk_create для заказов и блюд."""
+
+    @classmethod
+    def create_orders(cls, records: list[BulkRecord]) -> list[BulkResult]:
+        items = item_catalog.get_many(item["item_id"] for _, data in records for item in data["items"])
+
+        results = []
+        valid = []
+        for index, data in records:
+            missing = [item["item_id"] for item in data["items"] if item["item_id"] not in items]
+            if not data["items"]:
+                results.append(BulkResult(index, errors={"error": "Должно быть указано хотя бы одно блюдо."}))
+            elif missing:
+                results.append(BulkResult(index, errors={"error": ItemNotFoundError(missing).message}))
+            else:
+                valid.append((index, data))
+
+        try:
+            with transaction.atomic():
+                results += cls._insert(valid)
+        except DatabaseError:
+            # ошибка базы в пачке: повторяем по одной записи, чтобы сохранить корректные заказы
+            for record in valid:
+                try:
+                    with transaction.atomic():
+                        results += cls._insert([record])
+                except DatabaseError as e:
+                    results.append(BulkResult(record[0], errors={"error": str(e)}))
+
+        return sorted(results, key=lambda result: result.index)
+
+    @staticmethod
+    def _insert(records: list[BulkRecord]) -> list[BulkResult]:
+        if not records:
+            return []
+
+        orders = Order.objects.bulk_create(
+            Order(table_number=data["table_number"], total_price=sum(item["price"] for item in data["items"]))
+            for _, data in records
+        )
+        OrderItem.objects.bulk_create(
+            OrderItem(order=order, item_id=item["item_id"], price=item["price"])
+            for order, (_, data) in zip(orders, records)
+            for item in data["items"]
+        )
+        # bulk_create не отправляет сигналы
+        invalidate_order_responses()
+        for order in orders:
+            publish_order_event(ORDER_CREATED, order)
+        return [BulkResult(index, id=order.id, order=order) for order, (index, _) in zip(orders, records)]
@@ -0,0 +1,303 @@
+import csv
+import io
+import json
+import random
+from datetime import datetime, timedelta
+from decimal import Decimal
+from itertools import accumulate, islice
+from typing import Any, Iterator, Optional, TextIO
+
+from django.core import serializers
+from django.core.management.color import no_style
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.models import Max, Model
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from orders.models import ArchivedOrder, ArchivedOrderItem, Item, Order, OrderItem
+from orders.services.item_catalog import item_catalog
+from orders.services.order_service import update_order_totals
+from orders.services.response_cache import invalidate_order_responses
+from orders.services.revenue_service import RevenueService
+
+ITEM_FIELDS = ["id", "name"]
+ORDER_FIELDS = ["id", "table_number", "status", "paid_at", "ready_at", "total_price", "created_at", "updated_at", "version"]
+ORDER_ITEM_FIELDS = ["id", "order_id", "item_id", "price"]
+
+
+class TableLoader:
+    """Записывает готовые строки в таблицу модели: COPY в PostgreSQL, пачками bulk_create в остальных базах.
+
+    Значения пишутся как есть: сигналы, save() и значения по умолчанию модели не применяются,
+    поэтому строки должны быть полными (включая id).
+    """
+
+    def __init__(self, model: type[Model], fields: list[str], using: str = DEFAULT_DB_ALIAS,
+                 batch_size: int = 5000) -> None:
+        self.model = model
+        self.fields = fields
+        self.using = using
+        self.batch_size = batch_size
+        self.loaded = 0
+
+    @property
+    def uses_copy(self) -> bool:
+        return connections[self.using].vendor == "postgresql"
+
+    def load(self, rows: list[tuple]) -> int:
+        if not rows:
+            return 0
+        if self.uses_copy:
+            self._copy(rows)
+        else:
+            self.model.objects.using(self.using).bulk_create(
+                (self.model(**dict(zip(self.fields, row))) for row in rows), batch_size=self.batch_size,
+            )
+        self.loaded += len(rows)
+        return len(rows)
+
+    def _copy(self, rows: list[tuple]) -> None:
+        connection = connections[self.using]
+        qn = connection.ops.quote_name
+        columns = ", ".join(qn(self.model._meta.get_field(name).column) for name in self.fields)
+        sql = f"COPY {qn(self.model._meta.db_table)} ({columns}) FROM STDIN WITH (FORMAT csv)"
+
+        # в формате csv пустое поле без кавычек - это NULL
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(rows)
+        buffer.seek(0)
+        with connection.cursor() as cursor:
+            raw = cursor.cursor
+            if hasattr(raw, "copy_expert"):
+                raw.copy_expert(sql, buffer)
+            else:
+                with raw.copy(sql) as copy:
+                    copy.write(buffer.getvalue())
+
+
+def next_id(*models: type[Model], using: str = DEFAULT_DB_ALIAS) -> int:
+    # архивные таблицы хранят исходные id, поэтому новые id не должны пересекаться и с ними
+    return max(model.objects.using(using).aggregate(last=Max("id"))["last"] or 0 for model in models) + 1
+
+
+def finish_load(using: str = DEFAULT_DB_ALIAS, rebuild_revenue: bool = True) -> None:
+    """Действия после загрузки в обход ORM: последовательности id, статистика планировщика, сводки и кэши."""
+    connection = connections[using]
+    models: list[type[Model]] = [Item, Order, OrderItem]
+    with connection.cursor() as cursor:
+        for sql in connection.ops.sequence_reset_sql(no_style(), models):
+            cursor.execute(sql)
+        # без ANALYZE планировщик до автоочистки считает таблицы почти пустыми; во внешней транзакции
+        # не запускается: reltuples обновляется сразу и остался бы таким даже после ее отката
+        if connection.vendor == "postgresql" and not connection.in_atomic_block:
+            for model in models:
+                cursor.execute(f"ANALYZE {connection.ops.quote_name(model._meta.db_table)}")
+    if rebuild_revenue:
+        RevenueService.rebuild()
+    item_catalog.invalidate()
+    invalidate_order_responses()
+
+
+DISHES = [
+    ("Борщ", 390), ("Солянка", 450), ("Куриный суп", 320), ("Том ям", 620), ("Цезарь с курицей", 520),
+    ("Греческий салат", 430), ("Оливье", 350), ("Винегрет", 290), ("Пельмени", 480), ("Вареники с картофелем", 390),
+    ("Котлета по-киевски", 610), ("Бефстроганов", 690), ("Стейк рибай", 1900), ("Лосось на гриле", 1250),
+    ("Паста карбонара", 560), ("Паста болоньезе", 540), ("Ризотто с грибами", 590), ("Пицца Маргарита", 620),
+    ("Пицца Пепперони", 720), ("Бургер", 650), ("Картофель фри", 220), ("Пюре", 180), ("Гречка с грибами", 260),
+    ("Плов", 470), ("Шашлык из свинины", 780), ("Блины со сметаной", 280), ("Сырники", 340), ("Драники", 310),
+    ("Чизкейк", 390), ("Тирамису", 420), ("Медовик", 360), ("Мороженое", 250), ("Эспрессо", 150),
+    ("Капучино", 220), ("Латте", 240), ("Чай черный", 160), ("Морс", 180), ("Лимонад", 260),
+    ("Сок апельсиновый", 230), ("Минеральная вода", 140),
+]
+
+# доля заказов по часам дня: обеденный и вечерний пики
+HOUR_WEIGHTS = {
+    9: 2, 10: 3, 11: 5, 12: 11, 13: 13, 14: 9, 15: 5, 16: 4, 17: 6, 18: 10, 19: 13, 20: 11, 21: 6, 22: 2,
+}
+# количество блюд в заказе -> доля заказов
+ITEMS_PER_ORDER = {1: 20, 2: 30, 3: 22, 4: 13, 5: 7, 6: 4, 7: 2, 8: 2}
+# заказы моложе этого еще обслуживаются, старше - почти все оплачены
+OPEN_ORDER_AGE = timedelta(hours=2)
+OPEN_STATUS_WEIGHTS = {"pending": 5, "ready": 3, "paid": 2}
+CLOSED_STATUS_WEIGHTS = {"pending": 1, "ready": 1, "paid": 98}
+
+
+class DatasetGenerator:
+    """Синтетические заказы с правдоподобными распределениями.
+
+    Популярность блюд убывает по закону Ципфа, время заказов следует обеденному и вечернему пикам,
+    число блюд в заказе и статусы берутся из таблиц выше. При одинаковом seed данные повторяются.
+    """
+
+    def __init__(self, items: list[tuple[int, Decimal]], tables: int = 30, days: int = 90,
+                 seed: Optional[int] = None, now: Optional[datetime] = None) -> None:
+        if not items:
+            raise ValueError("Для генерации заказов нужно хотя бы одно блюдо")
+        self.items = items
+        self.tables = tables
+        self.days = days
+        self.random = random.Random(seed)
+        self.now = now or timezone.now()
+        self._item_weights = list(accumulate(1 / rank ** 1.1 for rank in range(1, len(items) + 1)))
+        self._hours, self._hour_weights = list(HOUR_WEIGHTS), list(accumulate(HOUR_WEIGHTS.values()))
+        self._sizes, self._size_weights = list(ITEMS_PER_ORDER), list(accumulate(ITEMS_PER_ORDER.values()))
+
+    @staticmethod
+    def menu(size: int, first_id: int) -> list[tuple[int, str, Decimal]]:
+        """Строки блюд (id, название, обычная цена); при size больше списка названия нумеруются."""
+        menu = []
+        for index in range(size):
+            name, price = DISHES[index % len(DISHES)]
+            if index >= len(DISHES):
+                name = f"{name} {index // len(DISHES) + 1}"
+            menu.append((first_id + index, name, Decimal(price)))
+        return menu
+
+    def _created_at(self) -> datetime:
+        day = timezone.localtime(self.now).replace(hour=0, minute=0, second=0, microsecond=0)
+        day -= timedelta(days=self.random.randrange(self.days))
+        hour = self.random.choices(self._hours, cum_weights=self._hour_weights)[0]
+        created_at = day + timedelta(hours=hour, seconds=self.random.randrange(3600))
+        return created_at - timedelta(days=1) if created_at > self.now else created_at
+
+    def _status(self, created_at: datetime) -> str:
+        weights = OPEN_STATUS_WEIGHTS if self.now - created_at < OPEN_ORDER_AGE else CLOSED_STATUS_WEIGHTS
+        return self.random.choices(list(weights), weights=list(weights.values()))[0]
+
+    def orders(self, count: int, first_order_id: int, first_line_id: int) -> Iterator[tuple[tuple, list[tuple]]]:
+        """Пары (строка заказа, строки его блюд) в порядке ORDER_FIELDS и ORDER_ITEM_FIELDS."""
+        line_id = first_line_id
+        for order_id in range(first_order_id, first_order_id + count):
+            created_at = self._created_at()
+            status = self._status(created_at)
+            ready_at: Optional[datetime] = None
+            paid_at: Optional[datetime] = None
+            if status != "pending":
+                ready_at = min(created_at + timedelta(minutes=self.random.randint(5, 40)), self.now)
+                if status == "paid":
+                    paid_at = min(ready_at + timedelta(minutes=self.random.randint(10, 80)), self.now)
+
+            size = self.random.choices(self._sizes, cum_weights=self._size_weights)[0]
+            lines = []
+            for item_id, price in self.random.choices(self.items, cum_weights=self._item_weights, k=size):
+                lines.append((line_id, order_id, item_id, price))
+                line_id += 1
+
+            total = sum(line[3] for line in lines)
+            order = (order_id, self.random.randint(1, self.tables), status, paid_at, ready_at, total, created_at,
+                     paid_at or ready_at or created_at, 1)
+            yield order, lines
+
+
+def generate_orders(generator: DatasetGenerator, count: int, batch_size: int = 50000,
+                    using: str = DEFAULT_DB_ALIAS) -> Iterator[int]:
+    """Загружает count синтетических заказов пачками по batch_size (транзакция на пачку) и отдает прогресс."""
+    orders_loader = TableLoader(Order, ORDER_FIELDS, using)
+    lines_loader = TableLoader(OrderItem, ORDER_ITEM_FIELDS, using)
+    rows = generator.orders(
+        count,
+        first_order_id=next_id(Order, ArchivedOrder, using=using),
+        first_line_id=next_id(OrderItem, ArchivedOrderItem, using=using),
+    )
+    loaded = 0
+    while batch := list(islice(rows, batch_size)):
+        with transaction.atomic(using=using):
+            orders_loader.load([order for order, _ in batch])
+            lines_loader.load([line for _, lines in batch for line in lines])
+        loaded += len(batch)
+        yield loaded
+
+
+def _prepared_row(obj: Model, fields: list[str]) -> tuple:
+    row = []
+    for name in fields:
+        field = obj._meta.get_field(name)
+        value = getattr(obj, field.attname)
+        # незаданные в фикстуре auto_now/auto_now_add заполняются так же, как при обычном сохранении
+        row.append(field.pre_save(obj, add=True) if value is None else value)
+    return tuple(row)
+
+
+def load_fixture(stream: TextIO, using: str = DEFAULT_DB_ALIAS, batch_size: int = 50000) -> dict[str, int]:
+    """Загружает фикстуру Django (JSON) с блюдами и заказами; суммы заказов пересчитываются по блюдам."""
+    rows: dict[type[Model], list[tuple]] = {Item: [], Order: [], OrderItem: []}
+    fields = {Item: ITEM_FIELDS, Order: ORDER_FIELDS, OrderItem: ORDER_ITEM_FIELDS}
+    for deserialized in serializers.deserialize("json", stream, using=using):
+        obj = deserialized.object
+        model = type(obj)
+        if model not in rows:
+            raise ValueError(f"Фикстура содержит неподдерживаемую модель: {model._meta.label}")
+        if model is Order and obj.status == "paid" and obj.paid_at is None:
+            obj.paid_at = timezone.now()
+        if model is Order and obj.status != "pending" and obj.ready_at is None:
+            obj.ready_at = obj.paid_at or timezone.now()
+        rows[model].append(_prepared_row(obj, fields[model]))
+
+    with transaction.atomic(using=using):
+        for model, model_rows in rows.items():
+            loader = TableLoader(model, fields[model], using)
+            for start in range(0, len(model_rows), batch_size):
+                loader.load(model_rows[start:start + batch_size])
+        order_ids = [row[0] for row in rows[Order]]
+        for start in range(0, len(order_ids), batch_size):
+            update_order_totals(order_ids[start:start + batch_size])
+    return {model._meta.model_name: len(model_rows) for model, model_rows in rows.items()}
+
+
+def _export_records(stream: TextIO) -> Iterator[dict[str, Any]]:
+    for line in stream:
+        if line.strip():
+            yield json.loads(line)
+
+
+def load_export(stream: TextIO, using: str = DEFAULT_DB_ALIAS, batch_size: int = 50000) -> Iterator[int]:
+    """Загружает выгрузку export_orders --output ndjson пачками; id заказов сохраняются, недостающие блюда создаются."""
+    items_loader = TableLoader(Item, ITEM_FIELDS, using)
+    orders_loader = TableLoader(Order, ORDER_FIELDS, using)
+    lines_loader = TableLoader(OrderItem, ORDER_ITEM_FIELDS, using)
+    known_items = set(Item.objects.using(using).values_list("id", flat=True))
+    line_id = next_id(OrderItem, ArchivedOrderItem, using=using)
+
+    records = _export_records(stream)
+    loaded = 0
+    while batch := list(islice(records, batch_size)):
+        new_items, orders, lines = {}, [], []
+        for record in batch:
+            created_at, paid_at = parse_datetime(record["created_at"]), None
+            if record["paid_at"]:
+                paid_at = parse_datetime(record["paid_at"])
+            # в выгрузке нет времени перехода в ready: оно остается неизвестным и не попадает в статистику
+            orders.append((record["id"], record["table_number"], record["status"], paid_at, None,
+                           Decimal(record["total_price"]), created_at, paid_at or created_at, 1))
+            for item in record["items"]:
+                if item["item_id"] not in known_items:
+                    new_items[item["item_id"]] = (item["item_id"], item["name"])
+                lines.append((line_id, record["id"], item["item_id"], Decimal(item["price"])))
+                line_id += 1
+
+        with transaction.atomic(using=using):
+            items_loader.load(list(new_items.values()))
+            orders_loader.load(orders)
+            lines_loader.load(lines)
+        known_items.update(new_items)
+        loaded += len(batch)
+        yield loaded
+
+
+def existing_menu(using: str = DEFAULT_DB_ALIAS) -> list[tuple[int, Decimal]]:
+    """Блюда с ценой для генератора: цена из истории заказов, из DISHES по названию или случайная."""
+    prices = dict(DISHES)
+    history: dict[int, Any] = dict(
+        OrderItem.objects.using(using).order_by().values_list("item_id").annotate(price=Max("price"))
+    )
+    menu = []
+    for item_id, name in Item.objects.using(using).order_by("id").values_list("id", "name"):
+        price = history.get(item_id) or prices.get(name) or random.Random(item_id).randint(150, 900)
+        menu.append((item_id, Decimal(price)))
+    return menu
+
+
+def create_menu(size: int, using: str = DEFAULT_DB_ALIAS) -> list[tuple[int, Decimal]]:
+    menu = DatasetGenerator.menu(size, first_id=next_id(Item, using=using))
+    TableLoader(Item, ITEM_FIELDS, using).load([(item_id, name) for item_id, name, _ in menu])
+    return [(item_id, price) for item_id, _, price in menu]
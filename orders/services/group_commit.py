@@ -0,0 +1,154 @@
+import threading
+from decimal import Decimal, InvalidOperation
+from typing import Any, Optional
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import connection
+
+from orders.db_router import mark_written
+from orders.models import Order
+from orders.services.bulk_service import BulkRecord, OrderBulkCreateService
+from orders.services.metrics import current_timing, start_timing, stop_timing
+from orders.services.order_service import resolve_items
+
+# Group commit для создания заказов в часы пик: запросы, пришедшие в пределах окна WINDOW_MS,
+# записываются одной транзакцией (по одному bulk_create для заказов и блюд) вместо транзакции
+# на запрос. Первый запрос пачки (лидер) ждет окно или заполнения пачки до MAX_BATCH и выполняет
+# запись в своем соединении, остальные ждут результата. Каждый запрос получает свой заказ или
+# свою ошибку: проверка блюд идет до постановки в пачку, а ошибка базы в пачке повторяется
+# по одной записи (как в OrderBulkCreateService). Режим работает между потоками одного процесса.
+# Запись за весь пакет выполняет лидер, поэтому после ответа каждый запрос сам отмечает ее в своем
+# RoutingState (cookie orders_primary_until) и в своих метриках: запросы к базе и время пачки.
+
+
+class GroupCommitError(Exception):
+    def __init__(self, message: str) -> None:
+        self.message = message
+        super().__init__(message)
+
+
+class _Entry:
+    def __init__(self, data: dict[str, Any]) -> None:
+        self.data = data
+        self.done = threading.Event()
+        self.order: Optional[Order] = None
+        self.error: Optional[Exception] = None
+        # запросы к базе и их время во всей пачке, которую ждал этот заказ
+        self.queries = 0
+        self.db = 0.0
+
+    def result(self) -> Order:
+        self.done.wait()
+        # выполняется в потоке своего запроса: состояние маршрутизации и метрики - его собственные
+        timing = current_timing()
+        if timing is not None:
+            timing.queries += self.queries
+            timing.db += self.db
+        if self.order is None:
+            raise self.error if self.error is not None else GroupCommitError("Заказ не создан.")
+        mark_written()
+        return self.order
+
+
+class _Batch:
+    def __init__(self) -> None:
+        self.entries: list[_Entry] = []
+        self.full = threading.Event()
+
+
+def _order_data(table_number: int, items_data: list[dict[str, Any]]) -> dict[str, Any]:
+    if not items_data:
+        raise ValidationError("Должно быть указано хотя бы одно блюдо.")
+    # блюда проверяются в потоке запроса: ненайденное блюдо не попадает в пачку
+    resolve_items(item_data["item_id"] for item_data in items_data)
+    items = []
+    for item_data in items_data:
+        try:
+            price = Decimal(str(item_data["price"]))
+        except InvalidOperation:
+            raise ValidationError(f"Некорректная цена: {item_data['price']}.")
+        items.append({"item_id": int(item_data["item_id"]), "price": price})
+    return {"table_number": table_number, "items": items}
+
+
+class GroupCommitter:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._batch: Optional[_Batch] = None
+        self._stats = {"batches": 0, "orders": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return settings.ORDERS_GROUP_COMMIT["ENABLED"]
+
+    @property
+    def window(self) -> float:
+        return settings.ORDERS_GROUP_COMMIT["WINDOW_MS"] / 1000
+
+    @property
+    def max_batch(self) -> int:
+        return max(1, settings.ORDERS_GROUP_COMMIT["MAX_BATCH"])
+
+    def create_order(self, table_number: int, items_data: list[dict[str, Any]]) -> Order:
+        """Создает заказ в общей пачке и возвращает его после фиксации транзакции пачки."""
+        entry = _Entry(_order_data(table_number, items_data))
+        if connection.in_atomic_block:
+            # внутри чужой транзакции запись чужих заказов не была бы зафиксирована вместе с ответом им
+            self._commit([entry])
+            return entry.result()
+
+        with self._lock:
+            batch = self._batch
+            leader = batch is None
+            if batch is None:
+                batch = self._batch = _Batch()
+            batch.entries.append(entry)
+            if len(batch.entries) >= self.max_batch:
+                self._batch = None
+                batch.full.set()
+
+        if leader:
+            batch.full.wait(self.window)
+            with self._lock:
+                if self._batch is batch:
+                    self._batch = None
+            self._commit(batch.entries)
+        return entry.result()
+
+    def _commit(self, entries: list[_Entry]) -> None:
+        records: list[BulkRecord] = list(enumerate(entry.data for entry in entries))
+        # запросы пачки учитываются не у лидера, а у каждого ее запроса (_Entry.result)
+        timing, token = start_timing()
+        try:
+            for result in OrderBulkCreateService.create_orders(records):
+                entry = entries[result.index]
+                if result.errors is not None:
+                    entry.error = GroupCommitError(result.errors["error"])
+                else:
+                    entry.order = result.order
+        except Exception as e:
+            for entry in entries:
+                if entry.order is None and entry.error is None:
+                    entry.error = e
+        finally:
+            stop_timing(token)
+            with self._lock:
+                self._stats["batches"] += 1
+                self._stats["orders"] += len(entries)
+            for entry in entries:
+                entry.queries, entry.db = timing.queries, timing.db
+                entry.done.set()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            stats: dict[str, float] = dict(self._stats)
+        stats["avg_batch"] = round(stats["orders"] / stats["batches"], 2) if stats["batches"] else 0.0
+        return stats
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self._stats = dict.fromkeys(self._stats, 0)
+
+
+group_commit = GroupCommitter()
@@ -0,0 +1,96 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Iterable, Optional
+
+from django.conf import settings
+
+from orders.models import Item
+
+
+class ItemCatalog:
+    """Кэш блюд в памяти процесса: LRU с ограничением размера и временем жизни записей.
+
+    Кэш локален для процесса, поэтому изменения, сделанные другими воркерами,
+    становятся видны не позже чем через ttl секунд.
+    """
+
+    def __init__(self, max_size: int, ttl: float) -> None:
+        self.max_size = max_size
+        self.ttl = ttl
+        self._items: OrderedDict[int, tuple[float, Item]] = OrderedDict()
+        self._menu: Optional[tuple[float, list[dict]]] = None
+        self._lock = threading.Lock()
+        # увеличивается при каждой инвалидации, чтобы не сохранить данные, прочитанные до нее
+        self._generation = 0
+
+    def get_many(self, item_ids: Iterable[int]) -> dict[int, Item]:
+        found, missing, generation = self._lookup(item_ids)
+        if missing:
+            loaded = Item.objects.in_bulk(missing)
+            found.update(loaded)
+            self._store(loaded, generation)
+        return found
+
+    async def aget_many(self, item_ids: Iterable[int]) -> dict[int, Item]:
+        found, missing, generation = self._lookup(item_ids)
+        if missing:
+            loaded = await Item.objects.ain_bulk(missing)
+            found.update(loaded)
+            self._store(loaded, generation)
+        return found
+
+    def _lookup(self, item_ids: Iterable[int]) -> tuple[dict[int, Item], set[int], int]:
+        now = time.monotonic()
+        found: dict[int, Item] = {}
+        missing: set[int] = set()
+
+        with self._lock:
+            for item_id in set(item_ids):
+                entry = self._items.get(item_id)
+                if entry and entry[0] > now:
+                    self._items.move_to_end(item_id)
+                    found[item_id] = entry[1]
+                else:
+                    missing.add(item_id)
+            return found, missing, self._generation
+
+    def _store(self, loaded: dict[int, Item], generation: int) -> None:
+        expires = time.monotonic() + self.ttl
+        with self._lock:
+            if generation != self._generation:
+                return
+            for item_id, item in loaded.items():
+                self._items[item_id] = (expires, item)
+                self._items.move_to_end(item_id)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+
+    def menu(self) -> list[dict]:
+        """Все блюда для формы создания заказа."""
+        now = time.monotonic()
+        with self._lock:
+            if self._menu and self._menu[0] > now:
+                return self._menu[1]
+            generation = self._generation
+
+        menu = list(Item.objects.order_by("id").values("name", "id"))
+        with self._lock:
+            if generation == self._generation:
+                self._menu = (now + self.ttl, menu)
+        return menu
+
+    def invalidate(self, item_id: Optional[int] = None) -> None:
+        with self._lock:
+            self._generation += 1
+            self._menu = None
+            if item_id is None:
+                self._items.clear()
+            else:
+                self._items.pop(item_id, None)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+item_catalog = ItemCatalog(max_size=settings.ITEM_CATALOG_MAX_SIZE, ttl=settings.ITEM_CATALOG_TTL)
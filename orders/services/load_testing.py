@@ -0,0 +1,267 @@
+import http.client
+import json
+import random
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional
+from urllib.parse import urlencode, urlsplit
+
+from django.db import connections
+from django.test import Client
+
+# Нагрузочный прогон: взвешенная смесь операций выполняется в concurrency потоках через тестовый
+# клиент Django (в этом процессе) или по HTTP к запущенному серверу. Сценарии описаны
+# в orders/tests/load_scenarios.py.
+
+# количество запросов к базе берется из Server-Timing (request_timing_middleware)
+_QUERIES = re.compile(r'desc="(\d+) queries"')
+# методы, которые HTTPTransport повторяет после обрыва соединения
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+
+
+@dataclass(frozen=True)
+class LoadRequest:
+    method: str
+    path: str
+    params: Optional[dict[str, Any]] = None
+    # тело запроса в JSON
+    data: Optional[Any] = None
+
+
+@dataclass(frozen=True)
+class LoadResponse:
+    status: int
+    body: bytes
+    server_timing: str = ""
+
+
+class ScenarioContext:
+    """Данные для построения запросов: блюда, заказы (в том числе созданные во время прогона) и столы."""
+
+    def __init__(self, item_ids: list[int], order_ids: list[int], tables: int = 20, seed: Optional[int] = None) -> None:
+        self.item_ids = item_ids
+        self.order_ids = order_ids
+        self.tables = tables
+        self.random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def item_id(self) -> int:
+        return self.random.choice(self.item_ids)
+
+    def order_id(self) -> Optional[int]:
+        with self._lock:
+            return self.random.choice(self.order_ids) if self.order_ids else None
+
+    def table_number(self) -> int:
+        return self.random.randint(1, self.tables)
+
+    def add_order(self, order_id: int) -> None:
+        with self._lock:
+            self.order_ids.append(order_id)
+
+
+@dataclass(frozen=True)
+class Operation:
+    # имя эндпоинта в отчете
+    name: str
+    weight: int
+    build: Callable[[ScenarioContext], Optional[LoadRequest]]
+    # вызывается после успешного ответа, например чтобы запомнить созданный заказ
+    on_success: Optional[Callable[[ScenarioContext, LoadResponse], None]] = None
+
+
+@dataclass(frozen=True)
+class Scenario:
+    name: str
+    description: str
+    operations: tuple[Operation, ...]
+
+    def pick(self, context: ScenarioContext) -> Operation:
+        return context.random.choices(self.operations, weights=[op.weight for op in self.operations])[0]
+
+
+class ClientTransport:
+    """Запросы через тестовый клиент Django: без сети, но через все middleware и представления."""
+
+    def __init__(self) -> None:
+        self._local = threading.local()
+
+    def send(self, request: LoadRequest) -> LoadResponse:
+        client = getattr(self._local, "client", None)
+        if client is None:
+            client = self._local.client = Client()
+        kwargs: dict[str, Any] = {}
+        if request.data is not None:
+            kwargs = {"data": json.dumps(request.data), "content_type": "application/json"}
+        path = f"{request.path}?{urlencode(request.params)}" if request.params else request.path
+        response = client.generic(request.method, path, **kwargs)
+        body = b"".join(response.streaming_content) if response.streaming else response.content
+        return LoadResponse(response.status_code, body, response.get("Server-Timing", ""))
+
+    def close(self) -> None:
+        # у каждого потока свое соединение с базой
+        connections.close_all()
+
+
+class HTTPTransport:
+    """Запросы к запущенному серверу (runserver, gunicorn, uvicorn) по keep-alive соединению на поток."""
+
+    def __init__(self, base_url: str, timeout: float = 30) -> None:
+        parts = urlsplit(base_url)
+        if parts.scheme != "http" or not parts.hostname:
+            raise ValueError(f"Ожидается адрес вида http://host:port, получено: {base_url}")
+        self.host, self.port, self.prefix = parts.hostname, parts.port or 80, parts.path.rstrip("/")
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def send(self, request: LoadRequest) -> LoadResponse:
+        body = json.dumps(request.data).encode() if request.data is not None else None
+        path = self.prefix + request.path
+        if request.params:
+            path = f"{path}?{urlencode(request.params)}"
+        headers = {"Content-Type": "application/json"} if body is not None else {}
+        try:
+            return self._request(request.method, path, body, headers)
+        except (http.client.HTTPException, OSError):
+            # сервер мог закрыть keep-alive соединение: один повтор на новом, но только для идемпотентных
+            # методов - POST мог быть выполнен до обрыва, и повтор создал бы второй заказ
+            if request.method.upper() not in IDEMPOTENT_METHODS:
+                raise
+            return self._request(request.method, path, body, headers)
+
+    def _request(self, method: str, path: str, body: Optional[bytes], headers: dict[str, str]) -> LoadResponse:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = self._local.connection = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+        try:
+            connection.request(method, path, body=body, headers=headers)
+            response = connection.getresponse()
+            return LoadResponse(response.status, response.read(), response.getheader("Server-Timing", ""))
+        except (http.client.HTTPException, OSError):
+            connection.close()
+            self._local.connection = None
+            raise
+
+    def close(self) -> None:
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+
+
+@dataclass
+class EndpointStats:
+    latencies: list[float] = field(default_factory=list)
+    queries: list[int] = field(default_factory=list)
+    errors: int = 0
+
+    def summary(self, elapsed: float) -> dict[str, Any]:
+        latencies = sorted(self.latencies)
+        return {
+            "requests": len(latencies),
+            "errors": self.errors,
+            "throughput_rps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+            "p50_ms": _percentile_ms(latencies, 50),
+            "p95_ms": _percentile_ms(latencies, 95),
+            "p99_ms": _percentile_ms(latencies, 99),
+            "max_ms": _percentile_ms(latencies, 100),
+            "queries_avg": round(sum(self.queries) / len(self.queries), 2) if self.queries else None,
+            "queries_max": max(self.queries, default=None),
+        }
+
+
+def _percentile_ms(sorted_values: list[float], percent: float) -> Optional[float]:
+    # по ближайшему рангу: значение, не меньше которого percent процентов замеров
+    if not sorted_values:
+        return None
+    rank = max(1, -(-len(sorted_values) * percent // 100))
+    return round(sorted_values[int(rank) - 1] * 1000, 2)
+
+
+class LoadRunner:
+    def __init__(self, scenario: Scenario, transport: Any, context: ScenarioContext, concurrency: int = 1) -> None:
+        self.scenario = scenario
+        self.transport = transport
+        self.context = context
+        self.concurrency = max(1, concurrency)
+        self._lock = threading.Lock()
+        self._stats: dict[str, EndpointStats] = {}
+
+    def run(self, requests: Optional[int] = None, duration: Optional[float] = None) -> dict[str, Any]:
+        """Выполняет requests запросов или работает duration секунд и возвращает отчет."""
+        if requests is None and duration is None:
+            raise ValueError("Нужно указать количество запросов или длительность")
+        self._stats = {op.name: EndpointStats() for op in self.scenario.operations}
+        self._remaining = requests
+        self._deadline = time.perf_counter() + duration if duration is not None else None
+
+        started = time.perf_counter()
+        if self.concurrency == 1:
+            # без потоков: так прогон видит транзакцию вызывающего кода (например, теста)
+            self._worker(close=False)
+        else:
+            with ThreadPoolExecutor(self.concurrency) as pool:
+                for future in [pool.submit(self._worker) for _ in range(self.concurrency)]:
+                    future.result()
+        elapsed = time.perf_counter() - started
+        return self._report(elapsed)
+
+    def _next(self) -> bool:
+        with self._lock:
+            if self._deadline is not None and time.perf_counter() >= self._deadline:
+                return False
+            if self._remaining is not None:
+                if self._remaining <= 0:
+                    return False
+                self._remaining -= 1
+            return True
+
+    def _worker(self, close: bool = True) -> None:
+        try:
+            while self._next():
+                operation = self.scenario.pick(self.context)
+                request = operation.build(self.context)
+                if request is None:
+                    # операции не на чем выполняться (например, еще нет заказов)
+                    continue
+                started = time.perf_counter()
+                try:
+                    response = self.transport.send(request)
+                except Exception:
+                    response = None
+                latency = time.perf_counter() - started
+                self._record(operation, response, latency)
+        finally:
+            if close:
+                self.transport.close()
+
+    def _record(self, operation: Operation, response: Optional[LoadResponse], latency: float) -> None:
+        failed = response is None or response.status >= 400
+        if response is not None and not failed and operation.on_success is not None:
+            operation.on_success(self.context, response)
+        queries = _QUERIES.search(response.server_timing) if response is not None else None
+        with self._lock:
+            stats = self._stats[operation.name]
+            stats.latencies.append(latency)
+            stats.errors += failed
+            if queries:
+                stats.queries.append(int(queries.group(1)))
+
+    def _report(self, elapsed: float) -> dict[str, Any]:
+        total = EndpointStats()
+        for stats in self._stats.values():
+            total.latencies += stats.latencies
+            total.queries += stats.queries
+            total.errors += stats.errors
+        return {
+            "scenario": self.scenario.name,
+            "transport": type(self.transport).__name__,
+            "concurrency": self.concurrency,
+            "elapsed_s": round(elapsed, 3),
+            "total": total.summary(elapsed),
+            "endpoints": {
+                name: stats.summary(elapsed) for name, stats in self._stats.items() if stats.latencies
+            },
+        }
@@ -0,0 +1,141 @@
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional
+
+# Метрики запросов в памяти процесса: при нескольких воркерах Prometheus опрашивает каждый отдельно.
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+@dataclass
+class RequestTiming:
+    """Замеры одного запроса; доступны коду запроса через current_timing()."""
+    started: float = field(default_factory=time.perf_counter)
+    view_finished: Optional[float] = None
+    queries: int = 0
+    db: float = 0.0
+
+
+_current: ContextVar[Optional[RequestTiming]] = ContextVar("orders_request_timing", default=None)
+
+
+def current_timing() -> Optional[RequestTiming]:
+    return _current.get()
+
+
+def start_timing() -> tuple[RequestTiming, Any]:
+    timing = RequestTiming()
+    return timing, _current.set(timing)
+
+
+def stop_timing(token: Any) -> None:
+    _current.reset(token)
+
+
+def timed_execute(execute: Callable, sql: str, params: Any, many: bool, context: dict) -> Any:
+    """execute_wrapper соединения: считает запросы и время базы текущего запроса."""
+    timing = _current.get()
+    if timing is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timing.db += time.perf_counter() - started
+        timing.queries += 1
+
+
+def install_query_timer(sender: Any, connection: Any, **kwargs) -> None:
+    """Обработчик connection_created: подключает timed_execute к новому соединению."""
+    if timed_execute not in connection.execute_wrappers:
+        # в начало списка, чтобы не мешать execute_wrapper(), снимающему последнюю обертку
+        connection.execute_wrappers.insert(0, timed_execute)
+
+
+class Histogram:
+    def __init__(self, name: str, documentation: str, buckets: tuple[float, ...]) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.buckets = buckets
+        # route -> (счетчики по корзинам, сумма, количество)
+        self._series: dict[str, tuple[list[int], float, int]] = {}
+
+    def observe(self, route: str, value: float) -> None:
+        counts, total, count = self._series.get(route) or ([0] * len(self.buckets), 0.0, 0)
+        index = bisect_left(self.buckets, value)
+        if index < len(counts):
+            counts[index] += 1
+        self._series[route] = (counts, total + value, count + 1)
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        for route, (counts, total, count) in sorted(self._series.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                lines.append(f'{self.name}_bucket{{route="{route}",le="{_number(bound)}"}} {cumulative}')
+            lines.append(f'{self.name}_bucket{{route="{route}",le="+Inf"}} {count}')
+            lines.append(f'{self.name}_sum{{route="{route}"}} {_number(total)}')
+            lines.append(f'{self.name}_count{{route="{route}"}} {count}')
+        return lines
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class RequestMetrics:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._create()
+
+    def _create(self) -> None:
+        self.duration = Histogram("orders_request_duration_seconds", "Полное время обработки запроса", LATENCY_BUCKETS)
+        self.view = Histogram("orders_request_view_seconds", "Время представления и сериализации", LATENCY_BUCKETS)
+        self.render = Histogram("orders_request_render_seconds", "Время рендеринга ответа", LATENCY_BUCKETS)
+        self.db = Histogram("orders_request_db_seconds", "Суммарное время запросов к базе", LATENCY_BUCKETS)
+        self.queries = Histogram("orders_request_queries", "Количество запросов к базе", QUERY_BUCKETS)
+        self._responses: dict[tuple[str, str], int] = {}
+
+    def observe(self, route: str, status_code: int, timing: RequestTiming, finished: float) -> dict[str, float]:
+        """Учитывает запрос и возвращает длительности фаз в секундах."""
+        view_finished = timing.view_finished or finished
+        phases = {
+            "db": timing.db,
+            "view": view_finished - timing.started,
+            "render": finished - view_finished,
+            "total": finished - timing.started,
+        }
+        with self._lock:
+            self.duration.observe(route, phases["total"])
+            self.view.observe(route, phases["view"])
+            self.render.observe(route, phases["render"])
+            self.db.observe(route, phases["db"])
+            self.queries.observe(route, timing.queries)
+            key = (route, f"{status_code // 100}xx")
+            self._responses[key] = self._responses.get(key, 0) + 1
+        return phases
+
+    def render_text(self) -> str:
+        with self._lock:
+            lines = []
+            for histogram in (self.duration, self.view, self.render, self.db, self.queries):
+                lines += histogram.render()
+            lines += ["# HELP orders_responses_total Ответы по маршрутам и классам статуса",
+                      "# TYPE orders_responses_total counter"]
+            lines += [
+                f'orders_responses_total{{route="{route}",status="{status}"}} {count}'
+                for (route, status), count in sorted(self._responses.items())
+            ]
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        with self._lock:
+            self._create()
+
+
+request_metrics = RequestMetrics()
@@ -0,0 +1,226 @@
+import asyncio
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Optional
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.db import transaction
+from django.db.models import Max
+from django.dispatch import receiver
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from orders.models import Order, OrderEvent
+
+ORDER_CREATED = "created"
+STATUS_CHANGED = "status_changed"
+ITEMS_CHANGED = "items_changed"
+ORDER_DELETED = "deleted"
+
+
+@dataclass(frozen=True)
+class Event:
+    id: int
+    kind: str
+    order_id: int
+    table_number: int
+    status: str
+    created_at: datetime
+    # статус до перехода, только у status_changed
+    previous_status: Optional[str] = None
+
+    def matches(self, status: Optional[str] = None, table_number: Optional[int] = None) -> bool:
+        # экран, отфильтрованный по статусу, получает и уход заказа из этого статуса
+        status_matches = status is None or status in (self.status, self.previous_status)
+        return status_matches and (table_number is None or self.table_number == table_number)
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "id": self.id,
+            "type": self.kind,
+            "order_id": self.order_id,
+            "table_number": self.table_number,
+            "status": self.status,
+            "previous_status": self.previous_status,
+            "created_at": self.created_at.isoformat(),
+        }
+
+
+class InProcessEventBackend:
+    """Последние события в памяти процесса. Подходит, когда приложение работает в одном процессе.
+
+    Ожидающие клиенты не занимают потоков: асинхронные ждут asyncio.Event своего цикла событий,
+    синхронные - общий threading.Condition.
+    """
+
+    # как часто ожидающий клиент проверяет общее хранилище; None - только по уведомлению
+    poll_interval: Optional[float] = None
+
+    def __init__(self, buffer_size: int = 1000) -> None:
+        self._events: deque[Event] = deque(maxlen=buffer_size)
+        self._last_id = 0
+        self._condition = threading.Condition()
+        self._waiters: set[tuple[asyncio.AbstractEventLoop, asyncio.Event]] = set()
+
+    def publish(self, kind: str, order_id: int, table_number: int, status: str,
+                previous_status: Optional[str] = None) -> None:
+        with self._condition:
+            self._append([
+                Event(self._last_id + 1, kind, order_id, table_number, status, timezone.now(), previous_status)
+            ])
+
+    def latest_id(self) -> int:
+        self._poll()
+        return self._last_id
+
+    def events_after(self, last_id: int) -> list[Event]:
+        with self._condition:
+            return [event for event in self._events if event.id > last_id]
+
+    def wait(self, last_id: int, timeout: float) -> list[Event]:
+        deadline = time.monotonic() + timeout
+        while True:
+            self._poll()
+            with self._condition:
+                events = [event for event in self._events if event.id > last_id]
+                remaining = deadline - time.monotonic()
+                if events or remaining <= 0:
+                    return events
+                self._condition.wait(self._step(remaining))
+
+    async def await_events(self, last_id: int, timeout: float) -> list[Event]:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        waiter = (loop, asyncio.Event())
+        with self._condition:
+            self._waiters.add(waiter)
+        try:
+            while True:
+                # флаг сбрасывается до проверки, чтобы не пропустить событие между проверкой и ожиданием
+                waiter[1].clear()
+                if self._poll_due():
+                    await sync_to_async(self._poll)()
+                events = self.events_after(last_id)
+                remaining = deadline - loop.time()
+                if events or remaining <= 0:
+                    return events
+                try:
+                    await asyncio.wait_for(waiter[1].wait(), self._step(remaining))
+                except TimeoutError:
+                    pass
+        finally:
+            with self._condition:
+                self._waiters.discard(waiter)
+
+    def _append(self, events: list[Event]) -> None:
+        # вызывается под self._condition
+        self._events.extend(events)
+        self._last_id = events[-1].id
+        self._condition.notify_all()
+        for loop, ready in self._waiters:
+            loop.call_soon_threadsafe(ready.set)
+
+    def _step(self, remaining: float) -> float:
+        return remaining if self.poll_interval is None else min(remaining, self.poll_interval)
+
+    def _poll_due(self) -> bool:
+        return False
+
+    def _poll(self, force: bool = False) -> None:
+        pass
+
+
+class DatabaseEventBackend(InProcessEventBackend):
+    """События в таблице OrderEvent: видны всем воркерам, работающим с одной базой.
+
+    Каждый процесс держит один общий буфер и опрашивает таблицу не чаще раза в poll_interval,
+    сколько бы клиентов ни ждало событий.
+
+    Id событий выдает последовательность при вставке, а видны они после фиксации, поэтому событие
+    с меньшим id может появиться в таблице позже большего. Опрос отдает события строго по порядку id:
+    на пропуске он останавливается и ждет до gap_timeout секунд (пропуск может остаться навсегда,
+    если вставка откатилась). Так клиенты, запоминающие последний id, ничего не теряют.
+    """
+
+    def __init__(self, buffer_size: int = 1000, poll_interval: float = 1.0, retention: int = 10000,
+                 gap_timeout: float = 2.0, cleanup_interval: float = 60.0) -> None:
+        super().__init__(buffer_size)
+        self.poll_interval = poll_interval
+        self.retention = retention
+        self.gap_timeout = gap_timeout
+        self.cleanup_interval = cleanup_interval
+        self._poll_lock = threading.Lock()
+        self._polled_at: Optional[float] = None
+        # (первый недостающий id, когда пропуск замечен)
+        self._gap: Optional[tuple[int, float]] = None
+        self._cleaned_at: Optional[float] = None
+
+    def publish(self, kind: str, order_id: int, table_number: int, status: str,
+                previous_status: Optional[str] = None) -> None:
+        if self._polled_at is None:
+            self._poll(force=True)
+        event = OrderEvent.objects.create(kind=kind, order_id=order_id, table_number=table_number, status=status,
+                                          previous_status=previous_status or "")
+        now = time.monotonic()
+        if self._cleaned_at is None or now - self._cleaned_at >= self.cleanup_interval:
+            self._cleaned_at = now
+            OrderEvent.objects.filter(id__lte=event.id - self.retention).delete()
+        # клиенты этого процесса узнают о событии сразу, остальных воркеров догонит опрос
+        self._poll(force=True)
+
+    def _poll_due(self) -> bool:
+        return self._polled_at is None or time.monotonic() - self._polled_at >= (self.poll_interval or 0)
+
+    def _poll(self, force: bool = False) -> None:
+        with self._poll_lock:
+            if not force and not self._poll_due():
+                return
+            if self._polled_at is None:
+                # история до запуска процесса не воспроизводится
+                self._last_id = OrderEvent.objects.aggregate(last_id=Max("id"))["last_id"] or 0
+            self._polled_at = time.monotonic()
+
+            rows = OrderEvent.objects.filter(id__gt=self._last_id).order_by("id")[:self._events.maxlen]
+            events = []
+            expected = self._last_id + 1
+            for row in rows:
+                if row.id != expected and not self._gap_expired(expected):
+                    break
+                events.append(Event(row.id, row.kind, row.order_id, row.table_number, row.status, row.created_at,
+                                    row.previous_status or None))
+                expected = row.id + 1
+            if events:
+                with self._condition:
+                    self._append(events)
+
+    def _gap_expired(self, missing_id: int) -> bool:
+        now = time.monotonic()
+        if self._gap is None or self._gap[0] != missing_id:
+            self._gap = (missing_id, now)
+        return now - self._gap[1] >= self.gap_timeout
+
+
+@lru_cache(maxsize=None)
+def event_backend() -> InProcessEventBackend:
+    return import_string(settings.ORDERS_EVENTS["BACKEND"])(**settings.ORDERS_EVENTS.get("OPTIONS", {}))
+
+
+@receiver(setting_changed)
+def _reset_event_backend(setting: str, **kwargs) -> None:
+    if setting == "ORDERS_EVENTS":
+        event_backend.cache_clear()
+
+
+def publish_order_event(kind: str, order: Order, previous_status: Optional[str] = None) -> None:
+    # событие уходит после фиксации транзакции, чтобы экраны не увидели отмененных изменений
+    order_id, table_number, status = order.id, order.table_number, order.status
+    transaction.on_commit(
+        lambda: event_backend().publish(kind, order_id, table_number, status, previous_status),
+        robust=True,
+    )
@@ -0,0 +1,101 @@
+import re
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from typing import Optional
+
+from django.contrib.postgres.search import SearchQuery
+from django.db import connection
+from django.db.models import Exists, OuterRef, Prefetch, Q, QuerySet
+from django.utils import timezone
+
+from orders.models import DISH_SEARCH_CONFIG, Item, Order, OrderItem, dish_search_vector
+
+# поля заказа, которые нужны спискам (шаблон и API) и постраничному выводу
+ORDER_LIST_FIELDS = ("id", "table_number", "status", "total_price", "created_at", "paid_at", "updated_at", "version")
+
+
+def _list_orders() -> QuerySet[Order]:
+    # списки HTML и API читают одни и те же поля заказа, различаются только позиции
+    return Order.objects.only(*ORDER_LIST_FIELDS)
+
+
+def orders_for_page() -> QuerySet[Order]:
+    """Заказы для HTML-списка; позиции подгружаются через page_items_prefetch() только для строк не из кэша."""
+    return _list_orders()
+
+
+def page_items_prefetch() -> Prefetch:
+    """Позиции с названиями блюд для строк HTML-списка: один запрос на страницу."""
+    items = OrderItem.objects.select_related("item").only("id", "order_id", "price", "item__name").order_by("id")
+    return Prefetch("items", queryset=items)
+
+
+def api_items_prefetch() -> Prefetch:
+    """Позиции для OrderSerializer: без join с блюдами, только item_id и цена."""
+    items = OrderItem.objects.only("id", "order_id", "item_id", "price").order_by("id")
+    return Prefetch("items", queryset=items)
+
+
+def orders_for_api() -> QuerySet[Order]:
+    """Заказы для OrderSerializer; позиции подгружаются через api_items_prefetch() после проверки ETag."""
+    return _list_orders()
+
+
+def items_matching(name: str) -> QuerySet[Item]:
+    """Блюда, в названии которых каждое введенное слово является началом слова (в PostgreSQL с учетом словоформ).
+
+    В PostgreSQL поиск идет по полнотекстовому GIN-индексу item_name_search_idx, в остальных базах - icontains.
+    """
+    terms = re.findall(r"\w+", name)
+    if not terms:
+        return Item.objects.none()
+    if connection.vendor == "postgresql":
+        # слова уже очищены регулярным выражением, поэтому запрос в формате to_tsquery безопасен
+        query = SearchQuery(" & ".join(f"{term}:*" for term in terms), search_type="raw", config=DISH_SEARCH_CONFIG)
+        return Item.objects.annotate(search=dish_search_vector()).filter(search=query)
+    condition = Q()
+    for term in terms:
+        condition &= Q(name__icontains=term)
+    return Item.objects.filter(condition)
+
+
+def _start_of_day(day: date) -> datetime:
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def filter_orders(orders: QuerySet[Order], status: Optional[str] = None, table_number: Optional[int] = None,
+                  min_total: Optional[Decimal] = None, max_total: Optional[Decimal] = None,
+                  date_from: Optional[date] = None, date_to: Optional[date] = None,
+                  item_id: Optional[int] = None, dish: Optional[str] = None) -> QuerySet[Order]:
+    """Фильтры поиска заказов, общие для API поиска и выгрузки (в том числе архивных заказов)."""
+    if table_number:
+        orders = orders.filter(table_number=table_number)
+
+    if status:
+        orders = orders.filter(status=status)
+
+    if min_total is not None:
+        orders = orders.filter(total_price__gte=min_total)
+
+    if max_total is not None:
+        orders = orders.filter(total_price__lte=max_total)
+
+    # границы периода считаются в Python, чтобы сравнение шло по индексу created_at, а не по created_at::date
+    if date_from:
+        orders = orders.filter(created_at__gte=_start_of_day(date_from))
+
+    if date_to:
+        orders = orders.filter(created_at__lt=_start_of_day(date_to + timedelta(days=1)))
+
+    # блюдо - через EXISTS, а не join: заказ с несколькими такими позициями не дублируется
+    lines = orders.model._meta.get_field("items").related_model.objects.filter(order=OuterRef("pk"))
+    if item_id:
+        orders = orders.filter(Exists(lines.filter(item_id=item_id)))
+
+    if dish:
+        # id блюд читаются отдельным запросом к маленькой таблице: с конкретными id планировщик оценивает
+        # частоту блюда по статистике, а с вложенным подзапросом перебирает заказы в поисках совпадений
+        item_ids = list(items_matching(dish).values_list("id", flat=True))
+        orders = orders.filter(Exists(lines.filter(item_id__in=item_ids))) if item_ids else orders.none()
+
+    return orders
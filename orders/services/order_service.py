@@ -1,35 +1,109 @@
-from typing import Any
+from decimal import Decimal
+from typing import Any, Iterable, Optional
 
 from django.core.exceptions import ValidationError
 from django.db import transaction, DatabaseError, IntegrityError
-from django.db.models import QuerySet
+from django.db.models import QuerySet, OuterRef, Subquery, Sum, Value, DecimalField, F
+from django.db.models.functions import Coalesce, Now
 
 from orders.forms import OrderSearchForm, UpdateOrderForm, OrderItemFormSet, CreateOrderForm
 from orders.models import OrderItem, Item, Order
+from orders.services.item_catalog import item_catalog
+from orders.services.order_events import ITEMS_CHANGED, publish_order_event
+from orders.services.order_queries import filter_orders
+from orders.services.response_cache import invalidate_order_responses
+from orders.services.revenue_service import mark_dirty, order_bucket, revenue_batch
+from orders.services.status_service import change_status
 
 
 class ItemNotFoundError(Exception):
-    def __init__(self) -> None:
-        self.message = "Блюдо не найдено."
+    def __init__(self, missing_ids: Iterable[Any] = ()) -> None:
+        self.missing_ids = list(missing_ids)
+        if self.missing_ids:
+            self.message = f"Блюдо не найдено: {', '.join(str(item_id) for item_id in self.missing_ids)}."
+        else:
+            self.message = "Блюдо не найдено."
         super().__init__(self.message)
 
 
+def items_total_subquery() -> Coalesce:
+    totals = (
+        OrderItem.objects
+        .filter(order=OuterRef("pk"))
+        .order_by()
+        .values("order")
+        .annotate(total=Sum("price"))
+        .values("total")
+    )
+    return Coalesce(Subquery(totals), Value(Decimal("0.00")), output_field=DecimalField(max_digits=12, decimal_places=2))
+
+
+def update_order_totals(order_ids: Iterable[int], bump_version: bool = True) -> int:
+    changes: dict[str, Any] = {"total_price": items_total_subquery()}
+    if bump_version:
+        changes.update(version=F("version") + 1, updated_at=Now())
+    updated = Order.objects.filter(id__in=list(order_ids)).update(**changes)
+    # UPDATE не отправляет сигналы, поэтому кэш ответов сбрасываем явно
+    invalidate_order_responses()
+    return updated
+
+
+def refresh_order_total(order: Order, bump_version: bool = True) -> None:
+    """Пересчитывает сумму заказа; версия увеличивается только при изменении уже существующего заказа."""
+    update_order_totals([order.id], bump_version=bump_version)
+    order.refresh_from_db(fields=["total_price", "version", "updated_at"])
+
+
+def _parse_item_ids(item_ids: Iterable[Any]) -> dict[Any, Optional[int]]:
+    parsed: dict[Any, Optional[int]] = {}
+    for item_id in item_ids:
+        try:
+            parsed[item_id] = int(item_id)
+        except (TypeError, ValueError):
+            parsed[item_id] = None
+    return parsed
+
+
+def _check_missing(parsed: dict[Any, Optional[int]], items: dict[int, Item]) -> dict[int, Item]:
+    missing = [item_id for item_id, pk in parsed.items() if pk not in items]
+    if missing:
+        raise ItemNotFoundError(missing)
+    return items
+
+
+def resolve_items(item_ids: Iterable[Any]) -> dict[int, Item]:
+    """Загружает все блюда заказа одним запросом (или из кэша) и сообщает обо всех ненайденных."""
+    parsed = _parse_item_ids(item_ids)
+    return _check_missing(parsed, item_catalog.get_many(pk for pk in parsed.values() if pk is not None))
+
+
+async def aresolve_items(item_ids: Iterable[Any]) -> dict[int, Item]:
+    parsed = _parse_item_ids(item_ids)
+    return _check_missing(parsed, await item_catalog.aget_many(pk for pk in parsed.values() if pk is not None))
+
+
 class OrderService:
     def __init__(self, form: OrderSearchForm) -> None:
         self.form = form
 
     def get(self, orders: QuerySet[Order]) -> QuerySet[Order]:
         if self.form.is_valid():
-            table_number = self.form.cleaned_data.get("table_number")
             status = self.form.cleaned_data.get("status")
 
-            if table_number:
-                orders = orders.filter(table_number=table_number)
+            if status and status not in dict(Order.STATUS_CHOICES).keys():
+                raise ValidationError("Недопустимый статус заказа!")
 
-            if status:
-                if status not in dict(Order.STATUS_CHOICES).keys():
-                    raise ValidationError("Недопустимый статус заказа!")
-                orders = orders.filter(status=status)
+            orders = filter_orders(
+                orders,
+                status=status,
+                table_number=self.form.cleaned_data.get("table_number"),
+                min_total=self.form.cleaned_data.get("min_total"),
+                max_total=self.form.cleaned_data.get("max_total"),
+                date_from=self.form.cleaned_data.get("date_from"),
+                date_to=self.form.cleaned_data.get("date_to"),
+                item_id=self.form.cleaned_data.get("dish_id"),
+                dish=self.form.cleaned_data.get("dish"),
+            )
         else:
             raise ValidationError("Некорректные данные для поиска")
         return orders
@@ -48,19 +122,19 @@ class OrderCreateService:
     @staticmethod
     def create_order_items(items_data: list[dict[str, Any]], order: Order) -> None:
         if items_data:
-            all_items = []
-            for item_data in items_data:
-                try:
-                    item_obj = Item.objects.get(id=item_data["item_id"])
-                except Exception:
-                    raise ItemNotFoundError()
-
-                new_item = OrderItem(order=order, item=item_obj, price=item_data["price"])
-                all_items.append(new_item)
+            items = resolve_items(item_data["item_id"] for item_data in items_data)
+            all_items = [
+                OrderItem(order=order, item=items[int(item_data["item_id"])], price=item_data["price"])
+                for item_data in items_data
+            ]
             try:
                 OrderItem.objects.bulk_create(all_items)
             except (IntegrityError, DatabaseError) as e:
                 raise e
+            # заказ только что создан в этой же транзакции: его версию еще никто не видел
+            refresh_order_total(order, bump_version=False)
+            # bulk_create не отправляет сигналы, поэтому сводку выручки помечаем явно
+            mark_dirty(order_bucket(order))
         else:
             raise ValidationError("Должно быть указано хотя бы одно блюдо.")
 
@@ -79,8 +153,10 @@ class OrderUpdateService:
             raise ValidationError("Ошибка при заполнении блюд в заказе.")
 
         try:
-            with transaction.atomic():
-                self.form.save()
+            with transaction.atomic(), revenue_batch():
+                # только статус и одним условным UPDATE: save() формы записал бы все поля устаревшей копии заказа
+                if "status" in self.form.changed_data:
+                    change_status(self.order, self.form.cleaned_data["status"])
                 self._update_order_items(self.formset)
 
                 if not self.order.items.exists():
@@ -102,3 +178,101 @@ class OrderUpdateService:
 
         for obj in formset.deleted_objects:
             obj.delete()
+
+        # без изменений позиций версия и ETag заказа остаются прежними
+        if instances or formset.deleted_objects:
+            refresh_order_total(self.order)
+            publish_order_event(ITEMS_CHANGED, self.order)
+
+
+class OrderItemNotFoundError(Exception):
+    def __init__(self, missing_ids: Iterable[Any]) -> None:
+        self.missing_ids = list(missing_ids)
+        self.message = f"Позиция заказа не найдена: {', '.join(str(line_id) for line_id in self.missing_ids)}."
+        super().__init__(self.message)
+
+
+class OrderItemsDiffService:
+    """Изменяет позиции заказа минимальным набором INSERT/UPDATE/DELETE вместо удаления и вставки всех строк."""
+
+    def __init__(self, order: Order) -> None:
+        self.order = order
+
+    def replace(self, items_data: list[dict[str, Any]]) -> None:
+        if not items_data:
+            raise ValidationError("Должно быть указано хотя бы одно блюдо.")
+        resolve_items(item_data["item_id"] for item_data in items_data)
+
+        existing = list(self.order.items.order_by("id"))
+        wanted = [(int(item_data["item_id"]), Decimal(item_data["price"])) for item_data in items_data]
+
+        # 1. строки, совпадающие полностью, не трогаем
+        unmatched = []
+        for line in existing:
+            key = (line.item_id, line.price)
+            if key in wanted:
+                wanted.remove(key)
+            else:
+                unmatched.append(line)
+
+        # 2. оставшиеся строки переиспользуем: сначала с тем же блюдом, затем любые
+        to_update = []
+        for same_item_only in (True, False):
+            for line in list(unmatched):
+                match = next((w for w in wanted if not same_item_only or w[0] == line.item_id), None)
+                if match is None:
+                    continue
+                wanted.remove(match)
+                unmatched.remove(line)
+                line.item_id, line.price = match
+                to_update.append(line)
+
+        self._apply(
+            to_create=[OrderItem(order=self.order, item_id=item_id, price=price) for item_id, price in wanted],
+            to_update=to_update,
+            to_delete=[line.id for line in unmatched],
+        )
+
+    def apply_changes(self, add: list[dict[str, Any]], update: list[dict[str, Any]], remove: list[int]) -> None:
+        resolve_items(
+            [item_data["item_id"] for item_data in add]
+            + [line_data["item_id"] for line_data in update if "item_id" in line_data]
+        )
+
+        line_ids = {line_data["id"] for line_data in update} | set(remove)
+        lines = self.order.items.in_bulk(line_ids)
+        missing = sorted(line_ids - lines.keys())
+        if missing:
+            raise OrderItemNotFoundError(missing)
+
+        to_update = []
+        for line_data in update:
+            line = lines[line_data["id"]]
+            line.item_id = line_data.get("item_id", line.item_id)
+            line.price = line_data.get("price", line.price)
+            to_update.append(line)
+
+        self._apply(
+            to_create=[
+                OrderItem(order=self.order, item_id=item_data["item_id"], price=item_data["price"])
+                for item_data in add
+            ],
+            to_update=to_update,
+            to_delete=list(remove),
+        )
+        if not self.order.items.exists():
+            raise ValidationError("Должно быть указано хотя бы одно блюдо.")
+
+    def _apply(self, to_create: list[OrderItem], to_update: list[OrderItem], to_delete: list[int]) -> None:
+        if to_delete:
+            OrderItem.objects.filter(order=self.order, id__in=to_delete).delete()
+        if to_update:
+            OrderItem.objects.bulk_update(to_update, ["item", "price"])
+        if to_create:
+            OrderItem.objects.bulk_create(to_create)
+
+        if to_delete or to_update or to_create:
+            refresh_order_total(self.order)
+            # bulk_update и bulk_create не отправляют сигналы
+            mark_dirty(order_bucket(self.order))
+            publish_order_event(ITEMS_CHANGED, self.order)
@@ -0,0 +1,128 @@
+import base64
+import binascii
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Optional
+
+from django.conf import settings
+from django.db.models import Q, QuerySet
+
+from orders.models import Order
+
+
+class InvalidCursorError(ValueError):
+    def __init__(self) -> None:
+        self.message = "Некорректный курсор страницы."
+        super().__init__(self.message)
+
+
+@dataclass
+class Page:
+    items: list[Order]
+    next_cursor: Optional[str]
+    previous_cursor: Optional[str]
+
+
+class KeysetPaginator:
+    """Постраничный вывод по ключу (sort_key, id) без OFFSET."""
+
+    # ключ сортировки -> функция приведения значения из курсора к типу поля
+    SORT_KEYS: dict[str, Any] = {
+        "id": int,
+        "table_number": int,
+        "total_price": Decimal,
+        "created_at": datetime.fromisoformat,
+    }
+
+    def __init__(self, ordering: Optional[str] = None, page_size: Optional[int | str] = None,
+                 cursor: Optional[str] = None) -> None:
+        ordering = ordering or "id"
+        self.descending = ordering.startswith("-")
+        self.sort_key = ordering.lstrip("-")
+        if self.sort_key not in self.SORT_KEYS:
+            raise ValueError(f"Недопустимая сортировка: {ordering}")
+        self.ordering = ordering
+        self.page_size = self._clean_page_size(page_size)
+        self.cursor = self._decode(cursor) if cursor else None
+
+    @staticmethod
+    def _clean_page_size(page_size: Optional[int | str]) -> int:
+        if page_size in (None, ""):
+            return settings.ORDERS_PAGE_SIZE
+        try:
+            page_size = int(page_size)  # type: ignore[arg-type]
+        except (TypeError, ValueError):
+            raise ValueError("Некорректный размер страницы.")
+        if page_size < 1:
+            raise ValueError("Некорректный размер страницы.")
+        return min(page_size, settings.ORDERS_MAX_PAGE_SIZE)
+
+    def _encode(self, order: Order, direction: str) -> str:
+        value = getattr(order, self.sort_key)
+        payload = {"o": self.ordering, "v": str(value), "id": order.id, "d": direction}
+        raw = json.dumps(payload, separators=(",", ":")).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+    def _decode(self, cursor: str) -> dict[str, Any]:
+        try:
+            raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+            payload = json.loads(raw)
+            if payload["o"] != self.ordering or payload["d"] not in ("n", "p"):
+                raise InvalidCursorError()
+            payload["v"] = self.SORT_KEYS[self.sort_key](payload["v"])
+            payload["id"] = int(payload["id"])
+        except (binascii.Error, ValueError, KeyError, TypeError, ArithmeticError):
+            raise InvalidCursorError()
+        return payload
+
+    def _after(self, value: Any, order_id: int, forward: bool) -> Q:
+        # (sort_key, id) > (value, order_id) в направлении обхода
+        op = "gt" if forward != self.descending else "lt"
+        if self.sort_key == "id":
+            return Q(**{f"id__{op}": order_id})
+        return Q(**{f"{self.sort_key}__{op}e": value}) & (
+            Q(**{f"{self.sort_key}__{op}": value}) | Q(**{f"id__{op}": order_id})
+        )
+
+    def _order_by(self, forward: bool) -> list[str]:
+        fields = [self.sort_key] if self.sort_key == "id" else [self.sort_key, "id"]
+        if forward == self.descending:
+            return [f"-{field}" for field in fields]
+        return fields
+
+    def page_queryset(self, queryset: QuerySet[Order]) -> QuerySet[Order]:
+        """Запрос одной страницы (на одну строку больше, чтобы узнать, есть ли следующая)."""
+        if self.cursor is not None:
+            queryset = queryset.filter(self._after(self.cursor["v"], self.cursor["id"], self._forward))
+        return queryset.order_by(*self._order_by(self._forward))[:self.page_size + 1]
+
+    @property
+    def _forward(self) -> bool:
+        return self.cursor is None or self.cursor["d"] == "n"
+
+    def build_page(self, rows: list[Order]) -> Page:
+        forward = self._forward
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if not forward:
+            rows.reverse()
+
+        if not rows:
+            return Page(items=[], next_cursor=None, previous_cursor=None)
+
+        has_next = has_more if forward else True
+        has_previous = self.cursor is not None if forward else has_more
+        return Page(
+            items=rows,
+            next_cursor=self._encode(rows[-1], "n") if has_next else None,
+            previous_cursor=self._encode(rows[0], "p") if has_previous else None,
+        )
+
+    def paginate(self, queryset: QuerySet[Order]) -> Page:
+        return self.build_page(list(self.page_queryset(queryset)))
+
+    async def apaginate(self, queryset: QuerySet[Order]) -> Page:
+        rows = [order async for order in self.page_queryset(queryset).aiterator(chunk_size=self.page_size + 1)]
+        return self.build_page(rows)
@@ -0,0 +1,125 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+
+class VersionedResponseCache:
+    """Кэш ответов списков заказов поверх кэша Django (locmem, файловый, redis и т.д.).
+
+    В ключ входит номер поколения, который увеличивается при каждой записи заказов,
+    поэтому устаревшие записи не ищутся и не удаляются: их просто перестают читать,
+    а затем вытесняет сам бэкенд кэша.
+    """
+
+    GENERATION_KEY = "orders:generation"
+    # время последней смены поколения (time.time())
+    CHANGED_AT_KEY = "orders:generation:changed_at"
+
+    def __init__(self, alias: str, timeout: int, prefix: str = "orders:response", tracked_keys: int = 10000) -> None:
+        self.alias = alias
+        self.timeout = timeout
+        self.prefix = prefix
+        self.tracked_keys = tracked_keys
+        self._lock = threading.Lock()
+        # ключи, записанные этим процессом, со сроком жизни: промах по живому ключу означает вытеснение
+        self._stored: OrderedDict[str, float] = OrderedDict()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0}
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    @property
+    def enabled(self) -> bool:
+        return self.timeout > 0
+
+    def generation(self) -> int:
+        generation = self.cache.get(self.GENERATION_KEY)
+        if generation is None:
+            # счетчик вытеснен или еще не создан: продолжаем от текущего времени, а не с нуля,
+            # чтобы не вернуться к поколению, записи которого еще лежат в кэше
+            self.cache.add(self.GENERATION_KEY, time.time_ns(), timeout=None)
+            generation = self.cache.get(self.GENERATION_KEY)
+        return generation
+
+    def bump(self) -> None:
+        try:
+            self.cache.incr(self.GENERATION_KEY)
+        except ValueError:
+            self.cache.add(self.GENERATION_KEY, time.time_ns(), timeout=None)
+        self.cache.set(self.CHANGED_AT_KEY, time.time(), timeout=None)
+        with self._lock:
+            self._stats["invalidations"] += 1
+
+    def changed_within(self, seconds: float) -> bool:
+        """Менялись ли заказы за последние seconds секунд."""
+        changed_at = self.cache.get(self.CHANGED_AT_KEY)
+        if changed_at is None:
+            # метка вытеснена: считаем, что заказы менялись только что
+            self.cache.add(self.CHANGED_AT_KEY, time.time(), timeout=None)
+            return True
+        return time.time() - changed_at < seconds
+
+    def make_key(self, generation: int, params: dict[str, Any]) -> str:
+        digest = hashlib.sha1(json.dumps(params, sort_keys=True, default=str).encode()).hexdigest()
+        return f"{self.prefix}:{generation}:{digest}"
+
+    def get(self, params: dict[str, Any]) -> tuple[str, Optional[Any]]:
+        """Возвращает ключ текущего поколения и запись по нему (None при промахе)."""
+        key = self.make_key(self.generation(), params)
+        value = self.cache.get(key)
+        now = time.monotonic()
+        with self._lock:
+            if value is not None:
+                self._stats["hits"] += 1
+            else:
+                self._stats["misses"] += 1
+                expires = self._stored.pop(key, None)
+                if expires is not None and expires > now:
+                    self._stats["evictions"] += 1
+        return key, value
+
+    def set(self, key: str, value: Any) -> None:
+        self.cache.set(key, value, self.timeout)
+        with self._lock:
+            self._stored[key] = time.monotonic() + self.timeout
+            self._stored.move_to_end(key)
+            while len(self._stored) > self.tracked_keys:
+                self._stored.popitem(last=False)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+        lookups = stats["hits"] + stats["misses"]
+        return {
+            **stats,
+            "hit_ratio": round(stats["hits"] / lookups, 4) if lookups else 0.0,
+            "generation": self.generation(),
+            "backend": f"{type(self.cache).__module__}.{type(self.cache).__name__}",
+            "enabled": self.enabled,
+        }
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self._stored.clear()
+            self._stats = dict.fromkeys(self._stats, 0)
+
+
+response_cache = VersionedResponseCache(
+    alias=settings.ORDERS_RESPONSE_CACHE["ALIAS"],
+    timeout=settings.ORDERS_RESPONSE_CACHE["TIMEOUT"],
+)
+
+
+def invalidate_order_responses() -> None:
+    # сразу - чтобы изменивший запрос не прочитал свой же старый ответ,
+    # и после фиксации - чтобы отбросить ответы, закэшированные параллельными запросами до нее
+    response_cache.bump()
+    transaction.on_commit(response_cache.bump, robust=True)
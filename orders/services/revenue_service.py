@@ -0,0 +1,212 @@
+import heapq
+import threading
+from contextlib import contextmanager
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from itertools import groupby
+from operator import itemgetter
+from typing import Any, Iterable, Iterator, Optional
+
+from django.db import connection, transaction
+from django.db.models import Count, Sum, QuerySet
+from django.db.models.functions import TruncDate, ExtractHour
+from django.utils import timezone
+
+from orders.models import ArchivedOrderItem, Order, OrderItem, RevenueRollup
+
+# (день, час, номер стола) — единица инкрементального пересчета сводки
+RevenueBucket = tuple[date, int, int]
+
+_batch = threading.local()
+
+
+def bucket_for(status: str, table_number: int, paid_at: Optional[datetime]) -> Optional[RevenueBucket]:
+    if status != "paid" or paid_at is None:
+        return None
+    local_paid_at = timezone.localtime(paid_at)
+    return local_paid_at.date(), local_paid_at.hour, table_number
+
+
+def order_bucket(order: Order) -> Optional[RevenueBucket]:
+    return bucket_for(order.status, order.table_number, order.paid_at)
+
+
+def loaded_order_bucket(order: Order) -> Optional[RevenueBucket]:
+    if order.loaded_state is None:
+        return None
+    return bucket_for(*order.loaded_state)
+
+
+def mark_dirty(*buckets: Optional[RevenueBucket]) -> None:
+    pending = getattr(_batch, "buckets", None)
+    if pending is not None:
+        pending.update(bucket for bucket in buckets if bucket)
+    else:
+        RevenueService.refresh_buckets(buckets)
+
+
+def mark_order_dirty(order_id: int) -> None:
+    """Как mark_dirty, но корзина определяется по заказу из базы (одним запросом на всю пачку)."""
+    pending = getattr(_batch, "order_ids", None)
+    if pending is not None:
+        pending.add(order_id)
+    else:
+        RevenueService.refresh_buckets(_buckets_of_orders({order_id}))
+
+
+def _buckets_of_orders(order_ids: set[int]) -> set[Optional[RevenueBucket]]:
+    if not order_ids:
+        return set()
+    rows = Order.objects.filter(id__in=order_ids, status="paid").values_list("status", "table_number", "paid_at")
+    return {bucket_for(*row) for row in rows}
+
+
+@contextmanager
+def revenue_batch() -> Iterator[None]:
+    """Копит затронутые корзины и пересчитывает каждую один раз при выходе."""
+    if getattr(_batch, "buckets", None) is not None:
+        yield
+        return
+
+    _batch.buckets = set()
+    _batch.order_ids = set()
+    try:
+        yield
+        # транзакция будет откачена — пересчитывать нечего
+        if connection.in_atomic_block and connection.needs_rollback:
+            return
+        buckets = _batch.buckets | _buckets_of_orders(_batch.order_ids)
+    finally:
+        _batch.buckets = None
+        _batch.order_ids = None
+    RevenueService.refresh_buckets(buckets)
+
+
+_ROW_KEY = ("day", "hour", "order__table_number", "item_id")
+
+
+def _paid_items(items: QuerySet) -> QuerySet:
+    """Выручка по корзинам для позиций горячих (OrderItem) или архивных (ArchivedOrderItem) заказов."""
+    tz = timezone.get_current_timezone()
+    return (
+        items
+        .filter(order__status="paid", order__paid_at__isnull=False)
+        .annotate(
+            day=TruncDate("order__paid_at", tzinfo=tz),
+            hour=ExtractHour("order__paid_at", tzinfo=tz),
+        )
+        .values(*_ROW_KEY)
+        .annotate(bucket_revenue=Sum("price"), bucket_quantity=Count("id"))
+        .order_by(*_ROW_KEY)
+    )
+
+
+def _paid_rows(chunk_size: Optional[int] = None, **filters: Any) -> Iterator[dict[str, Any]]:
+    """Строки сводки по горячим и архивным позициям вместе, упорядоченные по корзине и блюду.
+
+    Во время переноса в архив корзина может оказаться в обеих таблицах, такие строки суммируются.
+    """
+    sources = [
+        _paid_items(model.objects.filter(**filters)).iterator(chunk_size=chunk_size)
+        for model in (OrderItem, ArchivedOrderItem)
+    ]
+    row_key = itemgetter(*_ROW_KEY)
+    for _, rows in groupby(heapq.merge(*sources, key=row_key), key=row_key):
+        first, *rest = rows
+        for row in rest:
+            first = {
+                **first,
+                "bucket_revenue": first["bucket_revenue"] + row["bucket_revenue"],
+                "bucket_quantity": first["bucket_quantity"] + row["bucket_quantity"],
+            }
+        yield first
+
+
+def _rollup_rows(rows: Iterable[dict[str, Any]]) -> Iterator[RevenueRollup]:
+    for row in rows:
+        yield RevenueRollup(
+            day=row["day"],
+            hour=row["hour"],
+            table_number=row["order__table_number"],
+            item_id=row["item_id"],
+            revenue=row["bucket_revenue"],
+            quantity=row["bucket_quantity"],
+        )
+
+
+def _lock_buckets(buckets: list[RevenueBucket]) -> None:
+    """Блокирует корзины до конца транзакции: параллельные пересчеты одной корзины идут по очереди.
+
+    Без блокировки две транзакции удаляют строки корзины и обе вставляют новые, и одна из них
+    падает на revenue_rollup_bucket. Корзины блокируются в одном порядке, чтобы не было взаимоблокировок.
+    """
+    if connection.vendor != "postgresql":
+        return
+    keys = [f"revenue:{day.isoformat()}:{hour}:{table_number}" for day, hour, table_number in buckets]
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT pg_advisory_xact_lock(hashtext(key)) FROM unnest(%s::text[]) AS key ORDER BY key",
+            [keys],
+        )
+
+
+class RevenueService:
+    BATCH_SIZE = 1000
+
+    @classmethod
+    def refresh_buckets(cls, buckets: Iterable[Optional[RevenueBucket]]) -> None:
+        dirty = sorted({bucket for bucket in buckets if bucket is not None})
+        if not dirty:
+            return
+
+        tz = timezone.get_current_timezone()
+        with transaction.atomic():
+            _lock_buckets(dirty)
+            for day, hour, table_number in dirty:
+                start = timezone.make_aware(datetime.combine(day, time(hour)), tz)
+                rows = _paid_rows(
+                    order__table_number=table_number,
+                    order__paid_at__gte=start,
+                    order__paid_at__lt=start + timedelta(hours=1),
+                )
+                RevenueRollup.objects.filter(day=day, hour=hour, table_number=table_number).delete()
+                RevenueRollup.objects.bulk_create(_rollup_rows(rows))
+
+    @classmethod
+    def rebuild(cls) -> int:
+        created = 0
+        with transaction.atomic():
+            RevenueRollup.objects.all().delete()
+            batch = []
+            for rollup in _rollup_rows(_paid_rows(chunk_size=cls.BATCH_SIZE)):
+                batch.append(rollup)
+                if len(batch) >= cls.BATCH_SIZE:
+                    created += len(RevenueRollup.objects.bulk_create(batch))
+                    batch = []
+            created += len(RevenueRollup.objects.bulk_create(batch))
+        return created
+
+    @staticmethod
+    def report(date_from: Optional[date] = None, date_to: Optional[date] = None) -> dict[str, Any]:
+        rollups = RevenueRollup.objects.all()
+        if date_from:
+            rollups = rollups.filter(day__gte=date_from)
+        if date_to:
+            rollups = rollups.filter(day__lte=date_to)
+
+        def group(*fields: str, ordering: Optional[list[str]] = None) -> list[dict[str, Any]]:
+            return list(
+                rollups.values(*fields)
+                .annotate(total_revenue=Sum("revenue"), total_quantity=Sum("quantity"))
+                .order_by(*(ordering or fields))
+            )
+
+        totals = rollups.aggregate(total_revenue=Sum("revenue"), total_quantity=Sum("quantity"))
+        return {
+            "total_revenue": totals["total_revenue"] or Decimal("0.00"),
+            "total_quantity": totals["total_quantity"] or 0,
+            "by_day": group("day"),
+            "by_hour": group("hour"),
+            "by_table": group("table_number"),
+            "by_item": group("item_id", "item__name", ordering=["-total_revenue", "item_id"]),
+        }
@@ -0,0 +1,114 @@
+import threading
+import time
+from typing import Any
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models import prefetch_related_objects
+from django.template.loader import render_to_string
+from django.utils.safestring import SafeString, mark_safe
+
+from orders.models import Order
+from orders.services.order_queries import page_items_prefetch
+
+
+class OrderRowCache:
+    """Кэш отрендеренных строк HTML-списка заказов поверх кэша Django.
+
+    Ключ строки составлен из id, версии и времени изменения заказа, поэтому изменение заказа
+    (в том числе UPDATE в обход save) делает старую строку недостижимой, а соседние строки
+    остаются в кэше. Названия блюд в версию заказа не входят: при их изменении увеличивается
+    общее поколение строк.
+    """
+
+    GENERATION_KEY = "orders:rows:generation"
+    TEMPLATE = "orders/order_row.html"
+
+    def __init__(self, alias: str, timeout: int, prefix: str = "orders:row") -> None:
+        self.alias = alias
+        self.timeout = timeout
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "rendered": 0}
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    @property
+    def enabled(self) -> bool:
+        return self.timeout > 0
+
+    def generation(self) -> int:
+        generation = self.cache.get(self.GENERATION_KEY)
+        if generation is None:
+            # как и в VersionedResponseCache: продолжаем от текущего времени, а не с нуля
+            self.cache.add(self.GENERATION_KEY, time.time_ns(), timeout=None)
+            generation = self.cache.get(self.GENERATION_KEY)
+        return generation
+
+    def bump(self) -> None:
+        try:
+            self.cache.incr(self.GENERATION_KEY)
+        except ValueError:
+            self.cache.add(self.GENERATION_KEY, time.time_ns(), timeout=None)
+
+    def make_key(self, generation: int, order: Order) -> str:
+        stamp = int(order.updated_at.timestamp() * 1_000_000)
+        return f"{self.prefix}:{generation}:{order.pk}:{order.version}:{stamp}"
+
+    def render(self, orders: list[Order]) -> list[SafeString]:
+        """HTML строк таблицы для заказов (загруженных с ORDER_LIST_FIELDS) в том же порядке.
+
+        Позиции заказов читаются и шаблон рендерится только для строк, которых нет в кэше.
+        """
+        if not orders:
+            return []
+        if not self.enabled:
+            prefetch_related_objects(orders, page_items_prefetch())
+            return [self._render_row(order) for order in orders]
+
+        generation = self.generation()
+        keys = {order.pk: self.make_key(generation, order) for order in orders}
+        rows = self.cache.get_many(keys.values())
+        missing = [order for order in orders if keys[order.pk] not in rows]
+        if missing:
+            prefetch_related_objects(missing, page_items_prefetch())
+            rendered = {keys[order.pk]: self._render_row(order) for order in missing}
+            self.cache.set_many(rendered, self.timeout)
+            rows.update(rendered)
+        with self._lock:
+            self._stats["hits"] += len(orders) - len(missing)
+            self._stats["rendered"] += len(missing)
+        return [mark_safe(rows[keys[order.pk]]) for order in orders]
+
+    def _render_row(self, order: Order) -> SafeString:
+        return render_to_string(self.TEMPLATE, {"order": order})
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+        lookups = stats["hits"] + stats["rendered"]
+        return {
+            **stats,
+            "hit_ratio": round(stats["hits"] / lookups, 4) if lookups else 0.0,
+            "generation": self.generation(),
+            "enabled": self.enabled,
+        }
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self._stats = dict.fromkeys(self._stats, 0)
+
+
+order_rows = OrderRowCache(
+    alias=settings.ORDERS_ROW_CACHE["ALIAS"],
+    timeout=settings.ORDERS_ROW_CACHE["TIMEOUT"],
+)
+
+
+def invalidate_order_rows() -> None:
+    # сразу и после фиксации - как invalidate_order_responses()
+    order_rows.bump()
+    transaction.on_commit(order_rows.bump, robust=True)
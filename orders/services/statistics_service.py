@@ -0,0 +1,261 @@
+import json
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from typing import Any, Optional
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import IntegrityError, router, transaction
+from django.db.models import Avg, Count, DurationField, ExpressionWrapper, F, Max, Min, Q, QuerySet, Sum, Value, Window
+from django.db.models.functions import Coalesce, DenseRank, Rank
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from orders.models import Order, OrderItem, StatisticsSnapshot
+
+# Операционная статистика считается в базе агрегатами и оконными функциями и сохраняется снимками
+# StatisticsSnapshot по интервалам ORDERS_STATISTICS_INTERVAL. Страница и API читают готовый снимок;
+# пересчитывает его команда refresh_statistics (по cron) или, если она не запущена, один запрос
+# на интервал. Архивные заказы в статистику не входят, как и в поиск.
+
+PERIODS = {
+    "day": timedelta(days=1),
+    "week": timedelta(days=7),
+    "month": timedelta(days=30),
+}
+PERIOD_CHOICES = [("day", "Сутки"), ("week", "7 дней"), ("month", "30 дней")]
+OPEN_STATUSES = ("pending", "ready")
+# как часто и сколько секунд запрос ждет первый снимок периода, который считает другой запрос
+FIRST_SNAPSHOT_POLL_INTERVAL = 0.05
+FIRST_SNAPSHOT_WAIT = 5.0
+
+
+def _duration(end: Any, start: Any) -> ExpressionWrapper:
+    return ExpressionWrapper(end - start, output_field=DurationField())
+
+
+def _seconds(value: Optional[timedelta]) -> Optional[float]:
+    return round(value.total_seconds(), 1) if value is not None else None
+
+
+def _share(part: Any, total: Any) -> float:
+    return round(float(part) / float(total), 4) if total else 0.0
+
+
+def _money(value: Optional[Decimal]) -> Decimal:
+    return (value or Decimal("0")).quantize(Decimal("0.01"))
+
+
+class StatisticsService:
+    def __init__(self, period: str, top_dishes: int = 10) -> None:
+        if period not in PERIODS:
+            raise ValueError(f"Неизвестный период: {period}")
+        self.period = period
+        self.top_dishes = top_dishes
+
+    @property
+    def interval(self) -> int:
+        return settings.ORDERS_STATISTICS_INTERVAL
+
+    def bucket(self, now: Optional[datetime] = None) -> datetime:
+        """Начало интервала обновления, в который попадает now."""
+        timestamp = (now or timezone.now()).timestamp()
+        return datetime.fromtimestamp(timestamp - timestamp % self.interval, tz=dt_timezone.utc)
+
+    def current(self) -> StatisticsSnapshot:
+        """Последний снимок периода; устаревший пересчитывается не больше одного раза за интервал."""
+        latest = StatisticsSnapshot.objects.filter(period=self.period).order_by("-bucket").first()
+        bucket = self.bucket()
+        if latest is None:
+            return self._first_snapshot()
+        if latest.bucket < bucket:
+            # остальные запросы до конца пересчета получают предыдущий снимок
+            lock = f"orders:statistics:{self.period}:{bucket.timestamp()}"
+            if caches["default"].add(lock, True, timeout=self.interval):
+                return self.refresh(bucket)
+        return latest
+
+    def _first_snapshot(self) -> StatisticsSnapshot:
+        # снимков периода еще нет: считает один запрос, остальные ждут его снимок в основной базе;
+        # блокировка снимается сразу, чтобы после ошибки пересчета его повторил следующий запрос.
+        # Если держатель блокировки не успел за FIRST_SNAPSHOT_WAIT (завис или умер), запрос считает сам
+        lock = f"orders:statistics:{self.period}:first"
+        primary = router.db_for_write(StatisticsSnapshot)
+        snapshots = StatisticsSnapshot.objects.using(primary).filter(period=self.period).order_by("-bucket")
+        deadline = time.monotonic() + FIRST_SNAPSHOT_WAIT
+        while time.monotonic() < deadline:
+            locked = caches["default"].add(lock, True, timeout=self.interval)
+            try:
+                # снимок мог сохранить запрос, который держал блокировку до нас
+                snapshot = snapshots.first()
+                if snapshot is not None:
+                    return snapshot
+                if locked:
+                    return self.refresh()
+            finally:
+                if locked:
+                    caches["default"].delete(lock)
+            time.sleep(FIRST_SNAPSHOT_POLL_INTERVAL)
+        return self.refresh()
+
+    def refresh(self, bucket: Optional[datetime] = None) -> StatisticsSnapshot:
+        now = timezone.now()
+        bucket = bucket or self.bucket(now)
+        # в том виде, в каком снимок читается из базы: даты и суммы строками
+        data = json.loads(json.dumps(self.compute(now), cls=DjangoJSONEncoder))
+        try:
+            with transaction.atomic():
+                snapshot, _ = StatisticsSnapshot.objects.update_or_create(
+                    period=self.period, bucket=bucket, defaults={"data": data},
+                )
+        except IntegrityError:
+            # снимок этого интервала только что сохранил параллельный пересчет (читаем из основной базы)
+            primary = router.db_for_write(StatisticsSnapshot)
+            snapshot = StatisticsSnapshot.objects.using(primary).get(period=self.period, bucket=bucket)
+        retention = timedelta(days=settings.ORDERS_STATISTICS_RETENTION_DAYS)
+        StatisticsSnapshot.objects.filter(period=self.period, bucket__lt=bucket - retention).delete()
+        return snapshot
+
+    def history(self, limit: int = 48) -> list[dict[str, Any]]:
+        """Очередь открытых заказов по последним снимкам периода, от старых к новым."""
+        rows = (
+            StatisticsSnapshot.objects.filter(period=self.period)
+            .order_by("-bucket")
+            .values("bucket", backlog=F("data__backlog__total"))[:limit]
+        )
+        return list(reversed(rows))
+
+    def compute(self, now: datetime) -> dict[str, Any]:
+        start = now - PERIODS[self.period]
+        orders = Order.objects.filter(created_at__gte=start, created_at__lt=now)
+        lines = OrderItem.objects.filter(order__created_at__gte=start, order__created_at__lt=now)
+        summary = self._summary(orders, lines)
+        return {
+            "period": self.period,
+            "date_from": start,
+            "date_to": now,
+            **summary,
+            "top_dishes": self._top_dishes(lines, summary["dishes"]),
+            "tables": self._tables(orders, summary["orders"]),
+            "status_times": self._status_times(orders),
+            "backlog": self._backlog(now),
+        }
+
+    def _summary(self, orders: QuerySet, lines: QuerySet) -> dict[str, Any]:
+        paid = Q(status="paid")
+        totals = orders.aggregate(
+            orders=Count("id"),
+            paid_orders=Count("id", filter=paid),
+            revenue=Sum("total_price", filter=paid),
+            average_ticket=Avg("total_price", filter=paid),
+            max_ticket=Max("total_price", filter=paid),
+        )
+        dishes = lines.aggregate(quantity=Count("id"), revenue=Sum("price"))
+        return {
+            "orders": totals["orders"],
+            "paid_orders": totals["paid_orders"],
+            "revenue": _money(totals["revenue"]),
+            "average_ticket": _money(totals["average_ticket"]),
+            "max_ticket": _money(totals["max_ticket"]),
+            "dishes": dishes["quantity"],
+            "dishes_revenue": _money(dishes["revenue"]),
+            "dishes_per_order": round(dishes["quantity"] / totals["orders"], 2) if totals["orders"] else 0.0,
+        }
+
+    def _top_dishes(self, lines: QuerySet, total_quantity: int) -> list[dict[str, Any]]:
+        # ранг считается в базе по всем блюдам, наружу выходят только первые top_dishes мест
+        rows = (
+            lines.values("item_id", "item__name")
+            .annotate(quantity=Count("id"), revenue=Sum("price"))
+            .annotate(rank=Window(Rank(), order_by=[Count("id").desc(), Sum("price").desc()]))
+            .filter(rank__lte=self.top_dishes)
+            .order_by("rank", "item_id")
+        )
+        return [
+            {"rank": row["rank"], "item_id": row["item_id"], "name": row["item__name"],
+             "quantity": row["quantity"], "share": _share(row["quantity"], total_quantity),
+             "revenue": _money(row["revenue"])}
+            for row in rows
+        ]
+
+    def _tables(self, orders: QuerySet, total_orders: int) -> list[dict[str, Any]]:
+        paid = Q(status="paid")
+        rows = (
+            orders.values("table_number")
+            .annotate(
+                orders=Count("id"),
+                revenue=Sum("total_price", filter=paid),
+                average_ticket=Avg("total_price", filter=paid),
+                rank=Window(DenseRank(), order_by=Count("id").desc()),
+            )
+            .order_by("table_number")
+        )
+        return [
+            {"table_number": row["table_number"], "orders": row["orders"], "rank": row["rank"],
+             "share": _share(row["orders"], total_orders),
+             "revenue": _money(row["revenue"]), "average_ticket": _money(row["average_ticket"])}
+            for row in rows
+        ]
+
+    def _status_times(self, orders: QuerySet) -> list[dict[str, Any]]:
+        # время в pending - до перехода в ready (или сразу в paid), в ready - до оплаты;
+        # заказы без ready_at (загруженные из выгрузки) не учитываются
+        pending = _duration(F("ready_at"), F("created_at"))
+        ready = _duration(F("paid_at"), F("ready_at"))
+        has_ready = Q(ready_at__isnull=False)
+        has_paid = Q(ready_at__isnull=False, paid_at__isnull=False)
+        times = orders.aggregate(
+            pending_orders=Count("id", filter=has_ready),
+            pending_avg=Avg(pending, filter=has_ready),
+            pending_max=Max(pending, filter=has_ready),
+            ready_orders=Count("id", filter=has_paid),
+            ready_avg=Avg(ready, filter=has_paid),
+            ready_max=Max(ready, filter=has_paid),
+        )
+        return [
+            {"status": status, "orders": times[f"{status}_orders"],
+             "avg_seconds": _seconds(times[f"{status}_avg"]), "max_seconds": _seconds(times[f"{status}_max"])}
+            for status in OPEN_STATUSES
+        ]
+
+    def _backlog(self, now: datetime) -> dict[str, Any]:
+        # возраст считается от входа в текущий статус
+        entered = {"pending": F("created_at"), "ready": Coalesce("ready_at", "updated_at")}
+        aggregates = {}
+        for status, since in entered.items():
+            condition = Q(status=status)
+            aggregates[f"{status}_count"] = Count("id", filter=condition)
+            aggregates[f"{status}_oldest"] = Min(since, filter=condition)
+            aggregates[f"{status}_age"] = Avg(_duration(Value(now), since), filter=condition)
+        backlog = Order.objects.filter(status__in=OPEN_STATUSES).aggregate(**aggregates)
+        by_status = [
+            {"status": status, "orders": backlog[f"{status}_count"], "oldest_at": backlog[f"{status}_oldest"],
+             "avg_age_seconds": _seconds(backlog[f"{status}_age"])}
+            for status in OPEN_STATUSES
+        ]
+        return {"total": sum(row["orders"] for row in by_status), "by_status": by_status}
+
+
+def current_statistics(period: str) -> dict[str, Any]:
+    """Текущий снимок периода вместе с историей очереди для страницы и API."""
+    service = StatisticsService(period)
+    snapshot = service.current()
+    data = snapshot.data
+    backlog = {
+        **data["backlog"],
+        "by_status": [
+            {**row, "oldest_at": parse_datetime(row["oldest_at"]) if row["oldest_at"] else None}
+            for row in data["backlog"]["by_status"]
+        ],
+    }
+    return {
+        **data,
+        "date_from": parse_datetime(data["date_from"]),
+        "date_to": parse_datetime(data["date_to"]),
+        "backlog": backlog,
+        "bucket": snapshot.bucket,
+        "computed_at": snapshot.computed_at,
+        "backlog_history": service.history(),
+    }
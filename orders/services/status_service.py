@@ -0,0 +1,193 @@
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Iterable, NamedTuple, Optional
+
+from django.core.exceptions import ValidationError
+from django.db import connections, router, transaction
+from django.db.models import F, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from orders.models import Order
+from orders.services.order_events import STATUS_CHANGED, publish_order_event
+from orders.services.response_cache import invalidate_order_responses
+from orders.services.revenue_service import bucket_for, loaded_order_bucket, mark_dirty, revenue_batch
+
+# Смена статуса одним условным UPDATE: текущий статус проверяется в WHERE, поэтому параллельные
+# изменения не перезаписывают друг друга, а проигравший запрос узнает о конфликте.
+
+# целевой статус -> статусы, из которых в него можно перейти
+STATUS_TRANSITIONS = {
+    "ready": ("pending",),
+    "paid": ("ready",),
+}
+STATUS_TRANSITION_CHOICES = [(status, label) for status, label in Order.STATUS_CHOICES if status in STATUS_TRANSITIONS]
+
+
+class StatusChange(NamedTuple):
+    id: int
+    table_number: int
+    paid_at: Optional[datetime]
+    ready_at: Optional[datetime]
+    version: int
+    updated_at: datetime
+    # статус до перехода: экраны, отфильтрованные по статусу, должны узнать об уходе заказа
+    previous_status: str
+
+
+class StatusTransitionError(Exception):
+    def __init__(self, status: str) -> None:
+        self.message = f"Переход в статус «{status}» не поддерживается."
+        super().__init__(self.message)
+
+
+def _update_returning(
+    connection: Any, status: str, from_statuses: list[str], ids: Optional[list[int]], table_number: Optional[int],
+) -> list[StatusChange]:
+    # PostgreSQL: один UPDATE ... RETURNING
+    conditions: list[str] = ["status = ANY(%s)"]
+    params: list[Any] = [from_statuses]
+    if ids is not None:
+        conditions.append("id = ANY(%s)")
+        params.append(ids)
+    if table_number is not None:
+        conditions.append("table_number = %s")
+        params.append(table_number)
+
+    qn = connection.ops.quote_name
+    table = qn(Order._meta.db_table)
+    # paid_at и ready_at меняются так же, как в Order.save()
+    paid_at = f"COALESCE(o.{qn('paid_at')}, NOW())" if status == "paid" else "NULL"
+    ready_at = f"COALESCE(o.{qn('ready_at')}, NOW())" if status != "pending" else "NULL"
+    # прежний статус RETURNING не видит, поэтому строки сначала блокируются подзапросом,
+    # который возвращает их статус до изменения (после ожидания чужой блокировки - актуальный)
+    new_fields = StatusChange._fields[:-1]
+    sql = (
+        f"UPDATE {table} AS o "
+        f"SET {qn('status')} = %s, {qn('paid_at')} = {paid_at}, {qn('ready_at')} = {ready_at}, "
+        f"{qn('version')} = o.{qn('version')} + 1, {qn('updated_at')} = NOW() "
+        f"FROM (SELECT {qn('id')}, {qn('status')} FROM {table} WHERE {' AND '.join(conditions)} "
+        f"ORDER BY {qn('id')} FOR UPDATE) AS previous "
+        f"WHERE o.{qn('id')} = previous.{qn('id')} "
+        f"RETURNING {', '.join(f'o.{qn(name)}' for name in new_fields)}, previous.{qn('status')}"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [status, *params])
+        return [StatusChange(*row) for row in cursor.fetchall()]
+
+
+def _update_locked(
+    connection: Any, status: str, from_statuses: list[str], ids: Optional[list[int]], table_number: Optional[int],
+) -> list[StatusChange]:
+    # остальные базы: блокировка строк (где она есть) и UPDATE по их id
+    orders = Order.objects.using(connection.alias).filter(status__in=from_statuses)
+    if ids is not None:
+        orders = orders.filter(pk__in=ids)
+    if table_number is not None:
+        orders = orders.filter(table_number=table_number)
+    rows = list(
+        orders.select_for_update().order_by("id")
+        .values_list("id", "table_number", "paid_at", "ready_at", "version", "status")
+    )
+    if not rows:
+        return []
+
+    now = timezone.now()
+    Order.objects.using(connection.alias).filter(pk__in=[row[0] for row in rows]).update(
+        status=status,
+        paid_at=Coalesce("paid_at", Value(now)) if status == "paid" else None,
+        ready_at=Coalesce("ready_at", Value(now)) if status != "pending" else None,
+        version=F("version") + 1,
+        updated_at=now,
+    )
+    return [
+        StatusChange(
+            order_id, order_table, (paid_at or now) if status == "paid" else None,
+            (ready_at or now) if status != "pending" else None, version + 1, now, previous_status,
+        )
+        for order_id, order_table, paid_at, ready_at, version, previous_status in rows
+    ]
+
+
+def update_status(
+    status: str,
+    from_statuses: Iterable[str],
+    ids: Optional[Iterable[int]] = None,
+    table_number: Optional[int] = None,
+) -> list[StatusChange]:
+    """Переводит в status заказы (по id и/или столу), которые сейчас в одном из from_statuses.
+
+    В PostgreSQL это один запрос UPDATE ... RETURNING независимо от количества заказов. Сигналы модели
+    не отправляются, поэтому кэш ответов, сводка выручки и события обновляются здесь.
+    """
+    connection = connections[router.db_for_write(Order)]
+    update = _update_returning if connection.vendor == "postgresql" else _update_locked
+    with transaction.atomic(using=connection.alias):
+        changes = update(connection, status, list(from_statuses), list(ids) if ids is not None else None, table_number)
+
+        if changes:
+            invalidate_order_responses()
+            mark_dirty(*(bucket_for(status, change.table_number, change.paid_at) for change in changes))
+            for change in changes:
+                publish_order_event(
+                    STATUS_CHANGED, Order(id=change.id, table_number=change.table_number, status=status),
+                    previous_status=change.previous_status,
+                )
+    return changes
+
+
+@dataclass
+class TransitionResult:
+    status: str
+    changed: list[StatusChange] = field(default_factory=list)
+    # заказы, которые не в подходящем статусе: id -> текущий статус
+    conflicts: dict[int, str] = field(default_factory=dict)
+    missing: list[int] = field(default_factory=list)
+
+
+class OrderStatusService:
+    """Переводит заказы по цепочке pending → ready → paid одним запросом на вызов."""
+
+    def __init__(self, status: str) -> None:
+        if status not in STATUS_TRANSITIONS:
+            raise StatusTransitionError(status)
+        self.status = status
+
+    def transition(self, order_ids: Iterable[int]) -> TransitionResult:
+        order_ids = list(dict.fromkeys(order_ids))
+        # пересчет сводки выручки фиксируется вместе со сменой статусов, как в change_status()
+        with transaction.atomic(), revenue_batch():
+            changed = update_status(self.status, STATUS_TRANSITIONS[self.status], ids=order_ids)
+
+        result = TransitionResult(self.status, changed)
+        rest = set(order_ids) - {change.id for change in changed}
+        if rest:
+            # дополнительный запрос только при конфликте: узнать текущий статус остальных заказов
+            result.conflicts = dict(Order.objects.filter(id__in=rest).order_by("id").values_list("id", "status"))
+            result.missing = sorted(rest - result.conflicts.keys())
+        return result
+
+    def transition_table(self, table_number: int) -> TransitionResult:
+        with transaction.atomic(), revenue_batch():
+            changed = update_status(self.status, STATUS_TRANSITIONS[self.status], table_number=table_number)
+        return TransitionResult(self.status, changed)
+
+
+def change_status(order: Order, status: str) -> None:
+    """Меняет статус загруженного заказа, если с момента загрузки его не изменил другой запрос.
+
+    В отличие от OrderStatusService допускает любой переход (исправление статуса вручную).
+    """
+    loaded_status = order.loaded_state[0] if order.loaded_state else order.status
+    with transaction.atomic(), revenue_batch():
+        changes = update_status(status, [loaded_status], ids=[order.id])
+        if not changes:
+            raise ValidationError("Статус заказа уже изменен другим пользователем, обновите страницу.")
+        if loaded_status == "paid":
+            mark_dirty(loaded_order_bucket(order))
+
+    change = changes[0]
+    order.status, order.table_number, order.paid_at = status, change.table_number, change.paid_at
+    order.ready_at = change.ready_at
+    order.version, order.updated_at = change.version, change.updated_at
+    order.remember_state()
@@ -0,0 +1,55 @@
+from django.db.models.signals import post_delete, post_migrate, post_save
+from django.dispatch import receiver
+
+from orders.models import Item, Order, OrderItem
+from orders.services.item_catalog import item_catalog
+from orders.services.order_events import ORDER_CREATED, ORDER_DELETED, STATUS_CHANGED, publish_order_event
+from orders.services.response_cache import invalidate_order_responses
+from orders.services.revenue_service import loaded_order_bucket, mark_dirty, mark_order_dirty, order_bucket
+from orders.services.row_cache import invalidate_order_rows
+
+
+@receiver(post_save, sender=Order)
+def order_saved(sender, instance: Order, created: bool, raw: bool, **kwargs) -> None:
+    if raw:
+        return
+    before, after = loaded_order_bucket(instance), order_bucket(instance)
+    if before != after:
+        mark_dirty(before, after)
+    invalidate_order_responses()
+    if created:
+        publish_order_event(ORDER_CREATED, instance)
+    elif instance.loaded_state is None or instance.loaded_state[0] != instance.status:
+        previous_status = instance.loaded_state[0] if instance.loaded_state else None
+        publish_order_event(STATUS_CHANGED, instance, previous_status=previous_status)
+    instance.remember_state()
+
+
+@receiver(post_delete, sender=Order)
+def order_deleted(sender, instance: Order, **kwargs) -> None:
+    mark_dirty(loaded_order_bucket(instance), order_bucket(instance))
+    invalidate_order_responses()
+    publish_order_event(ORDER_DELETED, instance)
+
+
+@receiver([post_save, post_delete], sender=OrderItem)
+def order_item_changed(sender, instance: OrderItem, raw: bool = False, **kwargs) -> None:
+    if raw:
+        return
+    if OrderItem.order.is_cached(instance):
+        mark_dirty(order_bucket(instance.order))
+    else:
+        mark_order_dirty(instance.order_id)
+
+
+@receiver([post_save, post_delete], sender=Item)
+def item_changed(sender, instance: Item, **kwargs) -> None:
+    item_catalog.invalidate(instance.pk)
+    # от названий блюд зависят закэшированные результаты поиска по блюду и строки списка заказов
+    invalidate_order_responses()
+    invalidate_order_rows()
+
+
+@receiver(post_migrate)
+def catalog_migrated(sender, **kwargs) -> None:
+    item_catalog.invalidate()
@@ -1,6 +1,49 @@
 import pytest
 
 from orders.models import Item, Order, OrderItem
+from orders.services.item_catalog import item_catalog
+from orders.services.response_cache import response_cache
+from orders.services.row_cache import order_rows
+
+
+@pytest.fixture(scope="session")
+def django_db_modify_db_settings(django_db_modify_db_settings_parallel_suffix):
+    # реплику в тестах заменяет отдельная тестовая база: так видно, из какой базы пришли данные
+    from django.conf import settings
+
+    default = settings.DATABASES["default"]
+    settings.DATABASES["replica"] = {**default, "NAME": f"{default['NAME']}_replica",
+                                   "TEST": {**default["TEST"], "MIRROR": None, "NAME": None}}
+
+
+@pytest.fixture(scope="session")
+def django_db_setup(django_db_setup, django_db_blocker):
+    # автоматический ANALYZE посреди прогона меняет статистику почти пустых таблиц,
+    # и планы в test_search_indexes начинают зависеть от того, успел ли он пройти
+    from django.db import connection
+
+    if connection.vendor != "postgresql":
+        return
+    with django_db_blocker.unblock(), connection.cursor() as cursor:
+        for model in (Item, Order, OrderItem):
+            cursor.execute(f"ALTER TABLE {model._meta.db_table} SET (autovacuum_enabled = false)")
+
+
+@pytest.fixture(autouse=True)
+def clear_item_catalog():
+    # откат транзакции теста не отправляет сигналы, поэтому кэш блюд сбрасываем явно
+    item_catalog.invalidate()
+    yield
+    item_catalog.invalidate()
+
+
+@pytest.fixture(autouse=True)
+def clear_response_cache():
+    # кэш ответов живет между тестами, а данные теста откатываются
+    response_cache.cache.clear()
+    response_cache.reset_stats()
+    order_rows.cache.clear()
+    order_rows.reset_stats()
 
 
 @pytest.fixture
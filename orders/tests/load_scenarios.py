@@ -0,0 +1,94 @@
+import json
+from datetime import timedelta
+from typing import Any, Optional
+
+from django.utils import timezone
+
+from orders.services.load_testing import LoadRequest, LoadResponse, Operation, Scenario, ScenarioContext
+
+# Сценарии для manage.py load_test. Веса задают долю операции в смеси запросов.
+
+
+def _order_payload(context: ScenarioContext) -> dict:
+    return {
+        "table_number": context.table_number(),
+        "items": [
+            {"item_id": context.item_id(), "price": f"{context.random.randint(100, 2000)}.00"}
+            for _ in range(context.random.randint(1, 4))
+        ],
+    }
+
+
+def _remember_order(context: ScenarioContext, response: LoadResponse) -> None:
+    context.add_order(json.loads(response.body)["id"])
+
+
+def api_create(context: ScenarioContext) -> LoadRequest:
+    return LoadRequest("POST", "/api/orders/", data=_order_payload(context))
+
+
+def api_patch(context: ScenarioContext) -> Optional[LoadRequest]:
+    order_id = context.order_id()
+    if order_id is None:
+        return None
+    return LoadRequest("PATCH", f"/api/orders/{order_id}/", data={"items": _order_payload(context)["items"]})
+
+
+def api_list(context: ScenarioContext) -> LoadRequest:
+    ordering = context.random.choice(["-created_at", "created_at", "-total_price", "table_number"])
+    return LoadRequest("GET", "/api/orders/", params={"ordering": ordering, "page_size": 20})
+
+
+def api_search(context: ScenarioContext) -> LoadRequest:
+    params = {"status": context.random.choice(["pending", "ready", "paid"]), "page_size": 20}
+    if context.random.random() < 0.5:
+        params["table_id"] = context.table_number()
+    else:
+        params["min_total"] = context.random.randint(0, 2000)
+    return LoadRequest("GET", "/api/orders/search/", params=params)
+
+
+def api_revenue(context: ScenarioContext) -> LoadRequest:
+    date_from = timezone.localdate() - timedelta(days=context.random.randint(1, 90))
+    return LoadRequest("GET", "/api/revenue/", params={"date_from": date_from.isoformat()})
+
+
+def web_list(context: ScenarioContext) -> LoadRequest:
+    params: dict[str, Any] = {"status": context.random.choice(["", "pending", "ready", "paid"])}
+    if context.random.random() < 0.3:
+        params["table_number"] = context.table_number()
+    return LoadRequest("GET", "/orders/", params=params)
+
+
+def web_revenue(context: ScenarioContext) -> LoadRequest:
+    return LoadRequest("GET", "/orders/revenue/")
+
+
+SCENARIOS = {
+    scenario.name: scenario
+    for scenario in [
+        Scenario("mixed", "Типичная смена: в основном чтение, около трети запросов меняют заказы", (
+            Operation("api_list", 25, api_list),
+            Operation("api_search", 20, api_search),
+            Operation("api_create", 15, api_create, on_success=_remember_order),
+            Operation("api_patch", 15, api_patch),
+            Operation("api_revenue", 5, api_revenue),
+            Operation("web_list", 15, web_list),
+            Operation("web_revenue", 5, web_revenue),
+        )),
+        Scenario("read", "Только чтение: списки, поиск и выручка в API и на страницах", (
+            Operation("api_list", 35, api_list),
+            Operation("api_search", 30, api_search),
+            Operation("api_revenue", 10, api_revenue),
+            Operation("web_list", 20, web_list),
+            Operation("web_revenue", 5, web_revenue),
+        )),
+        Scenario("write", "Наплыв заказов: создание и изменение состава", (
+            Operation("api_create", 60, api_create, on_success=_remember_order),
+            Operation("api_patch", 40, api_patch),
+        )),
+        Scenario("peak", "Пик посадки: только создание заказов (сравнение с group commit - benchmark_group_commit)", (
+            Operation("api_create", 1, api_create, on_success=_remember_order),
+        )),
+    ]
+}
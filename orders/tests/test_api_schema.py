@@ -0,0 +1,84 @@
+import gzip
+import json
+from io import StringIO
+from pathlib import Path
+
+import pytest
+from django.conf import settings
+from django.core.management import CommandError, call_command
+from django.test import Client
+
+from orders.api import schema
+from orders.api.schema import api_schema, generate_schema
+
+
+@pytest.fixture(autouse=True)
+def fresh_schema():
+    api_schema.reset()
+    yield
+    api_schema.reset()
+
+
+def test_committed_schema_matches_views():
+    committed = json.loads(Path(settings.ORDERS_API_SCHEMA_FILE).read_bytes())
+
+    assert committed == generate_schema(), "схема устарела: выполните python manage.py build_api_schema"
+
+
+def test_check_command_detects_drift(tmp_path):
+    file = tmp_path / "openapi.json"
+    call_command("build_api_schema", file=str(file), stdout=StringIO())
+    call_command("build_api_schema", file=str(file), check=True, stdout=StringIO())
+
+    file.write_text(file.read_text().replace("Просмотр заказов", "Заказы"))
+    with pytest.raises(CommandError):
+        call_command("build_api_schema", file=str(file), check=True, stdout=StringIO())
+
+
+def test_schema_is_served_from_file():
+    response = Client().get("/api/schema/", {"format": "json"})
+
+    assert response.status_code == 200
+    assert response["Content-Type"] == "application/vnd.oai.openapi+json"
+    assert response.content == Path(settings.ORDERS_API_SCHEMA_FILE).read_bytes()
+    assert api_schema.source == settings.ORDERS_API_SCHEMA_FILE
+
+
+def test_schema_is_generated_once_without_file(settings, monkeypatch):
+    settings.ORDERS_API_SCHEMA_FILE = ""
+    calls = []
+    monkeypatch.setattr(schema, "generate_schema", lambda: calls.append(1) or generate_schema())
+    client = Client()
+
+    yaml = client.get("/api/schema/")
+    client.get("/api/schema/", HTTP_ACCEPT="application/vnd.oai.openapi+json")
+    client.get("/api/schema/")
+
+    assert calls == [1]
+    assert yaml["Content-Type"].startswith("application/vnd.oai.openapi;")
+    assert b"openapi: 3.0.3" in yaml.content
+
+
+def test_schema_etag_and_gzip():
+    client = Client()
+    plain = client.get("/api/schema/")
+    packed = client.get("/api/schema/", HTTP_ACCEPT_ENCODING="gzip, deflate")
+
+    assert packed["Content-Encoding"] == "gzip"
+    assert gzip.decompress(packed.content) == plain.content
+    assert len(packed.content) < len(plain.content) / 4
+    assert packed["ETag"] != plain["ETag"]
+    assert "Accept-Encoding" in packed["Vary"]
+
+    cached = client.get("/api/schema/", HTTP_IF_NONE_MATCH=packed["ETag"], HTTP_ACCEPT_ENCODING="gzip")
+    assert cached.status_code == 304
+    assert cached["ETag"] == packed["ETag"]
+    assert client.get("/api/schema/", HTTP_IF_NONE_MATCH=packed["ETag"]).status_code == 200
+
+
+@pytest.mark.django_db
+def test_docs_pages_point_to_schema():
+    response = Client().get("/api/docs/swagger/")
+
+    assert response.status_code == 200
+    assert b"/api/schema/" in response.content
@@ -0,0 +1,71 @@
+import json
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from orders.models import ArchivedOrder, ArchivedOrderItem, Order, OrderItem
+from orders.services.revenue_service import RevenueService
+from orders.tests.test_revenue import rollup_snapshot
+
+
+@pytest.fixture
+def old_paid_orders(item):
+    orders = []
+    for table in (1, 2, 3):
+        order = Order.objects.create(table_number=table, status="paid")
+        OrderItem.objects.create(order=order, item=item, price=10 * table)
+        OrderItem.objects.create(order=order, item=item, price=5)
+        orders.append(order)
+    Order.objects.filter(id__in=[order.id for order in orders]).update(paid_at=timezone.now() - timedelta(days=120))
+    call_command("rebuild_revenue")
+    return orders
+
+
+@pytest.mark.django_db
+def test_archive_moves_only_old_paid_orders(old_paid_orders, paid_order, order):
+    lines = sorted(OrderItem.objects.filter(order__in=old_paid_orders).values_list("id", "order_id", "price"))
+
+    call_command("archive_orders", "--older-than-days", "90", "--batch-size", "2")
+
+    assert set(Order.objects.values_list("id", flat=True)) == {paid_order.id, order.id}
+    assert sorted(ArchivedOrder.objects.values_list("id", flat=True)) == [o.id for o in old_paid_orders]
+    assert sorted(ArchivedOrderItem.objects.values_list("id", "order_id", "price")) == lines
+    archived = ArchivedOrder.objects.get(id=old_paid_orders[0].id)
+    assert archived.status == "paid"
+    assert archived.created_at == old_paid_orders[0].created_at
+
+
+@pytest.mark.django_db
+def test_batches_are_bounded(old_paid_orders):
+    call_command("archive_orders", "--older-than-days", "90", "--batch-size", "2", "--max-batches", "1")
+
+    assert ArchivedOrder.objects.count() == 2
+    assert Order.objects.count() == 1
+
+
+@pytest.mark.django_db
+def test_revenue_reads_archive(old_paid_orders, paid_order):
+    report = RevenueService.report()
+    snapshot = rollup_snapshot()
+
+    call_command("archive_orders", "--older-than-days", "90")
+    assert RevenueService.report() == report
+
+    call_command("rebuild_revenue")
+    assert rollup_snapshot() == snapshot
+
+
+@pytest.mark.django_db
+def test_export_includes_archive_and_lists_do_not(old_paid_orders, paid_order):
+    client = APIClient()
+    call_command("archive_orders", "--older-than-days", "90")
+
+    exported = client.get("/api/orders/export/", {"output": "ndjson"})
+    ids = [json.loads(line)["id"] for line in b"".join(exported.streaming_content).splitlines()]
+    assert ids == sorted([order.id for order in old_paid_orders] + [paid_order.id])
+
+    listed = client.get("/api/orders/search/", {"status": "paid"})
+    assert [order["id"] for order in listed.data] == [paid_order.id]
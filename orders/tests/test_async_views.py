@@ -0,0 +1,133 @@
+import pytest
+from django.test import Client
+from django.urls import include, path
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.views import APIView
+
+from orders.api.urls import async_urlpatterns, sync_urlpatterns
+from orders.models import Order
+
+
+class SyncURLConf:
+    urlpatterns = [path("api/", include(sync_urlpatterns))]
+
+
+class AsyncURLConf:
+    urlpatterns = [path("api/", include(async_urlpatterns))]
+
+
+def get_both(settings, url, **kwargs):
+    responses = []
+    for urlconf in (SyncURLConf, AsyncURLConf):
+        settings.ROOT_URLCONF = urlconf
+        responses.append(Client().get(url, **kwargs))
+    return responses
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("url", [
+    "/api/orders/?page_size=1",
+    "/api/orders/?ordering=-total_price",
+    "/api/orders/search/?status=pending&table_id=1",
+    "/api/orders/search/?min_total=abc",
+    "/api/orders/search/?dish=tes",
+    "/api/orders/?cursor=broken",
+])
+def test_async_list_matches_sync(settings, order, paid_order, url):
+    sync, async_ = get_both(settings, url)
+
+    assert async_.status_code == sync.status_code
+    assert async_.content == sync.content
+    assert async_.get("ETag") == sync.get("ETag")
+    assert async_.get("Link") == sync.get("Link")
+
+
+@pytest.mark.django_db
+def test_async_detail_matches_sync_and_supports_etag(settings, order):
+    sync, async_ = get_both(settings, f"/api/orders/{order.id}/")
+    assert async_.status_code == status.HTTP_200_OK
+    assert async_.content == sync.content
+    assert async_["ETag"] == sync["ETag"]
+
+    cached = Client().get(f"/api/orders/{order.id}/", HTTP_IF_NONE_MATCH=async_["ETag"])
+    assert cached.status_code == status.HTTP_304_NOT_MODIFIED
+
+    missing = Client().get("/api/orders/999999/")
+    assert missing.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.django_db
+def test_async_create(settings, item):
+    settings.ROOT_URLCONF = AsyncURLConf
+    client = Client()
+
+    response = client.post(
+        "/api/orders/", {"table_number": 3, "items": [{"item_id": item.id, "price": 10}]}, content_type="application/json",
+    )
+    assert response.status_code == status.HTTP_201_CREATED
+    order = Order.objects.get(id=response.json()["id"])
+    assert order.total_price == 10
+    assert response["ETag"]
+
+    missing = client.post(
+        "/api/orders/", {"table_number": 3, "items": [{"item_id": 999999, "price": 10}]}, content_type="application/json",
+    )
+    assert missing.status_code == status.HTTP_400_BAD_REQUEST
+    assert missing.json() == {"error": "Блюдо не найдено: 999999."}
+    assert Order.objects.count() == 1
+
+
+@pytest.mark.django_db
+def test_async_detail_delegates_changes_to_sync_view(settings, order):
+    settings.ROOT_URLCONF = AsyncURLConf
+
+    response = Client().patch(f"/api/orders/{order.id}/", {"status": "ready"}, content_type="application/json")
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["status"] == "ready"
+
+
+@pytest.mark.django_db
+def test_async_urls_differ_only_in_order_views():
+    sync_views = {pattern.name: pattern.callback for pattern in sync_urlpatterns}
+    async_views = {pattern.name: pattern.callback for pattern in async_urlpatterns}
+
+    assert list(async_views) == list(sync_views)
+    assert {name for name in sync_views if async_views[name] is not sync_views[name]} == {
+        "order-api-create", "order-api-list", "order-api-detail", "order-api-search",
+    }
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("method, url, kwargs", [
+    # выбор формата ответа
+    ("get", "/api/orders/", {"HTTP_ACCEPT": "application/xml"}),
+    ("get", "/api/orders/{id}/", {"HTTP_ACCEPT": "text/html"}),
+    # разбор тела запроса
+    ("post", "/api/orders/", {"data": "{broken", "content_type": "application/json"}),
+    ("post", "/api/orders/", {"data": "table_number=1", "content_type": "text/plain"}),
+    # неподдерживаемый метод
+    ("put", "/api/orders/{id}/", {"data": "{}", "content_type": "application/json"}),
+])
+def test_async_views_keep_drf_semantics(settings, order, method, url, kwargs):
+    responses = []
+    for urlconf in (SyncURLConf, AsyncURLConf):
+        settings.ROOT_URLCONF = urlconf
+        responses.append(getattr(Client(), method)(url.format(id=order.id), **kwargs))
+    sync, async_ = responses
+
+    assert async_.status_code == sync.status_code
+    assert async_["Content-Type"] == sync["Content-Type"]
+    if not sync["Content-Type"].startswith("text/html"):
+        assert async_.content == sync.content
+
+
+@pytest.mark.django_db
+def test_async_views_check_permissions(settings, monkeypatch, order):
+    monkeypatch.setattr(APIView, "permission_classes", [IsAuthenticated])
+
+    for url in ("/api/orders/", f"/api/orders/{order.id}/", "/api/orders/search/?status=pending"):
+        sync, async_ = get_both(settings, url)
+        assert sync.status_code == async_.status_code == status.HTTP_403_FORBIDDEN
+        assert async_.content == sync.content
@@ -0,0 +1,83 @@
+import json
+from decimal import Decimal
+
+import pytest
+from django.test import override_settings
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from orders.models import Order, OrderItem
+
+URL = "/api/orders/bulk/"
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.mark.django_db
+def test_bulk_json_array_keeps_good_records(api_client, item):
+    payload = [
+        {"table_number": 1, "items": [{"item_id": item.id, "price": 100}, {"item_id": item.id, "price": 50}]},
+        {"table_number": 0, "items": [{"item_id": item.id, "price": 100}]},
+        {"table_number": 2, "items": [{"item_id": 999999, "price": 100}]},
+        {"table_number": 3, "items": [{"item_id": item.id, "price": 10}]},
+    ]
+    response = api_client.post(URL, payload, format="json")
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data["created"] == 2
+    assert response.data["failed"] == 2
+    results = response.data["results"]
+    assert [r["index"] for r in results] == [0, 1, 2, 3]
+    assert "table_number" in results[1]["errors"]
+    assert "999999" in results[2]["errors"]["error"]
+
+    first = Order.objects.get(id=results[0]["id"])
+    assert first.total_price == Decimal("150.00")
+    assert first.items.count() == 2
+    assert Order.objects.get(id=results[3]["id"]).table_number == 3
+
+
+@pytest.mark.django_db
+@override_settings(ORDERS_BULK_CHUNK_SIZE=2)
+def test_bulk_ndjson_stream(api_client, item):
+    lines = [json.dumps({"table_number": n, "items": [{"item_id": item.id, "price": n}]}) for n in range(1, 6)]
+    lines.insert(2, "{not json")
+    body = "\n".join(lines) + "\n"
+
+    response = api_client.generic("POST", URL, body, content_type="application/x-ndjson")
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data["created"] == 5
+    assert response.data["results"][2]["errors"] == {"error": "Некорректный JSON."}
+    assert Order.objects.count() == 5
+    assert OrderItem.objects.count() == 5
+
+
+@pytest.mark.django_db
+def test_bulk_rejects_non_array(api_client):
+    response = api_client.post(URL, {"table_number": 1}, format="json")
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db
+def test_bulk_database_error_isolated_to_record(api_client, item, monkeypatch):
+    from orders.services import bulk_service
+
+    real_insert = bulk_service.OrderBulkCreateService._insert
+
+    def failing_insert(records):
+        if any(data["table_number"] == 13 for _, data in records):
+            raise bulk_service.DatabaseError("boom")
+        return real_insert(records)
+
+    monkeypatch.setattr(bulk_service.OrderBulkCreateService, "_insert", staticmethod(failing_insert))
+    payload = [{"table_number": n, "items": [{"item_id": item.id, "price": 1}]} for n in (12, 13, 14)]
+
+    response = api_client.post(URL, payload, format="json")
+
+    assert [r["id"] is not None for r in response.data["results"]] == [True, False, True]
+    assert sorted(Order.objects.values_list("table_number", flat=True)) == [12, 14]
@@ -0,0 +1,103 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from orders.models import Order
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.mark.django_db
+def test_detail_get_and_not_modified(api_client, order):
+    response = api_client.get(f"/api/orders/{order.id}/")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data["id"] == order.id
+    etag = response["ETag"]
+    assert response["Last-Modified"]
+
+    with CaptureQueriesContext(connection) as context:
+        cached = api_client.get(f"/api/orders/{order.id}/", HTTP_IF_NONE_MATCH=etag)
+    assert cached.status_code == status.HTTP_304_NOT_MODIFIED
+    assert cached["ETag"] == etag
+    assert len(context.captured_queries) == 1
+
+
+@pytest.mark.django_db
+def test_detail_not_found(api_client):
+    response = api_client.get("/api/orders/999999/")
+
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("payload", [{"status": "ready"}, {"item_changes": {"remove": []}, "status": "paid"}])
+def test_version_bumped_on_changes(api_client, order, payload):
+    etag = api_client.get(f"/api/orders/{order.id}/")["ETag"]
+
+    response = api_client.patch(f"/api/orders/{order.id}/", payload, format="json")
+
+    assert response["ETag"] != etag
+    assert api_client.get(f"/api/orders/{order.id}/", HTTP_IF_NONE_MATCH=etag).status_code == status.HTTP_200_OK
+
+
+@pytest.mark.django_db
+def test_item_change_bumps_version(api_client, order, item):
+    version = order.version
+
+    api_client.patch(f"/api/orders/{order.id}/", {"items": [{"item_id": item.id, "price": 3}]}, format="json")
+
+    order.refresh_from_db()
+    assert order.version > version
+
+
+@pytest.mark.django_db
+def test_unchanged_items_keep_version(api_client, order, item):
+    created = api_client.post(
+        "/api/orders/", {"table_number": 1, "items": [{"item_id": item.id, "price": "1.00"}]}, format="json"
+    )
+    assert Order.objects.get(id=created.data["id"]).version == 1
+
+    etag = api_client.get(f"/api/orders/{order.id}/")["ETag"]
+    response = api_client.patch(f"/api/orders/{order.id}/", {"items": [{"item_id": item.id, "price": "1.00"}]},
+                                format="json")
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response["ETag"] == etag
+
+
+@pytest.mark.django_db
+def test_patch_if_match(api_client, order):
+    etag = api_client.get(f"/api/orders/{order.id}/")["ETag"]
+
+    first = api_client.patch(f"/api/orders/{order.id}/", {"status": "ready"}, format="json", HTTP_IF_MATCH=etag)
+    assert first.status_code == status.HTTP_200_OK
+
+    stale = api_client.patch(f"/api/orders/{order.id}/", {"status": "paid"}, format="json", HTTP_IF_MATCH=etag)
+    assert stale.status_code == status.HTTP_412_PRECONDITION_FAILED
+    order.refresh_from_db()
+    assert order.status == "ready"
+
+    fresh = api_client.patch(
+        f"/api/orders/{order.id}/", {"status": "paid"}, format="json", HTTP_IF_MATCH=first["ETag"]
+    )
+    assert fresh.status_code == status.HTTP_200_OK
+
+
+@pytest.mark.django_db
+def test_list_etag(api_client, order):
+    response = api_client.get("/api/orders/")
+    etag = response["ETag"]
+
+    with CaptureQueriesContext(connection) as context:
+        cached = api_client.get("/api/orders/", HTTP_IF_NONE_MATCH=etag)
+    assert cached.status_code == status.HTTP_304_NOT_MODIFIED
+    # ETag страницы берется из кэша ответов
+    assert len(context.captured_queries) == 0
+
+    Order.objects.create(table_number=4)
+    assert api_client.get("/api/orders/", HTTP_IF_NONE_MATCH=etag).status_code == status.HTTP_200_OK
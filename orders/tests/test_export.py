@@ -0,0 +1,70 @@
+import csv
+import io
+import json
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from orders.models import Order, OrderItem
+
+
+@pytest.fixture
+def history(item):
+    first = Order.objects.create(table_number=1, status="paid", total_price=30)
+    OrderItem.objects.create(order=first, item=item, price=10)
+    OrderItem.objects.create(order=first, item=item, price=20)
+    Order.objects.create(table_number=2)
+    third = Order.objects.create(table_number=1, total_price=5)
+    OrderItem.objects.create(order=third, item=item, price=5)
+    return first, third
+
+
+def content(response):
+    return b"".join(response.streaming_content).decode()
+
+
+@pytest.mark.django_db
+def test_export_csv_streams_one_row_per_item(history):
+    response = APIClient().get("/api/orders/export/", {"output": "csv"})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.streaming
+    rows = list(csv.reader(io.StringIO(content(response))))
+    assert rows[0][0] == "order_id"
+    assert [row[0] for row in rows[1:]] == [str(history[0].id)] * 2 + [str(history[0].id + 1), str(history[1].id)]
+    assert rows[1][-2:] == ["test", "10.00"]
+    assert rows[3][-3:] == ["", "", ""]
+
+
+@pytest.mark.django_db
+def test_export_ndjson_groups_items_and_filters(history):
+    response = APIClient().get("/api/orders/export/", {"output": "ndjson", "table_id": 1})
+
+    orders = [json.loads(line) for line in content(response).splitlines()]
+    assert [o["id"] for o in orders] == [history[0].id, history[1].id]
+    assert orders[0]["total_price"] == "30.00"
+    assert [i["price"] for i in orders[0]["items"]] == ["10.00", "20.00"]
+    assert orders[0]["paid_at"] is not None
+
+
+@pytest.mark.django_db
+def test_export_rejects_unknown_output():
+    response = APIClient().get("/api/orders/export/", {"output": "xml"})
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db
+def test_export_command_uses_single_query(history):
+    out = io.StringIO()
+    with CaptureQueriesContext(connection) as context:
+        call_command("export_orders", "--output", "ndjson", "--status", "paid", "--chunk-size", "1", stdout=out)
+
+    lines = out.getvalue().splitlines()
+    assert len(lines) == 1
+    assert json.loads(lines[0])["id"] == history[0].id
+    assert len([q for q in context.captured_queries if "orders_order" in q["sql"]]) == 1
@@ -0,0 +1,64 @@
+from decimal import Decimal
+
+import pytest
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from orders.api.fast_serializers import order_rows, serialize_orders
+from orders.api.serializers import OrderSerializer
+from orders.models import Item, Order, OrderItem
+from orders.services.order_queries import api_items_prefetch, orders_for_api
+from orders.services.response_cache import response_cache
+
+
+@pytest.fixture
+def orders():
+    dishes = [Item.objects.create(name=f"dish {i}") for i in range(3)]
+    prices = [Decimal("0.10"), Decimal("1234567.50"), Decimal("99.99"), Decimal("100")]
+    for table, status in enumerate(["pending", "ready", "paid"], start=1):
+        order = Order.objects.create(table_number=table, status=status)
+        OrderItem.objects.bulk_create(
+            OrderItem(order=order, item=dishes[i % len(dishes)], price=price) for i, price in enumerate(prices[:table + 1])
+        )
+        order.total_price = sum(prices[:table + 1])
+        order.save()
+    # заказ без позиций
+    Order.objects.create(table_number=7)
+
+
+def render_both():
+    drf = OrderSerializer(orders_for_api().prefetch_related(api_items_prefetch()).order_by("id"), many=True).data
+    fast = serialize_orders(list(order_rows(orders_for_api().order_by("id"))))
+    return JSONRenderer().render(drf), JSONRenderer().render(fast)
+
+
+@pytest.mark.django_db
+def test_fast_serialization_is_byte_identical(orders):
+    drf, fast = render_both()
+
+    assert b'"paid_at":null' in fast
+    assert fast == drf
+
+
+@pytest.mark.django_db
+def test_fast_serialization_uses_current_timezone(orders):
+    with timezone.override("Europe/Moscow"):
+        drf, fast = render_both()
+
+    assert b"+03:00" in fast
+    assert fast == drf
+
+
+@pytest.mark.django_db
+def test_api_output_does_not_depend_on_mode(settings, orders):
+    client = APIClient()
+    settings.ORDERS_FAST_SERIALIZATION = True
+    fast = client.get("/api/orders/", {"ordering": "-total_price", "page_size": 2})
+    settings.ORDERS_FAST_SERIALIZATION = False
+    response_cache.cache.clear()
+    drf = client.get("/api/orders/", {"ordering": "-total_price", "page_size": 2})
+
+    assert fast.content == drf.content
+    assert fast["ETag"] == drf["ETag"]
+    assert fast["Link"] == drf["Link"]
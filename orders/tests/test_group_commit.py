@@ -0,0 +1,129 @@
+import re
+import threading
+from decimal import Decimal
+
+import pytest
+from django.db import connections
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from orders.middleware import ReplicaRoutingMiddleware
+from orders.models import Order, OrderItem
+from orders.services.group_commit import GroupCommitError, group_commit
+
+
+def group_commit_settings(window_ms=2, max_batch=100):
+    return override_settings(ORDERS_GROUP_COMMIT={"ENABLED": True, "WINDOW_MS": window_ms, "MAX_BATCH": max_batch})
+
+
+@pytest.fixture(autouse=True)
+def reset_group_commit_stats():
+    group_commit.reset_stats()
+
+
+@pytest.mark.django_db
+def test_api_create_with_group_commit(item):
+    with group_commit_settings():
+        response = APIClient().post("/api/orders/", {
+            "table_number": 5,
+            "items": [{"item_id": item.id, "price": "100.00"}, {"item_id": item.id, "price": "50.00"}],
+        }, format="json")
+
+    assert response.status_code == status.HTTP_201_CREATED
+    order = Order.objects.get(id=response.data["id"])
+    assert response.data["total_price"] == "150.00" == str(order.total_price)
+    assert [row["price"] for row in response.data["items"]] == ["100.00", "50.00"]
+    assert response["ETag"]
+    assert group_commit.stats()["orders"] == 1
+
+
+@pytest.mark.django_db
+def test_api_create_with_group_commit_reports_missing_item(item):
+    with group_commit_settings():
+        response = APIClient().post("/api/orders/", {
+            "table_number": 5, "items": [{"item_id": 999999, "price": "100.00"}],
+        }, format="json")
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert "999999" in response.data["error"]
+    assert not Order.objects.exists()
+    # ошибочный запрос не попадает в пачку
+    assert group_commit.stats()["batches"] == 0
+
+
+@pytest.mark.django_db
+def test_web_create_with_group_commit(client, item):
+    with group_commit_settings():
+        response = client.post(reverse("order_create"), {"table_number": 2, "items": [item.id], "prices": ["70"]})
+
+    assert response.status_code == 302
+    assert Order.objects.get().total_price == Decimal("70.00")
+
+
+@pytest.mark.django_db(transaction=True)
+def test_concurrent_creates_share_transaction(item):
+    callers = 8
+    start = threading.Barrier(callers)
+    results = {}
+
+    def create(number):
+        start.wait()
+        price = "100000000000.00" if number == 3 else "10.00"
+        try:
+            results[number] = group_commit.create_order(number + 1, [{"item_id": item.id, "price": price}])
+        except Exception as e:
+            results[number] = e
+        finally:
+            connections.close_all()
+
+    # окно намного больше времени старта потоков: все запросы попадают в одну пачку
+    with group_commit_settings(window_ms=500, max_batch=callers):
+        threads = [threading.Thread(target=create, args=(number,)) for number in range(callers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    # переполнение цены - ошибка базы только у своего запроса, остальные заказы созданы
+    assert isinstance(results.pop(3), GroupCommitError)
+    assert sorted(order.table_number for order in results.values()) == [1, 2, 3, 5, 6, 7, 8]
+    assert Order.objects.count() == OrderItem.objects.count() == callers - 1
+    for number, order in results.items():
+        assert Order.objects.get(id=order.id).table_number == number + 1
+    assert group_commit.stats() == {"batches": 1, "orders": callers, "avg_batch": float(callers)}
+
+
+@pytest.mark.django_db(transaction=True)
+def test_followers_get_write_cookie_and_batch_metrics(settings, item):
+    settings.DATABASE_REPLICAS = ["default"]
+    settings.DATABASE_REPLICA_STALENESS = 5
+    callers = 4
+    start = threading.Barrier(callers)
+    responses = {}
+
+    def create(number):
+        start.wait()
+        try:
+            responses[number] = APIClient().post("/api/orders/", {
+                "table_number": number + 1, "items": [{"item_id": item.id, "price": "10.00"}],
+            }, format="json")
+        finally:
+            connections.close_all()
+
+    with group_commit_settings(window_ms=500, max_batch=callers):
+        threads = [threading.Thread(target=create, args=(number,)) for number in range(callers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    assert group_commit.stats()["batches"] == 1
+    for response in responses.values():
+        assert response.status_code == status.HTTP_201_CREATED
+        # запись пачки выполнил лидер, но следующие чтения каждого клиента идут в основную базу
+        assert ReplicaRoutingMiddleware.COOKIE_NAME in response.cookies
+        # запросы пачки учтены у каждого запроса, а не только у лидера
+        queries = re.search(r'"(\d+) queries"', response["Server-Timing"])
+        assert queries and int(queries.group(1)) >= 2
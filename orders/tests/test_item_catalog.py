@@ -0,0 +1,84 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from orders.models import Item, Order
+from orders.services.item_catalog import ItemCatalog, item_catalog
+from orders.services.order_service import OrderCreateService, ItemNotFoundError
+
+
+def item_queries(context):
+    return [q for q in context.captured_queries if 'FROM "orders_item"' in q["sql"]]
+
+
+@pytest.mark.django_db
+def test_items_resolved_in_one_query():
+    dishes = [Item.objects.create(name=f"dish {i}") for i in range(20)]
+    order = Order.objects.create(table_number=1)
+
+    with CaptureQueriesContext(connection) as context:
+        OrderCreateService.create_order_items([{"item_id": d.id, "price": 10} for d in dishes], order)
+    assert len(item_queries(context)) == 1
+
+    with CaptureQueriesContext(connection) as context:
+        OrderCreateService.create_order_items([{"item_id": d.id, "price": 10} for d in dishes], order)
+    assert len(item_queries(context)) == 0
+    assert order.items.count() == 40
+
+
+@pytest.mark.django_db
+def test_missing_items_are_listed(item):
+    order = Order.objects.create(table_number=1)
+
+    with pytest.raises(ItemNotFoundError) as error:
+        OrderCreateService.create_order_items(
+            [{"item_id": item.id, "price": 1}, {"item_id": 999998, "price": 1}, {"item_id": "", "price": 1}],
+            order,
+        )
+    assert error.value.missing_ids == [999998, ""]
+    assert "999998" in error.value.message
+
+
+@pytest.mark.django_db
+def test_api_create_reports_missing_items(item):
+    data = {"table_number": 1, "items": [{"item_id": 999997, "price": 1}]}
+    response = APIClient().post("/api/orders/", data, format="json")
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert "999997" in response.data["error"]
+    assert not Order.objects.exists()
+
+
+@pytest.mark.django_db
+def test_item_change_invalidates_cache(item):
+    assert item_catalog.get_many([item.id])[item.id].name == "test"
+    assert item_catalog.menu() == [{"name": "test", "id": item.id}]
+
+    item.name = "renamed"
+    item.save()
+    assert item_catalog.get_many([item.id])[item.id].name == "renamed"
+    assert item_catalog.menu() == [{"name": "renamed", "id": item.id}]
+
+    item_id = item.id
+    item.delete()
+    assert item_catalog.get_many([item_id]) == {}
+
+
+@pytest.mark.django_db
+def test_cache_bounded_and_expiring(monkeypatch):
+    dishes = [Item.objects.create(name=f"dish {i}") for i in range(5)]
+    catalog = ItemCatalog(max_size=3, ttl=60)
+    catalog.get_many(d.id for d in dishes)
+    assert len(catalog) == 3
+
+    clock = [1000.0]
+    monkeypatch.setattr("orders.services.item_catalog.time.monotonic", lambda: clock[0])
+    catalog = ItemCatalog(max_size=10, ttl=60)
+    catalog.get_many([dishes[0].id])
+    Item.objects.filter(id=dishes[0].id).update(name="changed elsewhere")
+    assert catalog.get_many([dishes[0].id])[dishes[0].id].name == "dish 0"
+
+    clock[0] += 61
+    assert catalog.get_many([dishes[0].id])[dishes[0].id].name == "changed elsewhere"
@@ -0,0 +1,95 @@
+from decimal import Decimal
+from io import StringIO
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.db.models import Count, F, Sum
+from django.utils import timezone
+
+from orders.models import Item, Order, OrderItem
+from orders.services.dataset_service import (
+    ITEM_FIELDS, DatasetGenerator, TableLoader, load_export,
+)
+from orders.services.export_service import OrderExportService
+from orders.services.order_service import items_total_subquery
+from orders.services.revenue_service import RevenueService
+
+
+def run_command(*args, **options):
+    call_command("load_dataset", *args, stdout=StringIO(), **options)
+
+
+@pytest.mark.django_db
+def test_generated_orders_are_consistent():
+    run_command(orders=500, menu=12, tables=8, seed=1, batch_size=200)
+
+    assert Item.objects.count() == 12
+    assert Order.objects.count() == 500
+    sizes = Order.objects.annotate(size=Count("items")).values_list("size", flat=True)
+    assert set(sizes) <= set(range(1, 9))
+    assert not Order.objects.annotate(actual=items_total_subquery()).exclude(total_price=F("actual")).exists()
+    assert not Order.objects.filter(status="paid", paid_at__isnull=True).exists()
+    assert not Order.objects.exclude(table_number__range=(1, 8)).exists()
+    assert Order.objects.filter(status="paid").count() > 400
+
+    paid_revenue = OrderItem.objects.filter(order__status="paid").aggregate(total=Sum("price"))["total"]
+    assert RevenueService.report()["total_revenue"] == paid_revenue
+
+
+@pytest.mark.django_db
+def test_sequences_continue_after_load(item):
+    run_command(orders=10, seed=1)
+
+    order = Order.objects.create(table_number=1)
+
+    assert order.id > Order.objects.exclude(id=order.id).order_by("-id").values_list("id", flat=True)[0]
+
+
+def test_generator_is_repeatable_with_seed():
+    now = timezone.now()
+
+    def generate():
+        generator = DatasetGenerator([(1, Decimal("100")), (2, Decimal("250"))], seed=7, now=now)
+        return list(generator.orders(50, first_order_id=1, first_line_id=1))
+
+    assert generate() == generate()
+
+
+@pytest.mark.django_db
+def test_fixture_is_loaded_with_totals():
+    run_command("orders/fixtures/orders.json")
+
+    assert Item.objects.count() == 4
+    assert Order.objects.count() == 3
+    assert OrderItem.objects.count() == 6
+    assert not Order.objects.annotate(actual=items_total_subquery()).exclude(total_price=F("actual")).exists()
+    assert Order.objects.get(pk=2).paid_at is not None
+
+
+@pytest.mark.django_db
+def test_export_round_trip(item, order, paid_order):
+    exported = "".join(OrderExportService(Order.objects.all()).stream("ndjson"))
+    before = list(Order.objects.order_by("id").values_list("id", "status", "total_price", "paid_at"))
+    lines_before = sorted(OrderItem.objects.values_list("order_id", "item_id", "price"))
+    Order.objects.all().delete()
+
+    for _ in load_export(StringIO(exported)):
+        pass
+
+    assert list(Order.objects.order_by("id").values_list("id", "status", "total_price", "paid_at")) == before
+    assert sorted(OrderItem.objects.values_list("order_id", "item_id", "price")) == lines_before
+
+
+@pytest.mark.django_db
+def test_loader_falls_back_to_bulk_create(monkeypatch):
+    monkeypatch.setattr(TableLoader, "uses_copy", property(lambda self: False))
+
+    TableLoader(Item, ITEM_FIELDS).load([(501, "Суп"), (502, "Чай")])
+
+    assert dict(Item.objects.values_list("id", "name")) == {501: "Суп", 502: "Чай"}
+
+
+@pytest.mark.django_db
+def test_command_requires_source():
+    with pytest.raises(CommandError):
+        run_command()
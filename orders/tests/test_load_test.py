@@ -0,0 +1,109 @@
+import http.client
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import StringIO
+
+import pytest
+from django.core.management import CommandError, call_command
+
+from orders.models import Order
+from orders.services.load_testing import (
+    ClientTransport, HTTPTransport, LoadRequest, LoadRunner, ScenarioContext, _percentile_ms,
+)
+from orders.tests.load_scenarios import SCENARIOS
+
+
+def run_command(**options):
+    out = StringIO()
+    call_command("load_test", stdout=out, concurrency=1, seed=1, **options)
+    return json.loads(out.getvalue())
+
+
+@pytest.mark.django_db
+def test_mixed_scenario_reports_every_endpoint(order):
+    report = run_command(scenario="mixed", requests=200)
+
+    assert report["total"]["requests"] == 200
+    assert report["total"]["errors"] == 0
+    assert set(report["endpoints"]) == {op.name for op in SCENARIOS["mixed"].operations}
+    for stats in report["endpoints"].values():
+        assert stats["p50_ms"] <= stats["p95_ms"] <= stats["p99_ms"] <= stats["max_ms"]
+        assert stats["queries_max"] is not None
+    # созданные заказы попадают в базу и в выборку для изменения
+    assert Order.objects.count() == 1 + report["endpoints"]["api_create"]["requests"]
+
+
+@pytest.mark.django_db
+def test_write_scenario_without_orders_starts_with_creates(item):
+    context = ScenarioContext([item.id], [], seed=1)
+
+    report = LoadRunner(SCENARIOS["write"], ClientTransport(), context).run(requests=30)
+
+    assert report["endpoints"]["api_create"]["errors"] == 0
+    assert report["endpoints"]["api_patch"]["errors"] == 0
+    assert len(context.order_ids) == Order.objects.count()
+
+
+@pytest.mark.django_db
+def test_query_counts_missing_when_metrics_disabled(settings, order):
+    settings.ORDERS_METRICS_ENABLED = False
+
+    report = run_command(scenario="read", requests=20)
+
+    assert report["total"]["queries_avg"] is None
+
+
+@pytest.mark.django_db
+def test_command_requires_items():
+    with pytest.raises(CommandError):
+        run_command(requests=1)
+
+
+@pytest.mark.django_db
+def test_command_rejects_unknown_target(item):
+    with pytest.raises(CommandError):
+        run_command(requests=1, target="ftp://localhost")
+
+
+def test_percentiles_use_nearest_rank():
+    values = [i / 1000 for i in range(1, 101)]
+
+    assert _percentile_ms(values, 50) == 50
+    assert _percentile_ms(values, 99) == 99
+    assert _percentile_ms(values, 100) == 100
+    assert _percentile_ms([], 50) is None
+
+
+def test_http_transport_does_not_replay_post_after_dropped_connection():
+    received = []
+
+    class DroppingHandler(BaseHTTPRequestHandler):
+        # запрос прочитан и, возможно, выполнен, но ответ потерян
+        def do_GET(self):
+            received.append("GET")
+            self.close_connection = True
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers["Content-Length"]))
+            received.append("POST")
+            self.close_connection = True
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), DroppingHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    transport = HTTPTransport(f"http://127.0.0.1:{server.server_address[1]}", timeout=5)
+    try:
+        with pytest.raises(http.client.HTTPException):
+            transport.send(LoadRequest("POST", "/api/orders/", data={"table_number": 1}))
+        assert received == ["POST"]
+
+        with pytest.raises(http.client.HTTPException):
+            transport.send(LoadRequest("GET", "/api/orders/"))
+        assert received == ["POST", "GET", "GET"]
+    finally:
+        transport.close()
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,81 @@
+import re
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient, Client
+from django.urls import reverse
+from rest_framework import status
+
+from orders.services.metrics import request_metrics
+from orders.tests.test_async_views import AsyncURLConf
+
+
+@pytest.fixture(autouse=True)
+def reset_metrics():
+    request_metrics.reset()
+
+
+def server_timing(response):
+    return dict(re.findall(r"(\w+);dur=([\d.]+)", response["Server-Timing"]))
+
+
+@pytest.mark.django_db
+def test_server_timing_header(order):
+    response = Client().get("/api/orders/search/", {"table_id": 1})
+
+    assert response.status_code == status.HTTP_200_OK
+    phases = server_timing(response)
+    assert set(phases) == {"db", "view", "render", "total"}
+    assert float(phases["total"]) >= float(phases["view"])
+    assert 'desc="2 queries"' in response["Server-Timing"]
+
+
+@pytest.mark.django_db
+def test_async_view_queries_are_counted(settings, order):
+    settings.ROOT_URLCONF = AsyncURLConf
+
+    response = Client().get(f"/api/orders/{order.id}/")
+
+    assert 'desc="3 queries"' in response["Server-Timing"]
+
+
+@pytest.mark.django_db
+def test_server_timing_under_asgi(settings, order):
+    settings.ROOT_URLCONF = AsyncURLConf
+
+    # асинхронный обработчик: middleware и хук process_template_response работают в асинхронном варианте
+    response = async_to_sync(AsyncClient().get)("/api/orders/search/", {"table_id": 1})
+
+    assert response.status_code == status.HTTP_200_OK
+    phases = server_timing(response)
+    assert set(phases) == {"db", "view", "render", "total"}
+    assert float(phases["total"]) >= float(phases["view"])
+
+
+@pytest.mark.django_db
+def test_metrics_endpoint(order):
+    client = Client()
+    client.get(reverse("order_list"))
+    client.get(reverse("order_list"))
+    client.get("/api/orders/search/", {"table_id": "abc"})
+
+    response = client.get("/metrics")
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response["Content-Type"].startswith("text/plain; version=0.0.4")
+    assert "Server-Timing" not in response
+    text = response.content.decode()
+    assert 'orders_request_duration_seconds_count{route="order_list"} 2' in text
+    assert 'orders_request_duration_seconds_bucket{route="order_list",le="+Inf"} 2' in text
+    assert 'orders_request_queries_bucket{route="order_list",le="2"} 2' in text
+    assert 'orders_responses_total{route="order-api-search",status="4xx"} 1' in text
+
+
+@pytest.mark.django_db
+def test_disabled_metrics_add_nothing(settings, order):
+    settings.ORDERS_METRICS_ENABLED = False
+    client = Client()
+
+    assert "Server-Timing" not in client.get(reverse("order_list"))
+    assert client.get("/metrics").status_code == status.HTTP_404_NOT_FOUND
+    assert request_metrics.render_text().count("_count") == 0
@@ -0,0 +1,195 @@
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient, Client
+from rest_framework import status
+
+from orders.models import Order, OrderEvent
+from orders.services.order_events import DatabaseEventBackend, event_backend
+from orders.services.status_service import OrderStatusService
+
+
+def poll(client, last_id, **params):
+    response = client.get("/api/orders/events/", {"last_event_id": last_id, "wait": 0, **params})
+    assert response.status_code == status.HTTP_200_OK
+    return response.json()
+
+
+@pytest.mark.django_db
+def test_write_paths_publish_events(django_capture_on_commit_callbacks, item):
+    client = Client()
+    last_id = event_backend().latest_id()
+
+    with django_capture_on_commit_callbacks(execute=True):
+        order_id = client.post(
+            "/api/orders/", {"table_number": 4, "items": [{"item_id": item.id, "price": 10}]},
+            content_type="application/json",
+        ).json()["id"]
+        client.patch(f"/api/orders/{order_id}/", {"status": "ready"}, content_type="application/json")
+        client.patch(
+            f"/api/orders/{order_id}/", {"items": [{"item_id": item.id, "price": 20}]}, content_type="application/json",
+        )
+        client.delete(f"/api/orders/{order_id}/")
+
+    feed = poll(client, last_id)
+    assert [(event["type"], event["order_id"]) for event in feed["events"]] == [
+        ("created", order_id), ("status_changed", order_id), ("items_changed", order_id), ("deleted", order_id),
+    ]
+    assert feed["last_event_id"] == feed["events"][-1]["id"]
+
+
+@pytest.mark.django_db
+def test_rolled_back_changes_are_not_published(django_capture_on_commit_callbacks):
+    client = Client()
+    last_id = event_backend().latest_id()
+
+    with django_capture_on_commit_callbacks(execute=True):
+        response = client.post(
+            "/api/orders/", {"table_number": 4, "items": [{"item_id": 999999, "price": 10}]},
+            content_type="application/json",
+        )
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert poll(client, last_id)["events"] == []
+
+
+@pytest.mark.django_db
+def test_feed_filters_by_status_and_table(django_capture_on_commit_callbacks):
+    client = Client()
+    last_id = event_backend().latest_id()
+
+    with django_capture_on_commit_callbacks(execute=True):
+        Order.objects.create(table_number=1)
+        Order.objects.create(table_number=2)
+        Order.objects.create(table_number=2, status="paid")
+
+    feed = poll(client, last_id, table_id=2, status="pending")
+    assert [(event["table_number"], event["status"]) for event in feed["events"]] == [(2, "pending")]
+    # отфильтрованные события тоже сдвигают позицию ленты
+    assert feed["last_event_id"] == last_id + 3
+
+
+@pytest.mark.django_db
+def test_status_filter_receives_order_leaving_status(django_capture_on_commit_callbacks):
+    client = Client()
+    with django_capture_on_commit_callbacks(execute=True):
+        first = Order.objects.create(table_number=1)
+        second = Order.objects.create(table_number=1)
+    last_id = event_backend().latest_id()
+
+    with django_capture_on_commit_callbacks(execute=True):
+        client.patch(f"/api/orders/{first.id}/", {"status": "ready"}, content_type="application/json")
+        OrderStatusService("ready").transition([second.id])
+
+    feed = poll(client, last_id, status="pending")
+    assert [(event["order_id"], event["previous_status"], event["status"]) for event in feed["events"]] == [
+        (first.id, "pending", "ready"), (second.id, "pending", "ready"),
+    ]
+    assert poll(client, last_id, status="paid")["events"] == []
+
+
+def sse_request(client, last_id):
+    return client.get("/api/orders/events/", headers={"Accept": "text/event-stream", "Last-Event-ID": str(last_id)})
+
+
+def assert_first_event(chunks, last_id, order):
+    retry, event = chunks
+    assert retry == b"retry: 3000\n\n"
+    assert event.startswith(f"id: {last_id + 1}\nevent: created\n".encode())
+    assert f'"order_id": {order.id}'.encode() in event
+
+
+@pytest.mark.django_db
+def test_sse_stream(django_capture_on_commit_callbacks):
+    last_id = event_backend().latest_id()
+    with django_capture_on_commit_callbacks(execute=True):
+        order = Order.objects.create(table_number=7)
+
+    # под WSGI (runserver) поток отдается синхронным итератором
+    response = sse_request(Client(), last_id)
+    assert response["Content-Type"] == "text/event-stream"
+    stream = iter(response.streaming_content)
+
+    assert_first_event([next(stream), next(stream)], last_id, order)
+    response.close()
+
+
+@pytest.mark.django_db
+def test_sse_stream_under_asgi(django_capture_on_commit_callbacks):
+    last_id = event_backend().latest_id()
+    with django_capture_on_commit_callbacks(execute=True):
+        order = Order.objects.create(table_number=7)
+
+    async def first_chunks():
+        response = await sse_request(AsyncClient(), last_id)
+        assert response["Content-Type"] == "text/event-stream"
+        stream = aiter(response.streaming_content)
+        return [await anext(stream), await anext(stream)]
+
+    assert_first_event(async_to_sync(first_chunks)(), last_id, order)
+
+
+@pytest.mark.django_db
+def test_sse_stream_ends_after_lifetime(settings):
+    settings.ORDERS_EVENTS_STREAM_LIFETIME = 0
+
+    response = sse_request(Client(), event_backend().latest_id())
+
+    # соединение закрывается, EventSource переподключится с Last-Event-ID
+    assert list(response.streaming_content) == [b"retry: 3000\n\n"]
+
+
+@pytest.mark.django_db
+def test_sse_validation_error():
+    response = Client().get("/api/orders/events/", {"status": "lost"}, headers={"Accept": "text/event-stream"})
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert response.content.startswith(b"event: error\ndata: ")
+
+
+@pytest.mark.django_db(transaction=True)
+def test_database_backend_shared_between_workers():
+    publisher, subscriber = DatabaseEventBackend(poll_interval=0), DatabaseEventBackend(poll_interval=0)
+    last_id = subscriber.latest_id()
+
+    publisher.publish("created", 1, 3, "pending")
+
+    events = subscriber.wait(last_id, timeout=1)
+    assert [(event.kind, event.order_id, event.table_number) for event in events] == [("created", 1, 3)]
+
+
+def make_event(event_id, order_id=1):
+    return OrderEvent.objects.create(id=event_id, kind="created", order_id=order_id, table_number=1, status="pending")
+
+
+@pytest.mark.django_db(transaction=True)
+def test_database_backend_waits_for_late_lower_id():
+    subscriber = DatabaseEventBackend(poll_interval=0, gap_timeout=60)
+    last_id = subscriber.latest_id()
+
+    # событие last_id + 2 зафиксировано раньше, чем last_id + 1
+    make_event(last_id + 2, order_id=2)
+    assert subscriber.wait(last_id, timeout=0) == []
+
+    make_event(last_id + 1, order_id=1)
+    assert [event.order_id for event in subscriber.wait(last_id, timeout=0)] == [1, 2]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_database_backend_skips_gap_after_timeout():
+    subscriber = DatabaseEventBackend(poll_interval=0, gap_timeout=0)
+    last_id = subscriber.latest_id()
+
+    # вставка last_id + 1 откатилась: пропуск остается навсегда
+    make_event(last_id + 2, order_id=2)
+
+    assert [event.id for event in subscriber.wait(last_id, timeout=0)] == [last_id + 2]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_database_backend_prunes_old_events():
+    publisher = DatabaseEventBackend(poll_interval=0, retention=2, cleanup_interval=0)
+
+    for order_id in range(5):
+        publisher.publish("created", order_id, 1, "pending")
+
+    assert sorted(OrderEvent.objects.values_list("order_id", flat=True)) == [3, 4]
@@ -0,0 +1,124 @@
+from decimal import Decimal
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from orders.models import Item, Order, OrderItem
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture
+def soup():
+    return Item.objects.create(name="soup")
+
+
+@pytest.fixture
+def big_order(item, soup):
+    order = Order.objects.create(table_number=1)
+    OrderItem.objects.bulk_create([
+        OrderItem(order=order, item=item, price=10),
+        OrderItem(order=order, item=item, price=20),
+        OrderItem(order=order, item=soup, price=30),
+    ])
+    return order
+
+
+def lines(order):
+    return list(order.items.order_by("id").values_list("id", "item_id", "price"))
+
+
+def writes(context):
+    return [q["sql"].split()[0] for q in context.captured_queries if q["sql"].split()[0] in ("INSERT", "UPDATE", "DELETE")]
+
+
+@pytest.mark.django_db
+def test_replace_touches_only_changed_line(api_client, big_order, item, soup):
+    before = lines(big_order)
+    payload = {"items": [
+        {"item_id": item.id, "price": 10}, {"item_id": item.id, "price": 20}, {"item_id": soup.id, "price": 35},
+    ]}
+
+    with CaptureQueriesContext(connection) as context:
+        response = api_client.patch(f"/api/orders/{big_order.id}/", payload, format="json")
+
+    assert response.status_code == status.HTTP_200_OK
+    after = lines(big_order)
+    assert [line[0] for line in after] == [line[0] for line in before]
+    assert after[2][2] == Decimal("35.00")
+    # одна строка UPDATE позиции и один UPDATE суммы заказа, без DELETE и INSERT
+    assert writes(context) == ["UPDATE", "UPDATE"]
+    big_order.refresh_from_db()
+    assert big_order.total_price == Decimal("65.00")
+
+
+@pytest.mark.django_db
+def test_replace_adds_and_removes_lines(api_client, big_order, item, soup):
+    kept = lines(big_order)[0]
+    payload = {"items": [{"item_id": item.id, "price": 10}]}
+
+    response = api_client.patch(f"/api/orders/{big_order.id}/", payload, format="json")
+
+    assert response.status_code == status.HTTP_200_OK
+    assert lines(big_order) == [kept]
+
+    payload = {"items": [{"item_id": item.id, "price": 10}, {"item_id": soup.id, "price": 5}, {"item_id": soup.id, "price": 5}]}
+    api_client.patch(f"/api/orders/{big_order.id}/", payload, format="json")
+    assert lines(big_order)[0] == kept
+    assert len(lines(big_order)) == 3
+
+
+@pytest.mark.django_db
+def test_item_changes_mode(api_client, big_order, soup):
+    first, second, third = lines(big_order)
+    payload = {"item_changes": {
+        "add": [{"item_id": soup.id, "price": 7}],
+        "update": [{"id": second[0], "price": 25}],
+        "remove": [first[0]],
+    }}
+
+    response = api_client.patch(f"/api/orders/{big_order.id}/", payload, format="json")
+
+    assert response.status_code == status.HTTP_200_OK
+    after = lines(big_order)
+    assert after[:2] == [(second[0], second[1], Decimal("25.00")), third]
+    assert after[2][1:] == (soup.id, Decimal("7.00"))
+    assert response.data["total_price"] == "62.00"
+    assert [line["id"] for line in response.data["items"]] == [line[0] for line in after]
+
+
+@pytest.mark.django_db
+def test_item_changes_reject_foreign_lines(api_client, big_order, order):
+    foreign_line = order.items.get().id
+    payload = {"item_changes": {"remove": [foreign_line]}}
+
+    response = api_client.patch(f"/api/orders/{big_order.id}/", payload, format="json")
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert str(foreign_line) in response.data["error"]
+    assert OrderItem.objects.filter(id=foreign_line).exists()
+
+
+@pytest.mark.django_db
+def test_item_changes_cannot_empty_order(api_client, big_order):
+    payload = {"item_changes": {"remove": [line[0] for line in lines(big_order)]}}
+
+    response = api_client.patch(f"/api/orders/{big_order.id}/", payload, format="json")
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert len(lines(big_order)) == 3
+
+
+@pytest.mark.django_db
+def test_items_and_item_changes_are_exclusive(api_client, big_order, item):
+    payload = {"items": [{"item_id": item.id, "price": 1}], "item_changes": {"remove": []}}
+
+    response = api_client.patch(f"/api/orders/{big_order.id}/", payload, format="json")
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
@@ -0,0 +1,91 @@
+import pytest
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from orders.models import Item, Order, OrderItem
+from orders.services.row_cache import order_rows
+
+
+@pytest.fixture
+def orders(item):
+    orders = []
+    for table in (1, 2, 3):
+        order = Order.objects.create(table_number=table)
+        OrderItem.objects.create(order=order, item=item, price=100)
+        orders.append(order)
+    return orders
+
+
+def rendered():
+    return order_rows.stats()["rendered"]
+
+
+@pytest.mark.django_db
+def test_status_change_rerenders_one_row(client, orders):
+    client.get(reverse("order_list"))
+    assert rendered() == 3
+
+    response = APIClient().post(f"/api/orders/{orders[1].id}/status/", {"status": "ready"}, format="json")
+    assert response.status_code == 200
+
+    response = client.get(reverse("order_list_rows"))
+    assert rendered() == 4
+    assert order_rows.stats()["hits"] == 2
+    html = response.content.decode()
+    assert html.count("<tr ") == 3
+    assert "Готово" in html
+    assert "<table" not in html
+
+
+@pytest.mark.django_db
+def test_rows_fragment_uses_list_filters(client, orders):
+    response = client.get(reverse("order_list_rows"), {"table_number": 2})
+
+    assert f'data-order-id="{orders[1].id}"' in response.content.decode()
+    assert response.content.decode().count("<tr ") == 1
+
+
+@pytest.mark.django_db
+def test_single_row_fragment(client, orders):
+    order = orders[0]
+    response = client.get(reverse("order_row", args=[order.id]))
+    assert response.status_code == 200
+    assert response.content.decode().strip().startswith(f'<tr id="order-{order.id}"')
+
+    order.table_number = 42
+    order.save()
+    assert "<td>42</td>" in client.get(reverse("order_row", args=[order.id])).content.decode()
+    assert rendered() == 2
+
+    assert client.get(reverse("order_row", args=[0])).status_code == 404
+
+
+@pytest.mark.django_db
+def test_page_and_fragment_render_the_same_rows(client, orders):
+    page = client.get(reverse("order_list")).content.decode()
+    fragment = client.get(reverse("order_list_rows")).content.decode()
+
+    assert fragment.strip() in page
+    assert rendered() == 3
+
+
+@pytest.mark.django_db
+def test_renamed_dish_rerenders_rows(client, orders, item):
+    client.get(reverse("order_list"))
+
+    item.name = "Солянка"
+    item.save()
+
+    assert "Солянка" in client.get(reverse("order_list_rows")).content.decode()
+    assert rendered() == 6
+
+
+@pytest.mark.django_db
+def test_rows_without_cache(client, orders, monkeypatch):
+    monkeypatch.setattr(order_rows, "timeout", 0)
+
+    client.get(reverse("order_list"))
+    response = client.get(reverse("order_list"))
+
+    assert response.content.decode().count('data-order-id="') == 3
+    assert order_rows.stats()["hits"] == 0
@@ -0,0 +1,95 @@
+from decimal import Decimal
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from orders.forms import UpdateOrderForm, OrderItemFormSet
+from orders.models import Order, Item
+from orders.services.order_service import OrderUpdateService
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.mark.django_db
+def test_total_stored_on_create(api_client, item):
+    data = {"table_number": 1, "items": [{"item_id": item.id, "price": 100}, {"item_id": item.id, "price": "25.50"}]}
+    response = api_client.post("/api/orders/", data, format="json")
+
+    assert response.status_code == status.HTTP_201_CREATED
+    assert response.data["total_price"] == "125.50"
+    assert Order.objects.get(id=response.data["id"]).total_price == Decimal("125.50")
+
+
+@pytest.mark.django_db
+def test_total_recalculated_on_api_patch(api_client, order, item):
+    data = {"status": "ready", "items": [{"item_id": item.id, "price": 40}]}
+    response = api_client.patch(f"/api/orders/{order.id}/", data, format="json")
+
+    assert response.status_code == status.HTTP_200_OK
+    order.refresh_from_db()
+    assert order.total_price == Decimal("40.00")
+
+
+@pytest.mark.django_db
+def test_total_recalculated_on_form_update(order, order_item):
+    first_item = order.items.exclude(id=order_item.id).get()
+    form = UpdateOrderForm(data={"status": "ready"}, instance=order)
+    formset = OrderItemFormSet(
+        data={
+            "form-TOTAL_FORMS": "2",
+            "form-INITIAL_FORMS": "2",
+            "form-0-id": first_item.id,
+            "form-0-item": first_item.item_id,
+            "form-0-price": "1",
+            "form-0-DELETE": "on",
+            "form-1-id": order_item.id,
+            "form-1-item": order_item.item_id,
+            "form-1-price": "700",
+        },
+        queryset=order.items.all(),
+    )
+
+    OrderUpdateService(form, order, formset).update_order()
+
+    order.refresh_from_db()
+    assert order.total_price == Decimal("700.00")
+
+
+@pytest.mark.django_db
+def test_check_order_totals_repairs_drift(order):
+    Order.objects.filter(id=order.id).update(total_price=999)
+    out = StringIO()
+
+    call_command("check_order_totals", stdout=out)
+    order.refresh_from_db()
+    assert order.total_price == 999
+    assert f"#{order.id}" in out.getvalue()
+
+    call_command("check_order_totals", "--repair", stdout=StringIO())
+    order.refresh_from_db()
+    assert order.total_price == Decimal("1.00")
+
+
+@pytest.mark.django_db
+def test_search_by_total(api_client, item):
+    cheap = Order.objects.create(table_number=1, total_price=10)
+    expensive = Order.objects.create(table_number=1, total_price=500)
+
+    response = api_client.get("/api/orders/search/", {"min_total": "100"})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert [row["id"] for row in response.data] == [expensive.id]
+    assert cheap.id not in [row["id"] for row in response.data]
+
+
+@pytest.mark.django_db
+def test_search_rejects_invalid_total(api_client):
+    response = api_client.get("/api/orders/search/", {"min_total": "NaN"})
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
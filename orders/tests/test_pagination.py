@@ -0,0 +1,101 @@
+import re
+
+import pytest
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from orders.models import Order
+from orders.services.pagination import KeysetPaginator, InvalidCursorError
+
+
+def next_url(response, rel="next"):
+    match = re.search(rf'<([^>]+)>; rel="{rel}"', response.get("Link", ""))
+    return match.group(1) if match else None
+
+
+@pytest.fixture
+def orders():
+    return [Order.objects.create(table_number=i % 3 + 1, total_price=(i * 7) % 5) for i in range(7)]
+
+
+@pytest.mark.django_db
+def test_walk_forward_and_back_by_id(orders):
+    client = APIClient()
+    response = client.get("/api/orders/", {"page_size": 3})
+    seen = []
+    pages = []
+    while True:
+        assert response.status_code == status.HTTP_200_OK
+        pages.append([row["id"] for row in response.data])
+        seen += pages[-1]
+        url = next_url(response)
+        if not url:
+            break
+        response = client.get(url)
+
+    assert seen == [order.id for order in orders]
+    assert [len(page) for page in pages] == [3, 3, 1]
+
+    previous = client.get(next_url(response, "prev"))
+    assert [row["id"] for row in previous.data] == pages[1]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("ordering", ["total_price", "-total_price", "-id", "table_number"])
+def test_walk_by_sort_key_visits_every_order_once(orders, ordering):
+    paginator_pages = []
+    cursor = None
+    while True:
+        page = KeysetPaginator(ordering=ordering, page_size=2, cursor=cursor).paginate(Order.objects.all())
+        paginator_pages += page.items
+        cursor = page.next_cursor
+        if not cursor:
+            break
+
+    key = ordering.lstrip("-")
+    expected = sorted(orders, key=lambda o: (getattr(o, key), o.id), reverse=ordering.startswith("-"))
+    assert [o.id for o in paginator_pages] == [o.id for o in expected]
+
+
+@pytest.mark.django_db
+@override_settings(ORDERS_PAGE_SIZE=2, ORDERS_MAX_PAGE_SIZE=4)
+def test_page_size_default_and_maximum(orders):
+    client = APIClient()
+    assert len(client.get("/api/orders/").data) == 2
+    assert len(client.get("/api/orders/", {"page_size": 100}).data) == 4
+
+
+@pytest.mark.django_db
+def test_search_is_paginated(orders):
+    response = APIClient().get("/api/orders/search/", {"table_id": 1, "page_size": 1})
+
+    assert len(response.data) == 1
+    assert "table_id=1" in next_url(response)
+
+
+@pytest.mark.django_db
+def test_invalid_cursor():
+    with pytest.raises(InvalidCursorError):
+        KeysetPaginator(cursor="not-a-cursor")
+
+    response = APIClient().get("/api/orders/", {"cursor": "not-a-cursor"})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    other_ordering = KeysetPaginator(ordering="id")._encode(Order(id=1), "n")
+    with pytest.raises(InvalidCursorError):
+        KeysetPaginator(ordering="total_price", cursor=other_ordering)
+
+
+@pytest.mark.django_db
+def test_html_list_navigation(client, orders):
+    response = client.get(reverse("order_list"), {"page_size": 5})
+
+    assert [o.id for o in response.context["orders"]] == [o.id for o in orders[:5]]
+    assert response.context["page"].previous_cursor is None
+
+    response = client.get(reverse("order_list"), {"page_size": 5, "cursor": response.context["page"].next_cursor})
+    assert [o.id for o in response.context["orders"]] == [o.id for o in orders[5:]]
+    assert response.context["page"].next_cursor is None
+    assert "Назад" in response.content.decode()
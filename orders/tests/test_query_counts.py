@@ -0,0 +1,55 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from orders.models import Item, Order, OrderItem
+
+
+def make_orders(count, items_per_order):
+    dishes = [Item.objects.create(name=f"dish {i}") for i in range(items_per_order)]
+    for table in range(count):
+        order = Order.objects.create(table_number=table + 1)
+        OrderItem.objects.bulk_create(OrderItem(order=order, item=dish, price=10) for dish in dishes)
+
+
+def count_queries(func):
+    with CaptureQueriesContext(connection) as context:
+        func()
+    return len(context.captured_queries)
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("url", ["/api/orders/", "/api/orders/search/"])
+def test_api_lists_use_fixed_number_of_queries(url):
+    client = APIClient()
+    make_orders(1, 1)
+    assert count_queries(lambda: client.get(url)) == 2
+
+    make_orders(20, 5)
+    assert count_queries(lambda: client.get(url)) == 2
+
+
+@pytest.mark.django_db
+def test_html_list_uses_fixed_number_of_queries(client):
+    make_orders(1, 1)
+    assert count_queries(lambda: client.get(reverse("order_list"))) == 2
+
+    make_orders(20, 5)
+    assert count_queries(lambda: client.get(reverse("order_list"))) == 2
+
+    # строки уже в кэше: позиции заказов не читаются
+    response = client.get(reverse("order_list"))
+    assert "dish 4" in response.content.decode()
+    assert count_queries(lambda: client.get(reverse("order_list"))) == 1
+
+
+@pytest.mark.django_db
+def test_update_page_reads_dishes_once(client):
+    make_orders(1, 2)
+    order = Order.objects.get()
+    small = count_queries(lambda: client.get(reverse("order_update", args=[order.id])))
+
+    OrderItem.objects.bulk_create(OrderItem(order=order, item=Item.objects.first(), price=5) for _ in range(10))
+    assert count_queries(lambda: client.get(reverse("order_update", args=[order.id]))) == small
@@ -0,0 +1,156 @@
+import time
+from datetime import date
+
+import pytest
+from django.test import Client
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from orders.db_router import RoutingState, read_alias, reading_from_replica, start_routing, stop_routing
+from orders.middleware import ReplicaRoutingMiddleware
+from orders.models import Item, Order, OrderItem, RevenueRollup
+from orders.services.response_cache import response_cache
+from orders.tests.test_async_views import AsyncURLConf
+
+# "replica" в тестах - отдельная база (см. conftest): данные, записанные только в нее,
+# видны лишь запросам, которые действительно читают с реплики
+
+replica_db = pytest.mark.django_db(databases=["default", "replica"])
+
+
+@pytest.fixture
+def replicas(settings):
+    settings.DATABASE_REPLICAS = ["replica"]
+    settings.DATABASE_REPLICA_STALENESS = 5
+
+
+@pytest.fixture
+def replica_order():
+    # bulk_create не отправляет сигналов, поэтому ничего не попадает в основную базу
+    item, = Item.objects.using("replica").bulk_create([Item(id=900, name="replica")])
+    order, = Order.objects.using("replica").bulk_create([Order(id=900, table_number=9, total_price=7)])
+    OrderItem.objects.using("replica").bulk_create([OrderItem(order=order, item=item, price=7)])
+    return order
+
+
+def order_ids(response):
+    return [order["id"] for order in response.json()]
+
+
+def test_reads_stay_on_primary_without_replicas():
+    with reading_from_replica():
+        assert read_alias() == "default"
+
+
+def test_request_reads_from_one_replica(settings):
+    settings.DATABASE_REPLICAS = [f"replica{number}" for number in range(8)]
+    state = RoutingState()
+    token = start_routing(state)
+    try:
+        with reading_from_replica():
+            aliases = {read_alias() for _ in range(50)}
+    finally:
+        stop_routing(token)
+
+    assert aliases == {state.replica}
+
+
+@replica_db
+def test_reads_use_replica_only_when_allowed(replicas):
+    assert read_alias() == "default"
+    with reading_from_replica():
+        assert read_alias() == "replica"
+
+
+@replica_db
+def test_list_and_search_read_from_replica(replicas, order, replica_order):
+    client = APIClient()
+
+    assert order_ids(client.get("/api/orders/")) == [replica_order.id]
+    assert order_ids(client.get("/api/orders/search/?table_id=9")) == [replica_order.id]
+    assert order_ids(client.get("/api/orders/search/?table_id=1")) == []
+
+
+@replica_db
+def test_async_list_reads_from_replica(settings, replicas, order, replica_order):
+    settings.ROOT_URLCONF = AsyncURLConf
+
+    response = Client().get("/api/orders/")
+
+    assert order_ids(response) == [replica_order.id]
+
+
+@replica_db
+def test_detail_reads_from_primary(replicas, order, replica_order):
+    client = APIClient()
+
+    assert client.get(f"/api/orders/{order.id}/").status_code == status.HTTP_200_OK
+    assert client.get(f"/api/orders/{replica_order.id}/").status_code == status.HTTP_404_NOT_FOUND
+
+
+@replica_db
+def test_client_reads_primary_after_own_write(replicas, item, replica_order):
+    client = APIClient()
+
+    response = client.post("/api/orders/", {"table_number": 3, "items": [{"item_id": item.id, "price": 5}]}, format="json")
+
+    assert response.status_code == status.HTTP_201_CREATED
+    assert ReplicaRoutingMiddleware.COOKIE_NAME in response.cookies
+    assert order_ids(client.get("/api/orders/")) == [response.json()["id"]]
+    # другой клиент без cookie по-прежнему читает с реплики
+    assert order_ids(APIClient().get("/api/orders/")) == [replica_order.id]
+
+
+@replica_db
+def test_reads_return_to_replica_after_staleness_window(settings, replicas, item, replica_order):
+    settings.DATABASE_REPLICA_STALENESS = 0
+    client = APIClient()
+
+    response = client.post("/api/orders/", {"table_number": 3, "items": [{"item_id": item.id, "price": 5}]}, format="json")
+
+    assert ReplicaRoutingMiddleware.COOKIE_NAME not in response.cookies
+    assert order_ids(client.get("/api/orders/")) == [replica_order.id]
+
+
+@replica_db
+def test_cached_responses_are_kept_per_database(replicas, order, replica_order):
+    client = APIClient()
+    client.get("/api/orders/")
+    client.cookies[ReplicaRoutingMiddleware.COOKIE_NAME] = "9999999999"
+
+    assert order_ids(client.get("/api/orders/")) == [order.id]
+
+
+@replica_db
+def test_lagging_replica_response_is_not_cached(settings, replicas, item):
+    settings.DATABASE_REPLICA_STALENESS = 0.2
+    writer = APIClient()
+
+    response = writer.post("/api/orders/", {"table_number": 3, "items": [{"item_id": item.id, "price": 5}]}, format="json")
+    created = response.json()["id"]
+    # реплика еще не получила запись: другой клиент видит старый список
+    assert order_ids(APIClient().get("/api/orders/")) == []
+
+    # окно писавшего клиента закончилось, реплика догнала основную базу
+    time.sleep(0.3)
+    writer.cookies.clear()
+    Order.objects.using("replica").bulk_create([Order(id=created, table_number=3, total_price=5)])
+
+    assert order_ids(writer.get("/api/orders/")) == [created]
+    # после окна ответы реплики снова кэшируются
+    hits = response_cache.stats()["hits"]
+    assert order_ids(APIClient().get("/api/orders/")) == [created]
+    assert response_cache.stats()["hits"] == hits + 1
+
+
+@replica_db
+def test_revenue_report_reads_from_replica(replicas):
+    item, = Item.objects.using("replica").bulk_create([Item(id=900, name="replica")])
+    RevenueRollup.objects.using("replica").bulk_create([
+        RevenueRollup(day=date(2024, 1, 1), hour=12, table_number=9, item=item, revenue=7, quantity=1),
+    ])
+
+    response = APIClient().get("/api/revenue/")
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["total_revenue"] == "7.00"
@@ -0,0 +1,78 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from orders.services.response_cache import VersionedResponseCache, response_cache
+
+
+def count_queries(func):
+    with CaptureQueriesContext(connection) as context:
+        response = func()
+    return response, len(context.captured_queries)
+
+
+@pytest.mark.django_db
+def test_identical_requests_served_from_cache(order):
+    client = APIClient()
+    first, queries = count_queries(lambda: client.get("/api/orders/search/", {"table_id": "1", "status": ""}))
+    assert queries == 2
+
+    # те же фильтры в другой записи: 01 и 1 после проверки совпадают
+    second, queries = count_queries(lambda: client.get("/api/orders/search/", {"table_id": "01"}))
+    assert queries == 0
+    assert second.content == first.content
+    assert second["ETag"] == first["ETag"]
+    assert response_cache.stats()["hits"] == 1
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("write", [
+    lambda client, order, item: client.patch(f"/api/orders/{order.id}/", {"status": "paid"}, format="json"),
+    lambda client, order, item: client.post(
+        "/api/orders/", {"table_number": 9, "items": [{"item_id": item.id, "price": 5}]}, format="json",
+    ),
+    lambda client, order, item: client.patch(
+        f"/api/orders/{order.id}/", {"items": [{"item_id": item.id, "price": 7}]}, format="json",
+    ),
+    lambda client, order, item: client.delete(f"/api/orders/{order.id}/"),
+    lambda client, order, item: client.post(
+        "/api/orders/bulk/", [{"table_number": 2, "items": [{"item_id": item.id, "price": 1}]}], format="json",
+    ),
+])
+def test_writes_invalidate_cached_lists(order, item, write):
+    client = APIClient()
+    before = client.get("/api/orders/").content
+    generation = response_cache.generation()
+
+    write(client, order, item)
+
+    assert response_cache.generation() > generation
+    assert client.get("/api/orders/").content != before
+
+
+def test_eviction_counted():
+    cache = VersionedResponseCache(alias="default", timeout=60, prefix="test:eviction")
+    key, value = cache.get({"page": 1})
+    assert value is None
+    cache.set(key, {"data": []})
+    cache.cache.delete(key)
+
+    assert cache.get({"page": 1})[1] is None
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["misses"] == 2
+
+
+@pytest.mark.django_db
+def test_stats_endpoint(order):
+    client = APIClient()
+    client.get("/api/orders/")
+    client.get("/api/orders/")
+
+    response = client.get("/api/cache/stats/")
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data["hits"] == 1
+    assert response.data["misses"] == 1
+    assert response.data["backend"] == "django.core.cache.backends.locmem.LocMemCache"
@@ -0,0 +1,121 @@
+import threading
+import time
+from decimal import Decimal
+
+import pytest
+from django.core.management import call_command
+from django.db import connections, transaction
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from orders.models import Order, OrderItem, RevenueRollup
+from orders.services.revenue_service import RevenueService, order_bucket
+
+
+def rollup_snapshot():
+    return sorted(RevenueRollup.objects.values_list("day", "hour", "table_number", "item_id", "revenue", "quantity"))
+
+
+@pytest.mark.django_db
+def test_rollup_updated_when_order_becomes_paid(order):
+    assert RevenueService.report()["total_revenue"] == 0
+
+    response = APIClient().patch(f"/api/orders/{order.id}/", {"status": "paid", "items": []}, format="json")
+
+    assert response.status_code == status.HTTP_200_OK
+    assert RevenueService.report()["total_revenue"] == Decimal("1.00")
+
+
+@pytest.mark.django_db
+def test_rollup_follows_paid_items_changes(paid_order, item):
+    response = APIClient().patch(
+        f"/api/orders/{paid_order.id}/",
+        {"status": "paid", "items": [{"item_id": item.id, "price": 100}, {"item_id": item.id, "price": 50}]},
+        format="json",
+    )
+    assert response.status_code == status.HTTP_200_OK
+
+    report = RevenueService.report()
+    assert report["total_revenue"] == Decimal("150.00")
+    assert report["by_item"][0]["total_quantity"] == 2
+
+    paid_order.status = "ready"
+    paid_order.save()
+    assert RevenueService.report()["total_revenue"] == 0
+
+
+@pytest.mark.django_db
+def test_rollup_cleared_when_paid_order_deleted(client, paid_order):
+    client.post(reverse("order_delete", args=[paid_order.id]))
+
+    assert not RevenueRollup.objects.exists()
+
+
+@pytest.mark.django_db
+def test_rebuild_matches_incremental_rollup(paid_order, item):
+    other = Order.objects.create(table_number=5, status="paid")
+    OrderItem.objects.create(order=other, item=item, price=20)
+    OrderItem.objects.create(order=other, item=item, price=30)
+    incremental = rollup_snapshot()
+
+    call_command("rebuild_revenue")
+
+    assert rollup_snapshot() == incremental
+
+
+@pytest.mark.django_db
+def test_revenue_api(paid_order):
+    response = APIClient().get("/api/revenue/")
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data["total_revenue"] == "1.00"
+    assert response.data["by_table"] == [{"table_number": 1, "total_revenue": "1.00", "total_quantity": 1}]
+    assert response.data["by_item"][0]["name"] == "test"
+
+
+@pytest.mark.django_db
+def test_revenue_api_rejects_bad_dates():
+    response = APIClient().get("/api/revenue/", {"date_from": "yesterday"})
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db(transaction=True)
+def test_concurrent_refresh_of_same_bucket(paid_order):
+    bucket = order_bucket(paid_order)
+    refreshed = threading.Event()
+    release = threading.Event()
+    errors = []
+
+    def first():
+        try:
+            with transaction.atomic():
+                RevenueService.refresh_buckets([bucket])
+                refreshed.set()
+                # транзакция остается открытой, пока второй пересчет не начнется
+                release.wait(5)
+        except Exception as e:
+            errors.append(e)
+        finally:
+            connections.close_all()
+
+    def second():
+        try:
+            RevenueService.refresh_buckets([bucket])
+        except Exception as e:
+            errors.append(e)
+        finally:
+            connections.close_all()
+
+    threads = [threading.Thread(target=first), threading.Thread(target=second)]
+    threads[0].start()
+    refreshed.wait(5)
+    threads[1].start()
+    time.sleep(0.2)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert rollup_snapshot() == [(*bucket, paid_order.items.get().item_id, Decimal("1.00"), 1)]
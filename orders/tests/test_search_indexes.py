@@ -0,0 +1,162 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from orders.models import Item, Order, OrderItem
+from orders.services.order_queries import filter_orders, items_matching
+
+postgres_only = pytest.mark.skipif(connection.vendor != "postgresql", reason="планы запросов PostgreSQL")
+
+
+@pytest.fixture
+def dated_orders():
+    now = timezone.now()
+    orders = {}
+    for days_ago in (0, 3, 10):
+        order = Order.objects.create(table_number=1)
+        Order.objects.filter(id=order.id).update(created_at=now - timedelta(days=days_ago))
+        orders[days_ago] = order
+    return orders
+
+
+@pytest.mark.django_db
+def test_timestamps_are_set(item):
+    order = Order.objects.create(table_number=1)
+    assert order.created_at is not None
+    assert order.paid_at is None
+
+    created, updated = order.created_at, order.updated_at
+    order.status = "paid"
+    order.save(update_fields=["status"])
+    order.refresh_from_db()
+    assert order.paid_at is not None
+    assert order.created_at == created
+    assert order.updated_at > updated
+
+
+@pytest.mark.django_db
+def test_api_search_by_date_range(dated_orders):
+    today = timezone.localdate()
+    response = APIClient().get(
+        "/api/orders/search/",
+        {"date_from": (today - timedelta(days=5)).isoformat(), "date_to": today.isoformat()},
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert {row["id"] for row in response.data} == {dated_orders[0].id, dated_orders[3].id}
+    assert response.data[0]["created_at"]
+
+
+@pytest.mark.django_db
+def test_web_search_by_date_range(client, dated_orders):
+    day = (timezone.localdate() - timedelta(days=10)).isoformat()
+    response = client.get(reverse("order_list"), {"date_from": day, "date_to": day})
+
+    assert [order.id for order in response.context["orders"]] == [dated_orders[10].id]
+
+
+def explain(queryset):
+    with connection.cursor() as cursor:
+        # на пустой тестовой таблице планировщик всегда выбирает seq scan, поэтому запрещаем его
+        cursor.execute("SET LOCAL enable_seqscan = off")
+    return queryset.explain()
+
+
+@postgres_only
+@pytest.mark.django_db
+@pytest.mark.parametrize("filters, index", [
+    ({"status": "pending", "table_number": 3}, "order_status_table_idx"),
+    ({"status": "paid", "date_from": timezone.localdate()}, "order_status_created_at_idx"),
+    ({"date_from": timezone.localdate(), "date_to": timezone.localdate()}, "order_created_at_id_idx"),
+])
+def test_search_queries_use_indexes(filters, index):
+    plan = explain(filter_orders(Order.objects.all(), **filters))
+
+    assert index in plan
+    assert "Seq Scan" not in plan
+
+
+@pytest.fixture
+def dish_orders():
+    soup = Item.objects.create(name="Борщ")
+    pasta = Item.objects.create(name="Паста карбонара")
+    tea = Item.objects.create(name="Чай черный")
+    orders = {}
+    for key, items in {"soup": [soup, soup], "pasta": [pasta, tea], "tea": [tea]}.items():
+        order = orders[key] = Order.objects.create(table_number=1)
+        for item in items:
+            OrderItem.objects.create(order=order, item=item, price=100)
+    return orders, {"soup": soup, "pasta": pasta, "tea": tea}
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("params, expected", [
+    ({"dish": "Борщ"}, {"soup"}),
+    ({"dish": "карбо"}, {"pasta"}),
+    ({"dish": "черн чай"}, {"pasta", "tea"}),
+    ({"dish": "чай кофе"}, set()),
+    ({"dish": ""}, {"soup", "pasta", "tea"}),
+])
+def test_api_search_by_dish_name(dish_orders, params, expected):
+    orders, _ = dish_orders
+    response = APIClient().get("/api/orders/search/", params)
+
+    assert response.status_code == status.HTTP_200_OK
+    # заказ с двумя одинаковыми блюдами не дублируется
+    assert sorted(row["id"] for row in response.data) == sorted(orders[key].id for key in expected)
+
+
+@postgres_only
+@pytest.mark.django_db
+def test_dish_name_search_matches_word_forms(dish_orders):
+    orders, _ = dish_orders
+
+    assert list(filter_orders(Order.objects.all(), dish="борща")) == [orders["soup"]]
+
+
+@pytest.mark.django_db
+def test_api_search_by_dish_id(dish_orders):
+    orders, items = dish_orders
+    response = APIClient().get("/api/orders/search/", {"dish_id": items["tea"].id, "table_id": 1})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert {row["id"] for row in response.data} == {orders["pasta"].id, orders["tea"].id}
+
+
+@pytest.mark.django_db
+def test_web_search_by_dish(client, dish_orders):
+    orders, items = dish_orders
+
+    response = client.get(reverse("order_list"), {"dish": "паста"})
+    assert [order.id for order in response.context["orders"]] == [orders["pasta"].id]
+
+    response = client.get(reverse("order_list"), {"dish_id": items["soup"].id})
+    assert [order.id for order in response.context["orders"]] == [orders["soup"].id]
+
+
+@pytest.mark.django_db
+def test_renamed_dish_is_found_by_new_name(dish_orders):
+    orders, items = dish_orders
+    client = APIClient()
+    assert client.get("/api/orders/search/", {"dish": "солянка"}).data == []
+
+    items["soup"].name = "Солянка"
+    items["soup"].save()
+
+    assert [row["id"] for row in client.get("/api/orders/search/", {"dish": "солянка"}).data] == [orders["soup"].id]
+
+
+@postgres_only
+@pytest.mark.django_db
+def test_dish_search_uses_indexes(dish_orders):
+    _, items = dish_orders
+
+    assert "item_name_search_idx" in explain(items_matching("карбо"))
+    plan = explain(filter_orders(Order.objects.all(), item_id=items["tea"].id))
+    assert "order_item_item_order_idx" in plan
+    assert "Seq Scan" not in plan
@@ -0,0 +1,216 @@
+import threading
+import time
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+
+import pytest
+from django.core.cache import caches
+from django.core.management import call_command
+from django.db import connection, connections
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from orders.models import Item, Order, OrderItem, StatisticsSnapshot
+from orders.services import statistics_service
+from orders.services.statistics_service import StatisticsService
+from orders.services.status_service import OrderStatusService
+
+
+def make_order(table_number, prices, status="pending", created_minutes_ago=60, ready_after=None, paid_after=None):
+    order = Order.objects.create(table_number=table_number, status=status)
+    for item, price in prices:
+        OrderItem.objects.create(order=order, item=item, price=price)
+    created_at = timezone.now() - timedelta(minutes=created_minutes_ago)
+    times = {"created_at": created_at, "total_price": sum(price for _, price in prices)}
+    if ready_after is not None:
+        times["ready_at"] = created_at + timedelta(minutes=ready_after)
+    if paid_after is not None:
+        times["paid_at"] = created_at + timedelta(minutes=paid_after)
+    Order.objects.filter(id=order.id).update(**times)
+    return order
+
+
+@pytest.fixture
+def shift():
+    soup, tea, cake = (Item.objects.create(name=name) for name in ("Суп", "Чай", "Пирог"))
+    make_order(1, [(soup, 300), (tea, 100)], "paid", ready_after=10, paid_after=40)
+    make_order(1, [(soup, 300), (cake, 200)], "paid", ready_after=20, paid_after=30)
+    make_order(2, [(soup, 300), (tea, 100), (tea, 100)], "ready", created_minutes_ago=30, ready_after=10)
+    make_order(3, [(cake, 200)], created_minutes_ago=15)
+    # вне суточного периода, но в очереди
+    make_order(3, [(tea, 100)], created_minutes_ago=2 * 24 * 60)
+    return {"soup": soup, "tea": tea, "cake": cake}
+
+
+def get_statistics(**params):
+    response = APIClient().get("/api/statistics/", params)
+    assert response.status_code == status.HTTP_200_OK
+    return response.data
+
+
+@pytest.mark.django_db
+def test_day_statistics(shift):
+    data = get_statistics(period="day")
+
+    assert data["orders"] == 4
+    assert data["paid_orders"] == 2
+    assert data["revenue"] == "900.00"
+    assert data["average_ticket"] == "450.00"
+    assert data["dishes_per_order"] == 2.0
+
+    assert [(row["name"], row["rank"], row["quantity"]) for row in data["top_dishes"]] == [
+        ("Суп", 1, 3), ("Чай", 2, 3), ("Пирог", 3, 2),
+    ]
+    assert data["top_dishes"][0]["share"] == 0.375
+
+    tables = {row["table_number"]: row for row in data["tables"]}
+    assert tables[1]["orders"] == 2 and tables[1]["rank"] == 1 and tables[1]["average_ticket"] == "450.00"
+    assert tables[2]["rank"] == tables[3]["rank"] == 2
+    assert tables[3]["revenue"] == "0.00"
+
+    times = {row["status"]: row for row in data["status_times"]}
+    assert times["pending"]["orders"] == 3
+    assert times["pending"]["avg_seconds"] == pytest.approx(40 / 3 * 60, abs=1)
+    assert times["ready"]["orders"] == 2
+    assert times["ready"]["avg_seconds"] == pytest.approx(20 * 60, abs=1)
+    assert times["ready"]["max_seconds"] == pytest.approx(30 * 60, abs=1)
+
+    backlog = {row["status"]: row for row in data["backlog"]["by_status"]}
+    assert data["backlog"]["total"] == 3
+    assert backlog["pending"]["orders"] == 2
+    assert backlog["pending"]["avg_age_seconds"] > 24 * 3600
+    assert backlog["ready"]["avg_age_seconds"] == pytest.approx(20 * 60, abs=5)
+
+
+@pytest.mark.django_db
+def test_period_widens_window(shift):
+    assert get_statistics(period="week")["orders"] == 5
+
+
+@pytest.mark.django_db
+def test_snapshot_is_served_without_touching_orders(shift):
+    get_statistics()
+    make_order(4, [(shift["soup"], 300)])
+
+    with CaptureQueriesContext(connection) as queries:
+        data = get_statistics()
+
+    assert data["orders"] == 4
+    assert not any("orders_order" in query["sql"] for query in queries.captured_queries)
+    assert StatisticsSnapshot.objects.count() == 1
+
+
+@pytest.mark.django_db
+def test_stale_snapshot_is_refreshed_once(settings, shift):
+    get_statistics()
+    StatisticsSnapshot.objects.update(bucket=timezone.now() - timedelta(seconds=2 * settings.ORDERS_STATISTICS_INTERVAL))
+    make_order(4, [(shift["soup"], 300)])
+
+    assert get_statistics()["orders"] == 5
+    data = get_statistics()
+    assert data["orders"] == 5
+    assert [row["backlog"] for row in data["backlog_history"]] == [3, 4]
+    assert StatisticsSnapshot.objects.count() == 2
+
+
+@pytest.mark.django_db(transaction=True)
+def test_concurrent_first_requests_compute_once(monkeypatch, shift):
+    callers = 6
+    start = threading.Barrier(callers)
+    compute = StatisticsService.compute
+    computed = []
+    results = {}
+
+    def slow_compute(self, now):
+        computed.append(self.period)
+        time.sleep(0.2)
+        return compute(self, now)
+
+    def request(number):
+        start.wait()
+        try:
+            results[number] = StatisticsService("day").current().id
+        finally:
+            connections.close_all()
+
+    monkeypatch.setattr(StatisticsService, "compute", slow_compute)
+    threads = [threading.Thread(target=request, args=(number,)) for number in range(callers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert computed == ["day"]
+    assert set(results.values()) == {StatisticsSnapshot.objects.get().id}
+
+
+@pytest.mark.django_db
+def test_first_snapshot_is_computed_after_waiting_for_stuck_lock(monkeypatch, shift):
+    # блокировку держит запрос, который так и не сохранит снимок
+    caches["default"].add("orders:statistics:day:first", True, timeout=300)
+    monkeypatch.setattr(statistics_service, "FIRST_SNAPSHOT_WAIT", 0.2)
+    started = time.monotonic()
+
+    try:
+        snapshot = StatisticsService("day").current()
+    finally:
+        caches["default"].delete("orders:statistics:day:first")
+
+    assert 0.2 <= time.monotonic() - started < 5
+    assert snapshot.data["orders"] == 4
+    assert StatisticsSnapshot.objects.get() == snapshot
+
+
+@pytest.mark.django_db
+def test_invalid_period():
+    response = APIClient().get("/api/statistics/", {"period": "year"})
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db
+def test_refresh_command_creates_snapshots_and_prunes_old(settings, shift):
+    old = StatisticsService("day").bucket() - timedelta(days=settings.ORDERS_STATISTICS_RETENTION_DAYS + 1)
+    StatisticsSnapshot.objects.create(period="day", bucket=old, data={})
+    out = StringIO()
+
+    call_command("refresh_statistics", stdout=out)
+
+    assert sorted(StatisticsSnapshot.objects.values_list("period", flat=True)) == ["day", "month", "week"]
+    assert "Статистика обновлена" in out.getvalue()
+
+
+@pytest.mark.django_db
+def test_statistics_page(client, shift):
+    response = client.get(reverse("statistics"), {"period": "week"})
+
+    assert response.status_code == 200
+    assert response.context["orders"] == 5
+    assert "Пирог" in response.content.decode()
+
+
+@pytest.mark.django_db
+def test_ready_at_follows_status(item):
+    order = Order.objects.create(table_number=1)
+    assert order.ready_at is None
+
+    OrderStatusService("ready").transition([order.id])
+    order.refresh_from_db()
+    ready_at = order.ready_at
+    assert ready_at is not None
+
+    OrderStatusService("paid").transition([order.id])
+    order.refresh_from_db()
+    assert order.ready_at == ready_at
+
+    order.status = "pending"
+    order.save()
+    assert order.ready_at is None
+
+    order.status = "paid"
+    order.save()
+    assert order.ready_at == order.paid_at
@@ -0,0 +1,182 @@
+from decimal import Decimal
+
+import pytest
+from django.core.exceptions import ValidationError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from orders.models import Order, OrderItem
+from orders.services.order_events import event_backend
+from orders.services.revenue_service import RevenueService
+from orders.services.status_service import OrderStatusService, change_status
+
+
+def create_orders(item, table_number, statuses):
+    orders = []
+    for status_value in statuses:
+        order = Order.objects.create(table_number=table_number, status=status_value)
+        OrderItem.objects.create(order=order, item=item, price=10)
+        orders.append(order)
+    return orders
+
+
+def order_updates(context):
+    return [query["sql"] for query in context.captured_queries if query["sql"].startswith('UPDATE "orders_order"')]
+
+
+@pytest.mark.django_db
+def test_transition_moves_order_to_next_status(order):
+    response = APIClient().post(f"/api/orders/{order.id}/status/", {"status": "ready"}, format="json")
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["status"] == "ready"
+    order.refresh_from_db()
+    assert order.status == "ready"
+    assert response["ETag"] == f'"{order.id}-{order.version}"'
+
+
+@pytest.mark.django_db
+@pytest.mark.skipif(connection.vendor != "postgresql", reason="UPDATE ... RETURNING есть только в PostgreSQL")
+def test_transition_is_a_single_update(order):
+    with CaptureQueriesContext(connection) as context:
+        APIClient().post(f"/api/orders/{order.id}/status/", {"status": "ready"}, format="json")
+
+    assert len(order_updates(context)) == 1
+    assert not [query for query in context.captured_queries if query["sql"].startswith("SELECT")]
+
+
+@pytest.mark.django_db
+def test_transition_reports_conflict_with_current_status(order):
+    response = APIClient().post(f"/api/orders/{order.id}/status/", {"status": "paid"}, format="json")
+
+    assert response.status_code == status.HTTP_409_CONFLICT
+    assert response.json()["error"]["status"] == "pending"
+    order.refresh_from_db()
+    assert order.status == "pending"
+
+
+@pytest.mark.django_db
+def test_transition_of_missing_order():
+    response = APIClient().post("/api/orders/999999/status/", {"status": "ready"}, format="json")
+
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.django_db
+def test_transition_rejects_unknown_target(order):
+    response = APIClient().post(f"/api/orders/{order.id}/status/", {"status": "pending"}, format="json")
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db
+def test_concurrent_transitions_do_not_both_win(order):
+    client = APIClient()
+    url = f"/api/orders/{order.id}/status/"
+
+    first = client.post(url, {"status": "ready"}, format="json")
+    second = client.post(url, {"status": "ready"}, format="json")
+
+    assert first.status_code == status.HTTP_200_OK
+    assert second.status_code == status.HTTP_409_CONFLICT
+    order.refresh_from_db()
+    assert order.version == 2
+
+
+@pytest.mark.django_db
+def test_bulk_transition_closes_table(item):
+    ready = create_orders(item, 5, ["ready", "ready", "ready"])
+    pending, = create_orders(item, 5, ["pending"])
+    other_table, = create_orders(item, 6, ["ready"])
+
+    with CaptureQueriesContext(connection) as context:
+        response = APIClient().post("/api/orders/status/", {"status": "paid", "table_id": 5}, format="json")
+
+    assert response.status_code == status.HTTP_200_OK
+    assert sorted(change["id"] for change in response.json()["changed"]) == [order.id for order in ready]
+    assert len(order_updates(context)) == 1
+    assert dict(Order.objects.values_list("id", "status")) == {
+        **{order.id: "paid" for order in ready}, pending.id: "pending", other_table.id: "ready",
+    }
+    assert all(Order.objects.get(id=order.id).paid_at for order in ready)
+    assert RevenueService.report()["total_revenue"] == Decimal("30.00")
+
+
+@pytest.mark.django_db
+def test_bulk_transition_by_ids_reports_conflicts_and_missing(item):
+    ready, pending = create_orders(item, 1, ["ready", "pending"])
+
+    response = APIClient().post(
+        "/api/orders/status/", {"status": "paid", "ids": [ready.id, pending.id, 999999]}, format="json",
+    )
+
+    data = response.json()
+    assert [change["id"] for change in data["changed"]] == [ready.id]
+    assert data["conflicts"] == [{"id": pending.id, "status": "pending"}]
+    assert data["missing"] == [999999]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("payload", [
+    {"status": "paid"},
+    {"status": "paid", "ids": [1], "table_id": 1},
+    {"status": "paid", "ids": []},
+])
+def test_bulk_transition_requires_one_target(payload):
+    response = APIClient().post("/api/orders/status/", payload, format="json")
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db
+def test_transitions_publish_events(django_capture_on_commit_callbacks, item):
+    orders = create_orders(item, 2, ["pending", "pending"])
+    last_id = event_backend().latest_id()
+
+    with django_capture_on_commit_callbacks(execute=True):
+        APIClient().post("/api/orders/status/", {"status": "ready", "table_id": 2}, format="json")
+
+    events = event_backend().events_after(last_id)
+    assert sorted((event.order_id, event.kind, event.status) for event in events) == [
+        (order.id, "status_changed", "ready") for order in orders
+    ]
+
+
+@pytest.mark.django_db
+def test_change_status_detects_concurrent_change(order):
+    stale = Order.objects.get(id=order.id)
+    change_status(Order.objects.get(id=order.id), "ready")
+
+    with pytest.raises(ValidationError):
+        change_status(stale, "paid")
+
+    order.refresh_from_db()
+    assert order.status == "ready"
+
+
+@pytest.mark.django_db
+def test_change_status_updates_revenue_when_unpaying(paid_order):
+    assert RevenueService.report()["total_revenue"] == Decimal("1.00")
+
+    change_status(paid_order, "pending")
+
+    assert paid_order.paid_at is None
+    assert RevenueService.report()["total_revenue"] == Decimal("0.00")
+
+
+@pytest.mark.django_db
+def test_failed_rollup_refresh_rolls_back_transition(monkeypatch, item):
+    orders = create_orders(item, 6, ["ready", "ready"])
+
+    def fail(buckets):
+        raise RuntimeError("rollup")
+
+    monkeypatch.setattr(RevenueService, "refresh_buckets", fail)
+    for transition in (lambda: OrderStatusService("paid").transition([order.id for order in orders]),
+                       lambda: OrderStatusService("paid").transition_table(6)):
+        with pytest.raises(RuntimeError):
+            transition()
+
+        assert set(Order.objects.filter(table_number=6).values_list("status", flat=True)) == {"ready"}
@@ -63,6 +63,25 @@ def test_update_order(order, order_item):
     assert order_item.price == 600
 
 
+@pytest.mark.django_db
+def test_update_order_without_changes_keeps_version(order, order_item):
+    version = order.version
+    form = UpdateOrderForm(data=model_to_dict(order), instance=order)
+    formset_data = {
+        "form-TOTAL_FORMS": "1",
+        "form-INITIAL_FORMS": "1",
+        "form-0-id": order_item.id,
+        "form-0-item": order_item.item.id,
+        "form-0-price": "500.00"
+    }
+    formset = OrderItemFormSet(data=formset_data, queryset=order.items.filter(id=order_item.id))
+
+    OrderUpdateService(form, order, formset).update_order()
+
+    order.refresh_from_db()
+    assert order.version == version
+
+
 @pytest.mark.django_db
 def test_delete_order(client, order):
     url = reverse('order_delete', args=[order.id])
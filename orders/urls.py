@@ -1,11 +1,17 @@
 from django.urls import path
 
-from .views import get_orders, create_order, delete_order, update_order, revenue_report
+from .views import (
+    get_orders, get_order_row, get_order_rows, create_order, delete_order, update_order, revenue_report,
+    statistics_report,
+)
 
 urlpatterns = [
     path('', get_orders, name='order_list'),
+    path('rows/', get_order_rows, name='order_list_rows'),
+    path('<int:order_id>/row/', get_order_row, name='order_row'),
     path('create/', create_order, name='order_create'),
     path('delete/<int:order_id>/', delete_order, name='order_delete'),
     path('update/<int:order_id>/', update_order, name='order_update'),
     path('revenue/', revenue_report, name='revenue'),
+    path('statistics/', statistics_report, name='statistics'),
 ]
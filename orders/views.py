@@ -1,38 +1,88 @@
 from django.contrib import messages
-from django.http import HttpRequest, HttpResponse
-from django.shortcuts import render, redirect, get_object_or_404
+from django.conf import settings
+from django.http import Http404, HttpRequest, HttpResponse
+from django.shortcuts import redirect, get_object_or_404
+from django.template.response import TemplateResponse
 
-from .forms import CreateOrderForm, UpdateOrderForm, OrderSearchForm, OrderItemFormSet
-from .models import Order, Item
+from .db_router import replica_reads
+from .forms import (
+    CreateOrderForm, UpdateOrderForm, OrderSearchForm, OrderItemFormSet, RevenueFilterForm, StatisticsFilterForm,
+)
+from .models import Order
+from .services.group_commit import group_commit
+from .services.item_catalog import item_catalog
+from .services.metrics import request_metrics
+from .services.order_queries import orders_for_page
 from .services.order_service import OrderCreateService, OrderUpdateService, OrderService
+from .services.pagination import KeysetPaginator, Page
+from .services.revenue_service import RevenueService, revenue_batch
+from .services.row_cache import order_rows
+from .services.statistics_service import current_statistics
 
 
-def get_orders(request: HttpRequest) -> HttpResponse:
+def _order_page(request: HttpRequest) -> tuple[OrderSearchForm, Page, list[str]]:
     form = OrderSearchForm(request.GET)
-    orders = Order.objects.all()
+    orders = orders_for_page()
+    errors = []
     try:
-        orders = OrderService(form).get(orders).order_by("id")
+        orders = OrderService(form).get(orders)
     except Exception as e:
-        messages.error(request, e.args[0])
+        errors.append(e.args[0])
+
+    try:
+        page = KeysetPaginator(
+            ordering=request.GET.get("ordering"),
+            page_size=request.GET.get("page_size"),
+            cursor=request.GET.get("cursor"),
+        ).paginate(orders)
+    except ValueError as e:
+        errors.append(e.args[0])
+        page = KeysetPaginator().paginate(orders)
+    return form, page, errors
+
+
+@replica_reads
+def get_orders(request: HttpRequest) -> HttpResponse:
+    form, page, errors = _order_page(request)
+    for error in errors:
+        messages.error(request, error)
+
+    return TemplateResponse(
+        request, "orders/order_list.html",
+        {"form": form, "orders": page.items, "page": page, "rows": order_rows.render(page.items)},
+    )
+
 
-    return render(request, "orders/order_list.html", {"form": form, "orders": orders})
+@replica_reads
+def get_order_rows(request: HttpRequest) -> HttpResponse:
+    """Тело таблицы списка заказов с теми же фильтрами и страницей, для обновления без перезагрузки."""
+    _, page, _ = _order_page(request)
+    return TemplateResponse(request, "orders/order_rows.html", {"rows": order_rows.render(page.items)})
+
+
+def get_order_row(request: HttpRequest, order_id: int) -> HttpResponse:
+    order = get_object_or_404(orders_for_page(), id=order_id)
+    return HttpResponse(order_rows.render([order])[0])
 
 
 def create_order(request: HttpRequest) -> HttpResponse:
-    context = {"items": Item.objects.values("name", "id"), 'form': CreateOrderForm}
+    context = {"items": item_catalog.menu(), 'form': CreateOrderForm}
     if request.method == 'POST':
         form = CreateOrderForm(request.POST)
         items = request.POST.getlist('items')
         prices = request.POST.getlist("prices")
         items_data = [{"item_id": item_data[0], "price": item_data[1]} for item_data in zip(items, prices)]
         try:
-            OrderCreateService().create_order(form, items_data)
+            if group_commit.enabled and form.is_valid():
+                group_commit.create_order(form.cleaned_data["table_number"], items_data)
+            else:
+                OrderCreateService().create_order(form, items_data)
             messages.success(request, "Заказ успешно создан.")
             return redirect('order_list')
         except Exception as e:
             messages.error(request, e)
 
-    return render(request, "orders/order_create.html", context)
+    return TemplateResponse(request, "orders/order_create.html", context)
 
 
 def update_order(request: HttpRequest, order_id: int) -> HttpResponse:
@@ -50,19 +100,34 @@ def update_order(request: HttpRequest, order_id: int) -> HttpResponse:
     else:
         form = UpdateOrderForm(instance=order)
         formset = OrderItemFormSet(queryset=order.items.all())
-    return render(request, 'orders/order_update.html', {'form': form, 'formset': formset})
+    return TemplateResponse(request, 'orders/order_update.html', {'form': form, 'formset': formset})
 
 
 def delete_order(request: HttpRequest, order_id: int) -> HttpResponse:
     order = get_object_or_404(Order, id=order_id)
-    order.delete()
+    with revenue_batch():
+        order.delete()
     return redirect('order_list')
 
 
+@replica_reads
 def revenue_report(request: HttpRequest) -> HttpResponse:
-    paid_orders = Order.objects.filter(status='paid')
-    total_revenue = 0
-    for order in paid_orders:
-        total_revenue += sum(item.price for item in order.items.all())
+    form = RevenueFilterForm(request.GET)
+    filters = form.cleaned_data if form.is_valid() else {}
+    report = RevenueService.report(filters.get("date_from"), filters.get("date_to"))
+
+    return TemplateResponse(request, 'orders/revenue.html', {'form': form, **report})
+
+
+@replica_reads
+def statistics_report(request: HttpRequest) -> HttpResponse:
+    form = StatisticsFilterForm(request.GET)
+    period = (form.cleaned_data.get("period") if form.is_valid() else None) or "day"
+
+    return TemplateResponse(request, "orders/statistics.html", {"form": form, **current_statistics(period)})
+
 
-    return render(request, 'orders/revenue.html', {'total_revenue': total_revenue})
+def metrics(request: HttpRequest) -> HttpResponse:
+    if not settings.ORDERS_METRICS_ENABLED:
+        raise Http404()
+    return HttpResponse(request_metrics.render_text(), content_type="text/plain; version=0.0.4; charset=utf-8")